@@ -0,0 +1,218 @@
+r"""Throughput benchmarks of PyxisClient against the local Pyxis stand-in server.
+
+Every scenario runs in a fresh process so that its peak RSS is not affected by
+the previous ones. Results are printed and saved as JSON; a previous result
+file can be passed with ``--compare`` to print relative changes.
+
+Example::
+
+    python benchmarks/bench_client.py --count 2000 --threads 1,4,16 \\
+        --payload-sizes 512,8192 --output bench.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "src")]
+
+from pubtools._pyxis.pyxis_client import PyxisClient  # noqa: E402
+from tests.pyxis_server import PyxisServer, make_signature  # noqa: E402
+
+SCENARIOS = ("upload", "query", "delete")
+
+
+class _TimedClient(PyxisClient):
+    """PyxisClient recording the latency of every HTTP response."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latencies = []
+        self._latencies_lock = threading.Lock()
+
+    def _make_session(self):
+        session = super()._make_session()
+        session.session.hooks["response"].append(self._record)
+        return session
+
+    def _record(self, response, *args, **kwargs):
+        with self._latencies_lock:
+            self.latencies.append(response.elapsed.total_seconds())
+
+
+def _percentile(values, percent):
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(percent / 100.0 * (len(values) - 1))))
+    return values[index]
+
+
+def _run_scenario(url, scenario, threads, payload_size, count, digests, ids):
+    """Run one scenario in a worker process and return its measurements."""
+    client = _TimedClient(
+        url, retries=0, backoff_factor=0, verify=False, threads=threads
+    )
+    if scenario == "upload":
+        signatures = [make_signature(i, payload_size) for i in range(count)]
+    start = time.perf_counter()
+    if scenario == "upload":
+        result = client.upload_signatures(signatures)
+    elif scenario == "query":
+        result = client.get_container_signatures(",".join(digests))
+    else:
+        result = client.delete_container_signatures(ids)
+    elapsed = time.perf_counter() - start
+
+    latencies = client.latencies
+    return {
+        "records": len(result),
+        "requests": len(latencies),
+        "elapsed_s": elapsed,
+        "requests_per_s": len(latencies) / elapsed if elapsed else None,
+        "records_per_s": len(result) / elapsed if elapsed else None,
+        "latency_p50_ms": _ms(_percentile(latencies, 50)),
+        "latency_p99_ms": _ms(_percentile(latencies, 99)),
+        "latency_mean_ms": _ms(statistics.mean(latencies) if latencies else None),
+        # ru_maxrss is reported in kilobytes on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0,
+    }
+
+
+def _ms(seconds):
+    return None if seconds is None else seconds * 1000.0
+
+
+def _prepare(server, scenario, count, payload_size, digest_count):
+    """Set up server data for the scenario, return (digests, ids) arguments."""
+    server.reset()
+    if scenario == "upload":
+        return [], []
+    server.populate_signatures(count, payload_size, digest_count=digest_count)
+    if scenario == "query":
+        digests = sorted(
+            set(s["manifest_digest"] for s in server.state.signatures.values())
+        )
+        return digests, []
+    return [], list(server.state.signatures)
+
+
+def run(args):
+    """Run all requested scenario combinations, return list of results."""
+    results = []
+    context = multiprocessing.get_context("spawn")
+    with PyxisServer(
+        latency=args.latency, default_page_size=args.page_size, max_page_size=10000
+    ) as server:
+        for scenario in args.scenarios:
+            for payload_size in args.payload_sizes:
+                for threads in args.threads:
+                    digests, ids = _prepare(
+                        server, scenario, args.count, payload_size, args.digests
+                    )
+                    server.latency = args.latency
+                    with ProcessPoolExecutor(1, mp_context=context) as executor:
+                        measured = executor.submit(
+                            _run_scenario,
+                            server.url,
+                            scenario,
+                            threads,
+                            payload_size,
+                            args.count,
+                            digests,
+                            ids,
+                        ).result()
+                    result = {
+                        "scenario": scenario,
+                        "threads": threads,
+                        "payload_size": payload_size,
+                        "count": args.count,
+                    }
+                    result.update(measured)
+                    results.append(result)
+                    _print_result(result)
+    return results
+
+
+def _key(result):
+    return (result["scenario"], result["threads"], result["payload_size"])
+
+
+def _print_result(result, baseline=None):
+    line = (
+        "{scenario:>7} threads={threads:<3} payload={payload_size:<6} "
+        "req/s={requests_per_s:9.1f} p50={latency_p50_ms:7.2f}ms "
+        "p99={latency_p99_ms:7.2f}ms rss={peak_rss_mb:7.1f}MB".format(**result)
+    )
+    if baseline:
+        change = (result["requests_per_s"] / baseline["requests_per_s"] - 1) * 100
+        line += " ({0:+.1f}% req/s)".format(change)
+    print(line, flush=True)
+
+
+def compare(results, baseline_path):
+    """Print results relative to a previous result file."""
+    with open(baseline_path) as f:
+        baseline = {_key(r): r for r in json.load(f)["results"]}
+    print("\nCompared to %s:" % baseline_path)
+    for result in results:
+        _print_result(result, baseline.get(_key(result)))
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(",")]
+
+
+def main(argv=None):
+    """Parse arguments, run the benchmarks and save results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000, help="records per run")
+    parser.add_argument("--threads", type=_int_list, default=[1, 4, 16])
+    parser.add_argument("--payload-sizes", type=_int_list, default=[512, 8192])
+    parser.add_argument(
+        "--scenarios", type=lambda v: v.split(","), default=list(SCENARIOS)
+    )
+    parser.add_argument(
+        "--page-size", type=int, default=100, help="server default page size"
+    )
+    parser.add_argument(
+        "--digests",
+        type=int,
+        default=10,
+        help="distinct manifest digests to spread queried signatures over",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.002, help="server latency in seconds"
+    )
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--compare", help="previous result file to compare with")
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    with open(args.output, "w") as f:
+        json.dump(
+            {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "args": {k: v for k, v in vars(args).items() if k != "compare"},
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+    print("Results saved to %s" % args.output)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
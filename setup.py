@@ -65,7 +65,7 @@ long_description = read_content("README.rst") + read_content(
     os.path.join("docs/source", "CHANGELOG.rst")
 )
 
-extras_require = {"reST": ["Sphinx"]}
+extras_require = {"reST": ["Sphinx"], "tracing": ["opentelemetry-api"]}
 if os.environ.get("READTHEDOCS", None):
     extras_require["reST"].append("recommonmark")
 
@@ -91,14 +91,17 @@ setup(
             "pubtools-pyxis-get-repo-metadata = pubtools._pyxis.pyxis_ops:get_repo_metadata_main",
             "pubtools-pyxis-upload-signatures = pubtools._pyxis.pyxis_ops:upload_signatures_main",
             "pubtools-pyxis-get-signatures = pubtools._pyxis.pyxis_ops:get_signatures_main",
-            "pubtools-pyxis-delete-signatures = pubtools._pyxis.pyxis_ops:delete_signatures_main"
+            "pubtools-pyxis-delete-signatures = pubtools._pyxis.pyxis_ops:delete_signatures_main",
+            "pubtools-pyxis-batch = pubtools._pyxis.pyxis_ops:batch_main",
+            "pubtools-pyxis-daemon = pubtools._pyxis.pyxis_ops:daemon_main"
         ],
         "mod": [
             "pubtools-pyxis-get-operator-indices = pubtools._pyxis.pyxis_ops:get_operator_indices_mod",
             "pubtools-pyxis-get-repo-metadata = pubtools._pyxis.pyxis_ops:get_repo_metadata_mod",
             "pubtools-pyxis-upload-signatures = pubtools._pyxis.pyxis_ops:upload_signatures_mod",
             "pubtools-pyxis-get-signatures = pubtools._pyxis.pyxis_ops:get_signatures_mod",
-            "pubtools-pyxis-delete-signatures = pubtools._pyxis.pyxis_ops:delete_signatures_mod"
+            "pubtools-pyxis-delete-signatures = pubtools._pyxis.pyxis_ops:delete_signatures_mod",
+            "pubtools-pyxis-batch = pubtools._pyxis.pyxis_ops:batch_mod"
         ]
     },
     include_package_data=True,
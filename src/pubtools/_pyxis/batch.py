@@ -0,0 +1,150 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator, Optional, Union
+
+from .pyxis_client import PyxisClient
+
+
+def _csv(value: Union[None, str, list[str]]) -> Optional[str]:
+    if isinstance(value, list):
+        return ",".join(value)
+    return value
+
+
+def _get_signatures(
+    client: PyxisClient,
+    manifest_digest: Union[None, str, list[str]] = None,
+    reference: Union[None, str, list[str]] = None,
+    fields: Union[None, str, list[str]] = None,
+    page_size: Union[None, int, str] = None,
+    filter: Optional[str] = None,
+) -> Any:
+    if not (manifest_digest or reference or filter):
+        raise ValueError(
+            "Give at least 1 filter, manifest_digest, reference and/or filter"
+        )
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    return client.get_container_signatures(
+        _csv(manifest_digest),
+        _csv(reference),
+        include=fields,
+        page_size=page_size,
+        filter=filter,
+    )
+
+
+def _upload_signatures(
+    client: PyxisClient, signatures: list[Any], quiet_results: bool = False
+) -> Any:
+    return client.upload_signatures(signatures, return_results=not quiet_results)
+
+
+def _delete_signatures(
+    client: PyxisClient, ids: Union[str, list[str]], quiet_results: bool = False
+) -> Any:
+    if isinstance(ids, str):
+        ids = ids.split(",")
+    return client.delete_container_signatures(ids, return_results=not quiet_results)
+
+
+def _get_repo_metadata(
+    client: PyxisClient,
+    repo_name: str,
+    custom_registry: Optional[str] = None,
+    only_internal_registry: bool = False,
+    only_partner_registry: bool = False,
+) -> Any:
+    if only_internal_registry and only_partner_registry:
+        raise ValueError(
+            "Can't check only internal registry as well as only partner registry"
+        )
+    return client.get_repository_metadata(
+        repo_name, custom_registry, only_internal_registry, only_partner_registry
+    )
+
+
+def _get_operator_indices(
+    client: PyxisClient, ocp_versions_range: str, organization: Optional[str] = None
+) -> Any:
+    return client.get_operator_indices(ocp_versions_range, organization)
+
+
+BATCH_OPERATIONS: dict[str, Callable[..., Any]] = {
+    "get-signatures": _get_signatures,
+    "upload-signatures": _upload_signatures,
+    "delete-signatures": _delete_signatures,
+    "get-repo-metadata": _get_repo_metadata,
+    "get-operator-indices": _get_operator_indices,
+}
+"""Operations supported in batches, named after their entrypoints.
+
+Arguments of the operations are named after the entrypoint options, e.g.
+``{"operation": "get-signatures", "args": {"manifest_digest": ["sha256:..."]}}``.
+"""
+
+
+def load_operations(text: str) -> list[dict[str, Any]]:
+    """
+    Parse operations of a batch.
+
+    Args:
+        text (str)
+            JSON list of operations, or one JSON operation per line (NDJSON).
+    Returns:
+        list: Operations, each with its "operation" name, optional "args" and
+        optional "id".
+    """
+    if text.lstrip().startswith("["):
+        operations: list[dict[str, Any]] = json.loads(text)
+    else:
+        operations = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    for index, operation in enumerate(operations):
+        if operation.get("operation") not in BATCH_OPERATIONS:
+            raise ValueError(
+                "Unsupported operation %r at position %d, expected one of: %s"
+                % (operation.get("operation"), index, ", ".join(BATCH_OPERATIONS))
+            )
+    return operations
+
+
+def _run(client: PyxisClient, index: int, operation: dict[str, Any]) -> dict[str, Any]:
+    result: dict[str, Any] = {"index": index, "operation": operation["operation"]}
+    if "id" in operation:
+        result["id"] = operation["id"]
+    try:
+        run = BATCH_OPERATIONS[operation["operation"]]
+        result["result"] = run(client, **operation.get("args", {}))
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def run_batch(
+    client: PyxisClient, operations: list[dict[str, Any]], threads: int
+) -> Iterator[dict[str, Any]]:
+    """
+    Run operations concurrently on a single client.
+
+    A failed operation doesn't stop the others, its error is reported in its
+    result instead.
+
+    Args:
+        client (PyxisClient)
+            Client shared by all operations.
+        operations (list)
+            Operations as returned by `load_operations`.
+        threads (int)
+            Maximum number of operations running at once.
+    Yields:
+        dict: Result of every operation in the order of the operations, with its
+        "index", "operation", "id" if specified, and either "result" or "error".
+    """
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = [
+            executor.submit(_run, client, index, operation)
+            for index, operation in enumerate(operations)
+        ]
+        for future in futures:
+            yield future.result()
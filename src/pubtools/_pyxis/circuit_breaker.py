@@ -0,0 +1,167 @@
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from requests.exceptions import ConnectionError
+
+from .utils import endpoint_group
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of sending a request to an endpoint whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Circuit breaker of a single Pyxis endpoint.
+
+    The circuit opens after `failure_threshold` consecutive failed requests.
+    While it is open, requests fail fast with `CircuitOpenError`. After
+    `reset_timeout` seconds, a single probe request is let through (half-open):
+    its success closes the circuit, its failure opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initialize.
+
+        Args:
+            failure_threshold (int)
+                number of consecutive failures opening the circuit.
+            reset_timeout (float)
+                seconds to wait before probing an open circuit.
+            clock (function)
+                source of monotonic time in seconds.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_request(self, endpoint: str) -> None:
+        """
+        Check whether a request may be sent.
+
+        Args:
+            endpoint (str)
+                endpoint of the request, used in the error message.
+        Raises:
+            CircuitOpenError: if the circuit is open, or half-open with a probe
+                request already in flight.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            if self.state == OPEN and (
+                self.clock() - self._opened_at >= self.reset_timeout
+            ):
+                # let this request probe the endpoint
+                self.state = HALF_OPEN
+                return
+            raise CircuitOpenError(
+                "Circuit of Pyxis endpoint %s is open after %d failed requests"
+                % (endpoint, self.failures)
+            )
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful request."""
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+
+    def record_cancelled(self) -> None:
+        """
+        Forget a request whose outcome says nothing about the endpoint.
+
+        E.g. a request cut short by the deadline of its operation. A cancelled
+        probe lets the next request probe the half-open circuit.
+        """
+        with self._lock:
+            if self.state == HALF_OPEN:
+                # still past the reset timeout, so the next request probes
+                self.state = OPEN
+
+    def record_failure(self) -> None:
+        """Count a failed request, opening the circuit if there were too many."""
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self._opened_at = self.clock()
+
+
+class CircuitBreakers:
+    """Circuit breakers of Pyxis endpoints, shared by sessions of all threads.
+
+    Endpoints are grouped by the first segment of their path, e.g. all requests
+    to "signatures" and "signatures/id/<id>" share one circuit, while
+    "repositories/..." requests have their own.
+
+    Example:
+    ::
+
+        breakers = CircuitBreakers(endpoints={"signatures": {"failure_threshold": 10}})
+        client = PyxisClient("pyxis-server-url", circuit_breakers=breakers)
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        endpoints: Optional[dict[str, dict[str, Any]]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initialize.
+
+        Args:
+            failure_threshold (int)
+                default number of consecutive failures opening a circuit.
+            reset_timeout (float)
+                default seconds to wait before probing an open circuit.
+            endpoints (dict)
+                endpoint (first path segment, e.g. "signatures") -> dict of
+                `CircuitBreaker` arguments overriding the defaults for it.
+            clock (function)
+                source of monotonic time in seconds.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.endpoints = dict(endpoints or {})
+        self.clock = clock
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def for_endpoint(self, endpoint: str) -> CircuitBreaker:
+        """
+        Return the circuit breaker of an endpoint.
+
+        Args:
+            endpoint (str)
+                API specific endpoint of a request, e.g. "signatures?filter=...".
+        Returns:
+            CircuitBreaker: Breaker shared by all endpoints of the same group.
+        """
+        group = endpoint_group(endpoint)
+        with self._lock:
+            breaker = self._breakers.get(group)
+            if breaker is None:
+                options: dict[str, Any] = {
+                    "failure_threshold": self.failure_threshold,
+                    "reset_timeout": self.reset_timeout,
+                    "clock": self.clock,
+                }
+                options.update(self.endpoints.get(group, {}))
+                breaker = self._breakers[group] = CircuitBreaker(**options)
+            return breaker
@@ -0,0 +1,120 @@
+import gzip
+import json
+import threading
+import zlib
+from typing import Any, Optional
+
+ENCODINGS = ("gzip", "deflate")
+"Supported encodings of request bodies."
+
+
+class Compression:
+    """Compression of request bodies and negotiation of compressed responses.
+
+    JSON bodies of requests (e.g. uploaded signatures) at least `min_size` bytes
+    long are compressed with the given encoding, and responses are requested
+    compressed with gzip or deflate. Sizes before and after compression are
+    counted in both directions, shared by sessions of all threads.
+
+    Pyxis must accept compressed request bodies, as not all servers do.
+
+    Example:
+    ::
+
+        compression = Compression("gzip")
+        client = PyxisClient("pyxis-server-url", compression=compression)
+        client.upload_signatures(signatures)
+        print(compression.request_ratio, compression.response_ratio)
+    """
+
+    def __init__(self, encoding: str = "gzip", min_size: int = 1024, level: int = 6):
+        """
+        Initialize.
+
+        Args:
+            encoding (str)
+                encoding of request bodies, one of `ENCODINGS`.
+            min_size (int)
+                size of the smallest body worth compressing, in bytes.
+            level (int)
+                compression level from 1 (fastest) to 9 (smallest).
+        """
+        if encoding not in ENCODINGS:
+            raise ValueError(
+                "Unsupported encoding %r, expected one of: %s"
+                % (encoding, ", ".join(ENCODINGS))
+            )
+        self.encoding = encoding
+        self.min_size = min_size
+        self.level = level
+        self.accept_encoding = ", ".join(ENCODINGS)
+        self.request_bytes = 0
+        self.request_wire_bytes = 0
+        self.response_bytes = 0
+        self.response_wire_bytes = 0
+        self._lock = threading.Lock()
+
+    def encode(self, body: bytes) -> tuple[bytes, Optional[str]]:
+        """
+        Compress a request body, unless it is too small.
+
+        Args:
+            body (bytes)
+                body of the request.
+        Returns:
+            tuple: The body to send and its Content-Encoding, None if the body
+                isn't compressed.
+        """
+        if len(body) < self.min_size:
+            encoded, encoding = body, None
+        elif self.encoding == "gzip":
+            encoded, encoding = gzip.compress(body, self.level), "gzip"
+        else:
+            encoded, encoding = zlib.compress(body, self.level), "deflate"
+        with self._lock:
+            self.request_bytes += len(body)
+            self.request_wire_bytes += len(encoded)
+        return encoded, encoding
+
+    def compress_json(self, kwargs: dict[str, Any]) -> None:
+        """
+        Replace the JSON body of requests method arguments with an encoded one.
+
+        Args:
+            kwargs (dict)
+                arguments of the requests method, with the body in "json".
+        """
+        body, encoding = self.encode(json.dumps(kwargs.pop("json")).encode())
+        headers = dict(kwargs.get("headers") or {})
+        headers["Content-Type"] = "application/json"
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        kwargs["data"] = body
+        kwargs["headers"] = headers
+
+    def record_response(self, response: Any) -> None:
+        """
+        Count the sizes of a received response body.
+
+        Args:
+            response (requests.Response)
+                response whose body has been read.
+        """
+        wire_bytes = response.raw.tell()
+        with self._lock:
+            self.response_bytes += len(response.content)
+            self.response_wire_bytes += wire_bytes
+
+    @property
+    def request_ratio(self) -> Optional[float]:
+        """Ratio of sent request bytes to their uncompressed size."""
+        return _ratio(self.request_wire_bytes, self.request_bytes)
+
+    @property
+    def response_ratio(self) -> Optional[float]:
+        """Ratio of received response bytes to their decompressed size."""
+        return _ratio(self.response_wire_bytes, self.response_bytes)
+
+
+def _ratio(wire_bytes: int, total_bytes: int) -> Optional[float]:
+    return wire_bytes / total_bytes if total_bytes else None
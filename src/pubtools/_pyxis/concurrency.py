@@ -0,0 +1,110 @@
+import collections
+import threading
+import time
+from typing import Optional
+
+from .constants import DEFAULT_REQUEST_THREADS_LIMIT
+
+
+class AdaptiveConcurrency:
+    """Adaptive limit of parallel requests, using AIMD.
+
+    The limit grows additively, by about one request per round of `limit`
+    successful requests, and shrinks multiplicatively by `backoff_ratio` when a
+    request fails (connection error, 429 or a server error) or takes more than
+    `latency_tolerance` times the lowest recent latency, which is a sign of
+    requests queueing in Pyxis. Only requests started after the last decrease
+    can decrease the limit again, so that a burst of failures of requests sent
+    at once counts as one.
+
+    Example:
+    ::
+
+        client = PyxisClient(
+            "pyxis-server-url", concurrency=AdaptiveConcurrency(min_limit=2, max_limit=32)
+        )
+    """
+
+    def __init__(
+        self,
+        min_limit: int = 1,
+        max_limit: int = DEFAULT_REQUEST_THREADS_LIMIT,
+        initial_limit: Optional[int] = None,
+        backoff_ratio: float = 0.5,
+        latency_tolerance: float = 3.0,
+        window: int = 100,
+    ) -> None:
+        """
+        Initialize.
+
+        Args:
+            min_limit (int)
+                lowest number of parallel requests.
+            max_limit (int)
+                highest number of parallel requests, also the number of worker
+                threads of the client.
+            initial_limit (int)
+                number of parallel requests to start with, `min_limit` by default.
+            backoff_ratio (float)
+                factor applied to the limit when requests fail or slow down.
+            latency_tolerance (float)
+                multiple of the lowest recent latency considered a slowdown.
+            window (int)
+                number of recent latencies kept to find the lowest one.
+        """
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError("Limits must satisfy 1 <= min_limit <= max_limit")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.in_flight = 0
+        self._limit = float(min(max(initial_limit or min_limit, min_limit), max_limit))
+        self._latencies: collections.deque[float] = collections.deque(maxlen=window)
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests which may run in parallel."""
+        return int(self._limit)
+
+    def acquire(self) -> float:
+        """
+        Wait until another request may be sent.
+
+        Returns:
+            float: Start time of the request, to be passed to `release`.
+        """
+        with self._condition:
+            while self.in_flight >= self.limit:
+                self._condition.wait()
+            self.in_flight += 1
+            return time.monotonic()
+
+    def release(self, started: float, failed: bool) -> None:
+        """
+        Adapt the limit to the outcome of a finished request.
+
+        Args:
+            started (float)
+                start time returned by `acquire`.
+            failed (bool)
+                whether the request failed because of an overloaded or failing
+                Pyxis.
+        """
+        now = time.monotonic()
+        latency = now - started
+        with self._condition:
+            self.in_flight -= 1
+            slow = bool(self._latencies) and (
+                latency > self.latency_tolerance * min(self._latencies)
+            )
+            if not failed:
+                self._latencies.append(latency)
+            if (failed or slow) and started >= self._last_decrease:
+                self._limit = max(self._limit * self.backoff_ratio, self.min_limit)
+                self._last_decrease = now
+            elif not (failed or slow):
+                self._limit = min(self._limit + 1 / self._limit, self.max_limit)
+            self._condition.notify_all()
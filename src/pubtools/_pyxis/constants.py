@@ -1,5 +1,47 @@
-__all__ = ["DEFAULT_REQUEST_THREADS_LIMIT"]
+__all__ = [
+    "DEFAULT_REQUEST_THREADS_LIMIT",
+    "DEFAULT_CONNECT_TIMEOUT",
+    "DEFAULT_READ_TIMEOUT",
+    "RETRY_STATUSES",
+    "DISCARD_CHUNK_SIZE",
+    "PAGING_FIELDS",
+    "AUTO_PAGE_SIZE",
+    "MAX_PAGE_SIZE",
+    "INTERNAL_REGISTRY",
+    "PARTNER_REGISTRY",
+    "SCAN_QUEUE_PAGES",
+]
 
 
 DEFAULT_REQUEST_THREADS_LIMIT = 16
 "Maximum number of threads to use for parallel requests."
+
+DEFAULT_CONNECT_TIMEOUT = 30.0
+"Seconds to wait for a connection to Pyxis."
+
+DEFAULT_READ_TIMEOUT = 300.0
+"Seconds to wait for data from Pyxis, between bytes of a response."
+
+RETRY_STATUSES = frozenset(list(range(500, 512)) + [429])
+"Statuses of responses whose requests are retried."
+
+DISCARD_CHUNK_SIZE = 64 * 1024
+"Size of chunks read from response bodies which are discarded, in bytes."
+
+PAGING_FIELDS = ("page", "page_size", "total")
+"Fields of paginated responses, always included when selecting returned fields."
+
+AUTO_PAGE_SIZE = "auto"
+"Page size of paginated queries picking the largest page size Pyxis allows."
+
+MAX_PAGE_SIZE = 500
+"Largest page size of Pyxis queries, tried first by `AUTO_PAGE_SIZE`."
+
+INTERNAL_REGISTRY = "registry.access.redhat.com"
+"Registry of repositories, looked up first by `get_repository_metadata`."
+
+PARTNER_REGISTRY = "registry.connect.redhat.com"
+"Registry of partner repositories, looked up if not found in `INTERNAL_REGISTRY`."
+
+SCAN_QUEUE_PAGES = 2
+"Pages per shard fetched ahead of the caller by `scan_signatures`."
@@ -0,0 +1,478 @@
+import json
+import os
+import socket
+import socketserver
+import stat
+import tempfile
+import threading
+import time
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional, TYPE_CHECKING, Union
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .pyxis_client import PyxisClient
+    from .rsql import Expression
+
+DAEMON_SOCKET_ENV = "PUBTOOLS_PYXIS_DAEMON_SOCKET"
+"Environment variable overriding the daemon socket path. Empty value disables the daemon."
+
+PING_TIMEOUT = 1.0
+"Seconds to wait for the daemon to answer before running without it."
+
+CLIENT_ARGS = (
+    "pyxis_server",
+    "pyxis_insecure",
+    "pyxis_krb_principal",
+    "pyxis_krb_ktfile",
+    "pyxis_ssl_crtfile",
+    "pyxis_ssl_keyfile",
+    "pyxis_timeout",
+    "pyxis_deadline",
+    "pyxis_compression",
+    "pyxis_graphql_url",
+    "request_threads",
+    "adaptive_request_threads",
+    "schedule_retries",
+)
+"Entrypoint arguments forwarded to the daemon to set up its PyxisClient."
+
+PATH_ARGS = ("pyxis_krb_ktfile", "pyxis_ssl_crtfile", "pyxis_ssl_keyfile")
+"Arguments of `CLIENT_ARGS` holding file paths, forwarded as absolute paths."
+
+OPERATIONS = (
+    "get_operator_indices",
+    "get_repository_metadata",
+    "upload_signatures",
+    "get_container_signatures",
+    "delete_container_signatures",
+)
+"PyxisClient methods which may be called through the daemon."
+
+
+class DaemonError(Exception):
+    """Operation forwarded to the daemon failed."""
+
+
+def _fallback_directory() -> str:
+    return os.path.join(tempfile.gettempdir(), "pubtools-pyxis-%d" % os.getuid())
+
+
+def default_socket_path() -> str:
+    """
+    Return path of the daemon socket.
+
+    Returns:
+        str: Path from `PUBTOOLS_PYXIS_DAEMON_SOCKET` if set, otherwise a per-user
+        socket in `XDG_RUNTIME_DIR`, or in a private directory in the temporary
+        directory if `XDG_RUNTIME_DIR` is not set.
+    """
+    if DAEMON_SOCKET_ENV in os.environ:
+        return os.environ[DAEMON_SOCKET_ENV]
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "pubtools-pyxis-%d.sock" % os.getuid())
+    return os.path.join(_fallback_directory(), "daemon.sock")
+
+
+def _is_private(path: str, file_type: int) -> bool:
+    # owned by the current user and not accessible by anyone else
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    if stat.S_IFMT(st.st_mode) != file_type or st.st_uid != os.getuid():
+        return False
+    return not st.st_mode & 0o077
+
+
+def _send(
+    socket_path: str, request: dict[str, Any], timeout: Optional[float] = None
+) -> Any:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        with sock.makefile("rwb") as stream:
+            stream.write(json.dumps(request).encode() + b"\n")
+            stream.flush()
+            line = stream.readline()
+    if not line:
+        raise DaemonError("Daemon closed the connection")
+    response = json.loads(line)
+    if "error" in response:
+        raise DaemonError(response["error"])
+    return response["result"]
+
+
+def _answers(socket_path: str) -> bool:
+    # whether a daemon is serving the socket
+    try:
+        _send(socket_path, {"method": "ping"}, timeout=PING_TIMEOUT)
+    except (OSError, ValueError, DaemonError):
+        return False
+    return True
+
+
+class DaemonClient:
+    """Stand-in for PyxisClient forwarding operations to a running daemon."""
+
+    def __init__(self, socket_path: str, client_args: dict[str, Any]) -> None:
+        """
+        Initialize.
+
+        Args:
+            socket_path (str)
+                Path of the daemon socket.
+            client_args (dict)
+                Entrypoint arguments used by the daemon to set up its PyxisClient.
+        """
+        self.socket_path = socket_path
+        self.client_args = client_args
+
+    def _call(self, method: str, **kwargs: Any) -> Any:
+        # arguments are passed by name, so they don't depend on their order
+        return _send(
+            self.socket_path,
+            {"method": method, "kwargs": kwargs, "client": self.client_args},
+        )
+
+    def get_operator_indices(
+        self, ocp_versions_range: str, organization: Optional[str] = None
+    ) -> Any:
+        """See `PyxisClient.get_operator_indices`."""
+        return self._call(
+            "get_operator_indices",
+            ocp_versions_range=ocp_versions_range,
+            organization=organization,
+        )
+
+    def get_repository_metadata(
+        self,
+        repo_name: str,
+        custom_registry: Optional[str] = None,
+        only_internal: bool = False,
+        only_partner: bool = False,
+    ) -> Any:
+        """See `PyxisClient.get_repository_metadata`."""
+        return self._call(
+            "get_repository_metadata",
+            repo_name=repo_name,
+            custom_registry=custom_registry,
+            only_internal=only_internal,
+            only_partner=only_partner,
+        )
+
+    def upload_signatures(
+        self, signatures: list[Any], return_results: bool = True
+    ) -> Any:
+        """See `PyxisClient.upload_signatures`."""
+        # the deadline of the daemon's client applies
+        return self._call(
+            "upload_signatures", signatures=signatures, return_results=return_results
+        )
+
+    def get_container_signatures(
+        self,
+        manifest_digests: Optional[str] = None,
+        references: Optional[str] = None,
+        include: Optional[list[str]] = None,
+        page_size: Union[int, str, None] = None,
+        cursor: bool = False,
+        ranges: int = 1,
+        filter: Union["Expression", str, None] = None,
+    ) -> Any:
+        """See `PyxisClient.get_container_signatures`."""
+        # records and the deadline of the daemon's client are not forwarded
+        return self._call(
+            "get_container_signatures",
+            manifest_digests=manifest_digests,
+            references=references,
+            include=include,
+            page_size=page_size,
+            cursor=cursor,
+            ranges=ranges,
+            filter=None if filter is None else str(filter),
+        )
+
+    def delete_container_signatures(
+        self, signature_ids: list[str], return_results: bool = True
+    ) -> Any:
+        """See `PyxisClient.delete_container_signatures`."""
+        return self._call(
+            "delete_container_signatures",
+            signature_ids=signature_ids,
+            return_results=return_results,
+        )
+
+
+def connect(
+    args: Namespace, socket_path: Optional[str] = None
+) -> Optional[DaemonClient]:
+    """
+    Return a client of the running daemon, or None if no usable daemon is running.
+
+    The daemon is only used if its socket belongs to the current user and is not
+    accessible by others, if it answers within `PING_TIMEOUT` and if it doesn't
+    already serve a different Kerberos principal.
+
+    Args:
+        args (argparse.Namespace)
+            Arguments of the entrypoint.
+        socket_path (str)
+            Path of the daemon socket. See `default_socket_path` by default.
+    Returns:
+        DaemonClient: Client forwarding operations to the daemon, or None.
+    """
+    socket_path = socket_path if socket_path is not None else default_socket_path()
+    if not socket_path or not _is_private(socket_path, stat.S_IFSOCK):
+        return None
+    try:
+        status = _send(socket_path, {"method": "ping"}, timeout=PING_TIMEOUT)
+    except (OSError, ValueError, DaemonError):
+        # stale socket of a daemon which is gone, or a daemon which is stuck
+        return None
+    client_args = {
+        name: getattr(args, name) for name in CLIENT_ARGS if hasattr(args, name)
+    }
+    # the daemon runs in another working directory
+    for name in PATH_ARGS:
+        if client_args.get(name):
+            client_args[name] = os.path.abspath(client_args[name])
+    principal = client_args.get("pyxis_krb_principal")
+    if principal and status["principal"] not in (None, principal):
+        return None
+    return DaemonClient(socket_path, client_args)
+
+
+def stop(socket_path: Optional[str] = None) -> bool:
+    """
+    Ask the daemon listening on given socket to shut down.
+
+    Returns:
+        bool: Whether a daemon was running.
+    """
+    socket_path = socket_path or default_socket_path()
+    if not _is_private(socket_path, stat.S_IFSOCK):
+        return False
+    try:
+        _send(socket_path, {"method": "shutdown"}, timeout=PING_TIMEOUT)
+    except OSError:
+        return False
+    return True
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "_UnixServer"
+
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        try:
+            response = {"result": self.server.daemon.handle(json.loads(line))}
+        except Exception as e:
+            response = {"error": str(e)}
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    daemon: "PyxisDaemon"
+
+
+class _WarmClient:
+    """PyxisClient kept by the daemon with the number of operations using it."""
+
+    def __init__(self, client: "PyxisClient") -> None:
+        self.client = client
+        self.created = time.monotonic()
+        self.in_flight = 0
+        self.retired = False
+
+
+class PyxisDaemon:
+    """Local daemon keeping warm PyxisClient instances for entrypoint runs.
+
+    All clients share a single Kerberos ccache, as Kerberos authentication points
+    the process-wide `KRB5CCNAME` to it. Hence the daemon serves a single Kerberos
+    principal, the first one it's asked to use.
+    """
+
+    def __init__(
+        self,
+        socket_path: Optional[str] = None,
+        workers: int = 8,
+        client_ttl: float = 3600,
+        idle_timeout: float = 0,
+    ) -> None:
+        """
+        Initialize.
+
+        Args:
+            socket_path (str)
+                Path of the Unix socket to listen on. See `default_socket_path`.
+            workers (int)
+                Number of threads running forwarded operations. The threads are
+                kept alive, so are their sessions and connections.
+            client_ttl (float)
+                Seconds after which a client is replaced by a new one, renewing
+                its Kerberos ticket.
+            idle_timeout (float)
+                Seconds without running operations after which the daemon exits.
+                0 means never.
+        """
+        self.socket_path = socket_path or default_socket_path()
+        self.client_ttl = client_ttl
+        self.idle_timeout = idle_timeout
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.clients: dict[str, _WarmClient] = {}
+        self.principal: Optional[str] = None
+        self.ccache = tempfile.NamedTemporaryFile(prefix="pubtools-pyxis-ccache-")
+        self.last_request = time.monotonic()
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self._server: Optional[_UnixServer] = None
+
+    def _acquire_client(self, client_args: dict[str, Any]) -> _WarmClient:
+        from .pyxis_ops import create_pyxis_client
+
+        key = json.dumps(client_args, sort_keys=True)
+        principal = client_args.get("pyxis_krb_principal")
+        with self._lock:
+            if principal and self.principal not in (None, principal):
+                raise ValueError(
+                    "Daemon serves Kerberos principal %s only" % self.principal
+                )
+            warm = self.clients.get(key)
+            if warm is None or time.monotonic() - warm.created >= self.client_ttl:
+                if warm is not None:
+                    self._retire(warm)
+                args = Namespace(**{name: None for name in CLIENT_ARGS})
+                vars(args).update(client_args)
+                if args.request_threads is None:
+                    del args.request_threads
+                warm = _WarmClient(
+                    create_pyxis_client(args, self.ccache.name, reuse_threads=True)
+                )
+                self.clients[key] = warm
+                self.principal = self.principal or principal
+            warm.in_flight += 1
+            return warm
+
+    def _release_client(self, warm: _WarmClient) -> None:
+        with self._lock:
+            warm.in_flight -= 1
+            self._close_retired(warm)
+
+    def _retire(self, warm: _WarmClient) -> None:
+        # replaced clients are closed once their operations finish
+        warm.retired = True
+        self._close_retired(warm)
+
+    def _close_retired(self, warm: _WarmClient) -> None:
+        if warm.retired and not warm.in_flight:
+            warm.client.close()
+
+    def handle(self, request: dict[str, Any]) -> Any:
+        """
+        Run a request received from an entrypoint.
+
+        Args:
+            request (dict)
+                Request with the "method" to call, its "args" and "kwargs" and
+                the "client" arguments of the entrypoint.
+        Returns:
+            Result of the PyxisClient method.
+        """
+        method = request.get("method")
+        if method == "ping":
+            return {"principal": self.principal}
+        if method == "shutdown":
+            threading.Thread(target=self.shutdown).start()
+            return "bye"
+        if method not in OPERATIONS:
+            raise ValueError("Unsupported operation: %s" % method)
+        with self._lock:
+            self.in_flight += 1
+        try:
+            warm = self._acquire_client(request["client"])
+            try:
+                return self.executor.submit(
+                    getattr(warm.client, method),
+                    *request.get("args", []),
+                    **request.get("kwargs", {}),
+                ).result()
+            finally:
+                self._release_client(warm)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.last_request = time.monotonic()
+
+    def start(self) -> None:
+        """
+        Bind the socket, accessible only by the current user.
+
+        Raises:
+            DaemonError: If another daemon is serving the socket.
+        """
+        directory = os.path.dirname(self.socket_path)
+        if directory == _fallback_directory():
+            if not os.path.exists(directory):
+                os.mkdir(directory, 0o700)
+            if not _is_private(directory, stat.S_IFDIR):
+                raise DaemonError("Directory %s is not private" % directory)
+        if os.path.exists(self.socket_path):
+            st = os.lstat(self.socket_path)
+            if stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid():
+                if _answers(self.socket_path):
+                    raise DaemonError("Daemon already running on %s" % self.socket_path)
+                # left behind by a daemon which didn't exit cleanly
+                os.unlink(self.socket_path)
+        old_umask = os.umask(0o177)
+        try:
+            self._server = _UnixServer(self.socket_path, _Handler)
+        finally:
+            os.umask(old_umask)
+        self._server.daemon = self
+
+    def serve_forever(self) -> None:
+        """Serve requests until `shutdown()` or the idle timeout."""
+        if self._server is None:
+            self.start()
+        if self.idle_timeout:
+            threading.Thread(target=self._watch_idle, daemon=True).start()
+        assert self._server is not None
+        try:
+            self._server.serve_forever(poll_interval=0.1)
+        finally:
+            self._close()
+
+    def _is_idle(self) -> bool:
+        with self._lock:
+            if self.in_flight:
+                return False
+            return time.monotonic() - self.last_request > self.idle_timeout
+
+    def _watch_idle(self) -> None:
+        while self._server is not None:
+            if self._is_idle():
+                self.shutdown()
+                return
+            time.sleep(min(self.idle_timeout, 1.0))
+
+    def shutdown(self) -> None:
+        """Stop serving requests."""
+        if self._server is not None:
+            self._server.shutdown()
+
+    def _close(self) -> None:
+        server, self._server = self._server, None
+        if server is not None:
+            server.server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.executor.shutdown()
+        with self._lock:
+            for warm in self.clients.values():
+                warm.client.close()
+            self.clients = {}
+        self.ccache.close()
@@ -0,0 +1,122 @@
+import contextlib
+import contextvars
+import time
+from typing import Any, Iterator, Optional, Union
+
+from requests.exceptions import Timeout
+from urllib3.util.retry import Retry
+
+RequestTimeout = Union[float, tuple[float, float]]
+"Timeout of a request: seconds, or (connect, read) seconds."
+
+_expires: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "pyxis_deadline", default=None
+)
+
+
+class DeadlineExceeded(Timeout):
+    """Raised when the deadline of an operation passes before its requests finish."""
+
+
+def expiry(seconds: Optional[float]) -> Optional[float]:
+    """
+    Return the monotonic time at which a deadline starting now expires.
+
+    Args:
+        seconds (float)
+            Length of the deadline, None for no deadline.
+    Returns:
+        float: Monotonic time of expiry, or None.
+    """
+    return None if seconds is None else time.monotonic() + seconds
+
+
+@contextlib.contextmanager
+def until(expires: Optional[float]) -> Iterator[None]:
+    """
+    Limit requests sent within the context to the given time of expiry.
+
+    Nested deadlines can only shorten the current one. The deadline is carried
+    to worker threads whose tasks run in a copy of the current context.
+
+    Args:
+        expires (float)
+            Monotonic time of expiry, see `expiry`. None keeps the current one.
+    """
+    current = _expires.get()
+    if expires is None or (current is not None and current <= expires):
+        yield
+        return
+    token = _expires.set(expires)
+    try:
+        yield
+    finally:
+        _expires.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Return seconds until the current deadline expires, None without deadline."""
+    expires = _expires.get()
+    return None if expires is None else expires - time.monotonic()
+
+
+def check(cause: Optional[BaseException] = None) -> None:
+    """
+    Raise `DeadlineExceeded` if the current deadline has expired.
+
+    Args:
+        cause (Exception)
+            Error of a request caused by the expiry, chained to the raised one.
+    """
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded("Deadline of the Pyxis operation exceeded") from cause
+
+
+def request_timeout(timeout: RequestTimeout) -> RequestTimeout:
+    """
+    Shorten a request timeout so that the request ends by the current deadline.
+
+    Args:
+        timeout (float or tuple)
+            Timeout of the request: seconds, or (connect, read) seconds.
+    Returns:
+        Timeout no longer than the time remaining until the deadline.
+    Raises:
+        DeadlineExceeded: If the deadline has already expired.
+    """
+    check()
+    left = remaining()
+    if left is None:
+        return timeout
+    if isinstance(timeout, tuple):
+        return (min(timeout[0], left), min(timeout[1], left))
+    return min(timeout, left)
+
+
+class DeadlineRetry(Retry):
+    """Retry policy which doesn't wait or retry past the current deadline."""
+
+    def is_exhausted(self) -> bool:
+        """Whether no more attempts are left, or the deadline has expired."""
+        left = remaining()
+        return super().is_exhausted() or (left is not None and left <= 0)
+
+    def get_backoff_time(self) -> float:
+        """Return the backoff time, cut to the time remaining until the deadline."""
+        return _capped(super().get_backoff_time())
+
+    def get_retry_after(self, response: Any) -> Optional[float]:
+        """Return the time requested by Retry-After, cut to the remaining time."""
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else _capped(retry_after)
+
+    def sleep(self, response: Any = None) -> None:
+        """Wait before the next attempt, unless the deadline expires meanwhile."""
+        super().sleep(response)
+        check()
+
+
+def _capped(seconds: float) -> float:
+    left = remaining()
+    return seconds if left is None else max(min(seconds, left), 0)
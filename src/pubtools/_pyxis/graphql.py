@@ -0,0 +1,177 @@
+import json
+from typing import Any, Iterable, Optional
+
+from requests import Response
+from requests.exceptions import HTTPError
+
+REPOSITORY_FIELDS = (
+    "_id",
+    "registry",
+    "repository",
+    "published",
+    "release_categories",
+    "build_categories",
+    "auto_rebuild_tags",
+    "content_sets",
+    "non_production_only",
+    "protected_for_pull",
+    "protected_for_search",
+    "requires_terms",
+    "source_container_image_enabled",
+)
+"Fields of repository metadata selected by GraphQL queries by default."
+
+MAX_BATCH_SIZE = 50
+"Largest number of queries sent in one GraphQL request."
+
+
+class GraphQLError(HTTPError):
+    """Error of a GraphQL request, or of one of its queries.
+
+    As errors of REST requests, errors of queries have a `response` with their
+    HTTP status, so that e.g. ``e.response.status_code == 404`` holds for
+    repositories not found with both.
+
+    Attributes:
+        status (int): HTTP status of the failed query (e.g. 404), None for errors
+            of the whole request.
+    """
+
+    def __init__(self, message: str, status: Optional[int] = None) -> None:
+        """
+        Initialize.
+
+        Args:
+            message (str)
+                description of the error.
+            status (int)
+                HTTP status of the failed query.
+        """
+        response = None
+        if status is not None:
+            response = Response()
+            response.status_code = status
+        super().__init__(message, response=response)
+        self.status = status
+
+
+class GraphQLQuery:
+    """Several Pyxis GraphQL queries sent in one request.
+
+    Every query added is given an alias, under which its result is returned, so
+    the same query can be sent many times with different arguments (e.g. one per
+    repository or page). Results of Pyxis queries hold their "data" and "error",
+    and paging fields for paginated queries.
+
+    Example:
+    ::
+
+        query = GraphQLQuery()
+        alias = query.add(
+            "get_repository_by_registry_path",
+            {"registry": "registry.access.redhat.com", "repository": "ns/repo"},
+            ["_id", "published"],
+        )
+        response = session.post(graphql_url, json=query.payload())
+        result = query.results(response.json())[alias]
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._queries: list[str] = []
+
+    def __len__(self) -> int:
+        """Return the number of queries."""
+        return len(self._queries)
+
+    def add(self, name: str, arguments: dict[str, Any], fields: Iterable[str]) -> str:
+        """
+        Add a query.
+
+        Args:
+            name (str)
+                name of the query, e.g. "find_signatures".
+            arguments (dict)
+                arguments of the query. None values are left out.
+            fields (list)
+                fields selected from the result, dotted for nested fields (e.g.
+                "data.repository").
+        Returns:
+            str: Alias of the result of the query.
+        """
+        alias = "q%d" % len(self._queries)
+        args = ", ".join(
+            "%s: %s" % (key, _literal(value))
+            for key, value in arguments.items()
+            if value is not None
+        )
+        self._queries.append(
+            "%s: %s%s %s"
+            % (alias, name, "(%s)" % args if args else "", _selection(fields))
+        )
+        return alias
+
+    def payload(self) -> dict[str, str]:
+        """Return the JSON body of the request."""
+        return {"query": "{%s}" % " ".join(self._queries)}
+
+    def results(self, body: dict[str, Any]) -> dict[str, Any]:
+        """
+        Return results of the queries from the body of a response.
+
+        Args:
+            body (dict)
+                decoded body of the response.
+        Returns:
+            dict: Result of every query by its alias.
+        Raises:
+            GraphQLError: If the request failed as a whole.
+        """
+        errors = body.get("errors")
+        if errors:
+            raise GraphQLError("; ".join(error["message"] for error in errors))
+        return body["data"]  # type: ignore[no-any-return]
+
+
+def check_result(result: dict[str, Any]) -> Any:
+    """
+    Return data of a query result, raising its error.
+
+    Args:
+        result (dict)
+            result of a Pyxis query, with "data" and "error".
+    Returns:
+        Data of the result.
+    Raises:
+        GraphQLError: If the query failed.
+    """
+    error = result.get("error")
+    if error:
+        raise GraphQLError(error.get("detail") or str(error), error.get("status"))
+    return result.get("data")
+
+
+def _literal(value: Any) -> str:
+    """Render a value as a GraphQL literal."""
+    if isinstance(value, dict):
+        return "{%s}" % ", ".join(
+            "%s: %s" % (key, _literal(item)) for key, item in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return "[%s]" % ", ".join(_literal(item) for item in value)
+    # strings, numbers, booleans and null are written as in JSON
+    return json.dumps(value)
+
+
+def _selection(fields: Iterable[str]) -> str:
+    """Render a selection set of dotted field paths."""
+    nested: dict[str, list[str]] = {}
+    for field in fields:
+        name, _, rest = field.partition(".")
+        subfields = nested.setdefault(name, [])
+        if rest:
+            subfields.append(rest)
+    return "{%s}" % " ".join(
+        name + (" " + _selection(subfields) if subfields else "")
+        for name, subfields in nested.items()
+    )
@@ -0,0 +1,162 @@
+import collections
+import contextvars
+import math
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from typing import Any, Callable, Optional
+
+from .constants import DEFAULT_REQUEST_THREADS_LIMIT
+from .utils import endpoint_group
+
+
+class Hedging:
+    """Hedging of idempotent GET requests against slow responses.
+
+    Requests are sent from worker threads. If a request gets no response within
+    the `percentile` of recent latencies of its endpoint group, a duplicate
+    request is sent and the first successful response of the two is used. The
+    `budget` caps duplicate requests to a fraction of all requests, so that
+    hedging doesn't overload a slow Pyxis. Latencies are tracked per endpoint
+    group (e.g. "signatures", "repositories"), and requests are not hedged until
+    `min_samples` latencies of their group are known.
+
+    Example:
+    ::
+
+        client = PyxisClient("pyxis-server-url", hedging=Hedging(budget=0.02))
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        budget: float = 0.05,
+        min_samples: int = 20,
+        window: int = 200,
+        threads: int = DEFAULT_REQUEST_THREADS_LIMIT,
+    ) -> None:
+        """
+        Initialize.
+
+        Args:
+            percentile (float)
+                percentile of recent latencies after which a request is hedged.
+            budget (float)
+                largest fraction of requests which may be duplicated.
+            min_samples (int)
+                number of latencies of an endpoint group to collect before its
+                requests are hedged.
+            window (int)
+                number of recent latencies kept per endpoint group.
+            threads (int)
+                the number of worker threads sending hedged requests.
+        """
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.window = window
+        self.threads = threads
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._latencies: dict[str, collections.deque[float]] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def delay(self, endpoint: str) -> Optional[float]:
+        """
+        Return seconds after which requests to the endpoint are hedged.
+
+        Args:
+            endpoint (str)
+                API specific endpoint of a request.
+        Returns:
+            float: The percentile of recent latencies of the endpoint group, or
+                None if too few latencies are known.
+        """
+        with self._lock:
+            latencies = sorted(self._latencies.get(endpoint_group(endpoint), ()))
+        if len(latencies) < max(self.min_samples, 1):
+            return None
+        rank = math.ceil(self.percentile / 100 * len(latencies))
+        return latencies[min(max(rank, 1), len(latencies)) - 1]
+
+    def record(self, endpoint: str, latency: float) -> None:
+        """
+        Record the latency of a completed request.
+
+        Args:
+            endpoint (str)
+                API specific endpoint of the request.
+            latency (float)
+                seconds it took to get the response.
+        """
+        group = endpoint_group(endpoint)
+        with self._lock:
+            latencies = self._latencies.get(group)
+            if latencies is None:
+                latencies = self._latencies[group] = collections.deque(
+                    maxlen=self.window
+                )
+            latencies.append(latency)
+
+    def run(self, endpoint: str, send: Callable[[], Any]) -> Any:
+        """
+        Send a request, hedging it if it is slower than usual.
+
+        Args:
+            endpoint (str)
+                API specific endpoint of the request.
+            send (function)
+                function sending the request, called from worker threads. May be
+                called twice, so it must be idempotent.
+        Returns:
+            The first successful result of `send`.
+        """
+        delay = self.delay(endpoint)
+        with self._lock:
+            self.requests += 1
+        primary = self._submit(endpoint, send)
+        if delay is None or wait([primary], timeout=delay).done:
+            return primary.result()
+
+        with self._lock:
+            within_budget = self.hedges + 1 <= self.budget * self.requests
+            if within_budget:
+                self.hedges += 1
+        if not within_budget:
+            return primary.result()
+
+        hedge = self._submit(endpoint, send)
+        for future in as_completed([primary, hedge]):
+            if future.exception() is None:
+                if future is hedge:
+                    with self._lock:
+                        self.hedge_wins += 1
+                return future.result()
+        return primary.result()
+
+    def _submit(self, endpoint: str, send: Callable[[], Any]) -> "Future[Any]":
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.threads, thread_name_prefix="pyxis-hedging"
+                )
+            executor = self._executor
+        # worker threads don't inherit the context of the current span
+        return executor.submit(
+            contextvars.copy_context().run, self._timed, endpoint, send
+        )
+
+    def _timed(self, endpoint: str, send: Callable[[], Any]) -> Any:
+        start = time.monotonic()
+        result = send()
+        self.record(endpoint, time.monotonic() - start)
+        return result
+
+    def close(self) -> None:
+        """Stop the worker threads."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
@@ -0,0 +1,190 @@
+import itertools
+import json
+import sqlite3
+from typing import Any, Iterable, Iterator, Optional
+
+from .pyxis_client import PyxisClient
+from .records import SignatureRecord
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS signatures (
+    _id TEXT PRIMARY KEY,
+    manifest_digest TEXT,
+    reference TEXT,
+    last_update_date TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS signatures_manifest_digest ON signatures (manifest_digest);
+CREATE INDEX IF NOT EXISTS signatures_reference ON signatures (reference);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_CHUNK_SIZE = 500
+# stays below the limit of SQLite variables in a statement
+_QUERY_CHUNK_SIZE = 500
+
+
+class SignatureMirror:
+    """Local SQLite mirror of container signatures stored in Pyxis.
+
+    The first `refresh` fetches all signatures. Following ones fetch only
+    signatures updated since the latest `last_update_date` seen, so they don't
+    notice signatures deleted in Pyxis; a full refresh replaces the mirror
+    content.
+
+    Example:
+    ::
+
+        with SignatureMirror("/var/cache/signatures.db", client) as mirror:
+            mirror.refresh()
+            signatures = mirror.get_container_signatures(manifest_digests)
+
+    A mirror, like its SQLite connection, may only be used by the thread which
+    created it.
+    """
+
+    def __init__(self, path: str, client: Optional[PyxisClient] = None) -> None:
+        """
+        Initialize.
+
+        Args:
+            path (str)
+                Path of the SQLite database, created if it doesn't exist.
+            client (PyxisClient)
+                Client fetching signatures from Pyxis. Only needed for `refresh`.
+        """
+        self.client = client
+        self._db = sqlite3.connect(path)
+        self._db.executescript(_SCHEMA)
+
+    @property
+    def last_update_date(self) -> Optional[str]:
+        """Return the latest `last_update_date` of mirrored signatures."""
+        row = self._db.execute(
+            "SELECT value FROM sync_state WHERE key = 'last_update_date'"
+        ).fetchone()
+        return row[0] if row else None
+
+    def refresh(self, full: bool = False) -> int:
+        """
+        Fetch new and updated signatures from Pyxis.
+
+        The mirror is updated in a single transaction, so it keeps its previous
+        content if fetching fails.
+
+        Args:
+            full (bool)
+                Fetch all signatures and drop mirrored signatures which are no
+                longer in Pyxis, instead of fetching only updated signatures.
+        Returns:
+            int: Number of fetched signatures.
+        """
+        if self.client is None:
+            raise ValueError("A PyxisClient is required to refresh the mirror")
+        since = None if full else self.last_update_date
+        signatures = self.client.iter_container_signatures(updated_since=since)
+
+        fetched = 0
+        latest = since
+        with self._db:
+            if since is None:
+                self._db.execute("DELETE FROM signatures")
+            for chunk in _chunks(signatures, _CHUNK_SIZE):
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO signatures VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (
+                            s["_id"],
+                            s.get("manifest_digest"),
+                            s.get("reference"),
+                            s.get("last_update_date"),
+                            json.dumps(s),
+                        )
+                        for s in chunk
+                    ],
+                )
+                fetched += len(chunk)
+                for signature in chunk:
+                    date = signature.get("last_update_date")
+                    if date and (latest is None or date > latest):
+                        latest = date
+            self._db.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES ('last_update_date', ?)",
+                (latest,),
+            )
+        return fetched
+
+    def get_container_signatures(
+        self,
+        manifest_digests: Optional[str] = None,
+        references: Optional[str] = None,
+        as_records: bool = False,
+    ) -> list[Any]:
+        """Get a list of mirrored signature metadata matching given fields.
+
+        See `PyxisClient.get_container_signatures`. Without any fields, all
+        mirrored signatures are returned.
+
+        Args:
+            manifest_digests (comma separated str)
+                manifest_digest used for searching in signatures.
+            references (comma separated str)
+                pull reference for image of signature stored.
+            as_records (bool)
+                return compact `SignatureRecord` objects instead of dictionaries.
+
+        Returns:
+            list: List of signature metadata matching given fields.
+        """
+        if not (manifest_digests or references):
+            rows: Iterable[tuple[str, str]] = self._db.execute(
+                "SELECT _id, data FROM signatures ORDER BY rowid"
+            )
+        else:
+            rows = itertools.chain(
+                self._select("manifest_digest", manifest_digests),
+                self._select("reference", references),
+            )
+
+        matching: dict[str, Any] = {}
+        for signature_id, data in rows:
+            if signature_id not in matching:
+                signature = json.loads(data)
+                matching[signature_id] = (
+                    SignatureRecord.from_dict(signature) if as_records else signature
+                )
+        return list(matching.values())
+
+    def _select(self, field: str, values: Optional[str]) -> Iterator[tuple[str, str]]:
+        if not values:
+            return
+        for chunk in _chunks(values.split(","), _QUERY_CHUNK_SIZE):
+            yield from self._db.execute(
+                "SELECT _id, data FROM signatures WHERE {0} IN ({1}) "
+                "ORDER BY rowid".format(field, ",".join("?" * len(chunk))),
+                chunk,
+            )
+
+    def close(self) -> None:
+        """Close the database."""
+        self._db.close()
+
+    def __enter__(self) -> "SignatureMirror":
+        """Return the mirror."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Close the database."""
+        self.close()
+
+
+def _chunks(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
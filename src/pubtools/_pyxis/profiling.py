@@ -0,0 +1,227 @@
+import contextlib
+import cProfile
+import json
+import pstats
+import sys
+import threading
+import time
+from typing import Any, Iterator, Optional
+
+IMPORT_START = time.perf_counter()
+"Time when the package started to be imported by an entrypoint."
+
+SPAN_CATEGORIES = {
+    "pyxis.auth": "auth",
+    "pyxis.http": "network",
+    "pyxis.decode": "serialization",
+}
+"Categories of the wall-clock breakdown recorded from client spans."
+
+# cProfile uses sys.monitoring since Python 3.12, which sees all threads and
+# allows a single enabled profiler
+_PROFILES_ALL_THREADS = sys.version_info >= (3, 12)
+
+
+class _TimingSpan:
+    """Span measuring its own wall-clock duration."""
+
+    def __init__(self, profile: "PyxisProfile", name: str, attributes: Any) -> None:
+        self.profile = profile
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.start = 0.0
+
+    def __enter__(self) -> "_TimingSpan":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        category = SPAN_CATEGORIES.get(self.name)
+        if category:
+            self.profile.record(
+                category, time.perf_counter() - self.start, self.attributes
+            )
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Store the attribute, reported with per-request network times."""
+        self.attributes[key] = value
+
+
+class PyxisProfile:
+    """cProfile dump and wall-clock breakdown of a single entrypoint run.
+
+    Threads started while profiling (e.g. worker threads of parallel requests)
+    are profiled too, and their stats merged into the dump.
+
+    The instance also acts as a tracer for `PyxisTracing`, so the client reports
+    auth, network and serialization times through its spans.
+    """
+
+    def __init__(self, path: str, import_time: float = 0.0) -> None:
+        """
+        Initialize.
+
+        Args:
+            path (str)
+                Path of the cProfile dump. The breakdown is written next to it
+                with a ".breakdown.json" suffix.
+            import_time (float)
+                Seconds spent importing the entrypoint modules.
+        """
+        self.path = path
+        self.import_time = import_time
+        self.started = time.perf_counter()
+        self.timings: dict[str, list[float]] = {}
+        self.requests: list[dict[str, Any]] = []
+        self.profiler = cProfile.Profile()
+        self.thread_profilers: list[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start profiling the current thread and threads started from now on."""
+        self.profiler.enable()
+        if not _PROFILES_ALL_THREADS:
+            threading.setprofile(self._profile_thread)
+
+    def stop(self) -> None:
+        """Stop profiling."""
+        if not _PROFILES_ALL_THREADS:
+            threading.setprofile(None)
+        self.profiler.disable()
+
+    def _profile_thread(self, *args: Any) -> None:  # pragma: no cover
+        # called by the first event of a new thread, replaced by its profiler;
+        # coverage doesn't see code run as a profile function
+        profiler = cProfile.Profile()
+        with self._lock:
+            self.thread_profilers.append(profiler)
+        profiler.enable()
+
+    def start_as_current_span(self, name: str, attributes: Any = None) -> _TimingSpan:
+        """Start a span timing a client step, see `PyxisTracing`."""
+        return _TimingSpan(self, name, attributes)
+
+    def record(
+        self, category: str, seconds: float, attributes: Optional[dict[str, Any]] = None
+    ) -> None:
+        """
+        Add a measured duration to the breakdown.
+
+        Args:
+            category (str)
+                Category of the breakdown, e.g. "network".
+            seconds (float)
+                Measured wall-clock time.
+            attributes (dict)
+                Span attributes, kept for network requests.
+        """
+        with self._lock:
+            self.timings.setdefault(category, []).append(seconds)
+            if category == "network":
+                request = {"seconds": seconds}
+                request.update(attributes or {})
+                self.requests.append(request)
+
+    @contextlib.contextmanager
+    def timed(self, category: str) -> Iterator[None]:
+        """Measure wall-clock time of the block in given category."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(category, time.perf_counter() - start)
+
+    def breakdown(self) -> dict[str, Any]:
+        """
+        Summarize measured times.
+
+        Returns:
+            dict: Total wall time, import time, per-category totals and
+            per-request network times.
+        """
+        with self._lock:
+            categories = {
+                category: {
+                    "count": len(times),
+                    "total": sum(times),
+                    "max": max(times),
+                }
+                for category, times in self.timings.items()
+            }
+            requests = list(self.requests)
+        return {
+            "wall_time": self.import_time + time.perf_counter() - self.started,
+            "import": self.import_time,
+            "categories": categories,
+            "requests": requests,
+        }
+
+    def write(self) -> None:
+        """Stop profiling, write the cProfile dump and the breakdown."""
+        self.stop()
+        stats = pstats.Stats(self.profiler)
+        with self._lock:
+            thread_profilers = list(self.thread_profilers)
+        for profiler in thread_profilers:
+            # stats of threads which are still running are taken as they are
+            profiler.create_stats()
+            if profiler.stats:
+                stats.add(profiler)
+        stats.dump_stats(self.path)
+        with open(self.path + ".breakdown.json", "w") as f:
+            json.dump(self.breakdown(), f, sort_keys=True, indent=4)
+
+
+_imported_at: Optional[float] = None
+_active: Optional[PyxisProfile] = None
+
+
+def mark_imported() -> None:
+    """Record that imports of the entrypoint modules have finished."""
+    global _imported_at
+    _imported_at = time.perf_counter()
+
+
+def enable(path: Optional[str]) -> Optional[PyxisProfile]:
+    """
+    Start profiling the current entrypoint run if a path is specified.
+
+    The profile is written when the enclosing `session` ends.
+
+    Args:
+        path (str)
+            Path of the cProfile dump, or None to keep profiling disabled.
+    Returns:
+        PyxisProfile: Active profile, or None.
+    """
+    global _active
+    if not path:
+        return None
+    import_time = (_imported_at or IMPORT_START) - IMPORT_START
+    _active = PyxisProfile(path, import_time)
+    _active.start()
+    return _active
+
+
+def active() -> Optional[PyxisProfile]:
+    """Return profile of the current entrypoint run, if enabled."""
+    return _active
+
+
+@contextlib.contextmanager
+def session() -> Iterator[None]:
+    """Write the profile enabled within the block, if any, once it ends."""
+    global _active
+    try:
+        yield
+    finally:
+        if _active is not None:
+            profile, _active = _active, None
+            profile.write()
+
+
+def timed(category: str) -> Any:
+    """Measure wall-clock time of a block if profiling is enabled."""
+    if _active is None:
+        return contextlib.nullcontext()
+    return _active.timed(category)
@@ -1,10 +1,12 @@
 import os
 import subprocess
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 
-from requests_kerberos import HTTPKerberosAuth, OPTIONAL
+if TYPE_CHECKING:  # pragma: no cover
+    # imported lazily, only Kerberos authentication needs them
+    from requests_kerberos import HTTPKerberosAuth
 
-from .pyxis_session import PyxisSession
+    from .pyxis_session import PyxisSession
 
 
 class PyxisAuth:
@@ -14,7 +16,7 @@ class PyxisAuth:
         """Initialize."""
         raise NotImplementedError  # pragma: no cover"
 
-    def apply_to_session(self, pyxis_session: PyxisSession) -> None:
+    def apply_to_session(self, pyxis_session: "PyxisSession") -> None:
         """Set up initialization in the Pyxis session."""
         raise NotImplementedError  # pragma: no cover"
 
@@ -36,7 +38,7 @@ class PyxisSSLAuth(PyxisAuth):
         self.crt_path = crt_path
         self.key_path = key_path
 
-    def apply_to_session(self, pyxis_session: PyxisSession) -> None:
+    def apply_to_session(self, pyxis_session: "PyxisSession") -> None:
         """
         Set up PyxisSession with SSL auth.
 
@@ -75,7 +77,9 @@ class PyxisKrbAuth(PyxisAuth):
         self.ktfile = ktfile
         self.ccache_file = ccache_file
 
-    def _krb_auth(self) -> HTTPKerberosAuth:
+    def _krb_auth(self) -> "HTTPKerberosAuth":
+        from requests_kerberos import HTTPKerberosAuth, OPTIONAL
+
         retcode = subprocess.Popen(
             ["klist", "-s"], stdout=subprocess.PIPE, stderr=subprocess.PIPE
         ).wait()
@@ -111,7 +115,7 @@ class PyxisKrbAuth(PyxisAuth):
             force_preemptive=True,
         )
 
-    def apply_to_session(self, pyxis_session: PyxisSession) -> None:
+    def apply_to_session(self, pyxis_session: "PyxisSession") -> None:
         """Set up PyxisSession with Kerberos auth.
 
         Args:
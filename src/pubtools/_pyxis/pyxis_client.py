@@ -1,17 +1,56 @@
 from __future__ import division
-from concurrent.futures import as_completed
+from concurrent.futures import FIRST_COMPLETED, wait
+import contextlib
+import contextvars
 from functools import partial
+import itertools
 import math
+import queue
 import threading
-from typing import Callable, Any, Optional, Union
+import time
+from typing import Callable, Any, Generator, Iterable, Iterator, Optional, Union
+from urllib.parse import quote
 
-from more_executors import Executors
-from requests.exceptions import HTTPError
+from requests.exceptions import HTTPError, RequestException
 from requests import Response
 
-from .constants import DEFAULT_REQUEST_THREADS_LIMIT
+from .circuit_breaker import CircuitBreakers
+from .compression import Compression
+from .concurrency import AdaptiveConcurrency
+from .constants import (
+    AUTO_PAGE_SIZE,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_REQUEST_THREADS_LIMIT,
+    DISCARD_CHUNK_SIZE,
+    INTERNAL_REGISTRY,
+    MAX_PAGE_SIZE,
+    PAGING_FIELDS,
+    PARTNER_REGISTRY,
+    SCAN_QUEUE_PAGES,
+)
+from .deadline import DeadlineExceeded, RequestTimeout, expiry, until
+from .graphql import (
+    MAX_BATCH_SIZE,
+    REPOSITORY_FIELDS,
+    GraphQLError,
+    GraphQLQuery,
+    check_result,
+)
+from .hedging import Hedging
 from .pyxis_session import PyxisSession
 from .pyxis_authentication import PyxisAuth
+from .records import SIGNATURE_FIELDS, SignatureRecord
+from .rsql import And, Expression, Or, SignatureFields, as_expression
+from .retry_scheduler import DelayedQueue, RetryScheduler, ScheduledRetry
+from .singleflight import SingleFlight, coalesced
+from .tracing import NO_TRACING, PyxisTracing, traced
+
+PageSize = Union[int, str, None]
+"Page size of paginated queries: number of records, `AUTO_PAGE_SIZE` or None."
+
+IdRange = tuple[Optional[str], Optional[str]]
+"Lowest `_id` (inclusive) and highest `_id` (exclusive), None for no limit."
 
 
 class PyxisClient:
@@ -25,6 +64,17 @@ class PyxisClient:
         backoff_factor: int = 5,
         verify: bool = True,
         threads: int = DEFAULT_REQUEST_THREADS_LIMIT,
+        tracing: Optional[PyxisTracing] = None,
+        reuse_threads: bool = False,
+        coalesce_requests: bool = True,
+        circuit_breakers: Optional[CircuitBreakers] = None,
+        hedging: Optional[Hedging] = None,
+        timeout: RequestTimeout = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT),
+        deadline: Optional[float] = None,
+        compression: Optional[Compression] = None,
+        concurrency: Optional[AdaptiveConcurrency] = None,
+        schedule_retries: bool = False,
+        graphql_url: Optional[str] = None,
     ) -> None:
         """
         Initialize.
@@ -42,17 +92,78 @@ class PyxisClient:
                 enable/disable SSL CA verification.
             threads (int)
                 the number of threads to use for parallel requests.
+            tracing (PyxisTracing)
+                tracing of client operations and HTTP requests. Disabled if not
+                specified.
+            reuse_threads (bool)
+                keep the worker threads of parallel requests, and with them their
+                sessions and connections, alive between calls until `close()`.
+            coalesce_requests (bool)
+                let concurrent calls of the same query (`get_operator_indices`,
+                `get_repository_metadata`, `get_container_signatures`) with the
+                same arguments share a single request and its parsed response.
+                Every caller gets its own copy of the response.
+            circuit_breakers (CircuitBreakers)
+                circuit breakers shared by the sessions of all threads, failing
+                requests fast while their endpoint keeps failing, instead of
+                retrying every request. Disabled if not specified.
+            hedging (Hedging)
+                hedging of idempotent GET requests (queries and pages), sending
+                a duplicate of requests slower than usual. Disabled if not
+                specified.
+            timeout (float or tuple)
+                timeout of every attempt of a request: seconds, or (connect, read)
+                seconds.
+            deadline (float)
+                default limit of seconds for each operation, including retries and
+                page fetches, after which it fails with `DeadlineExceeded`. Can be
+                overridden by the `deadline` argument of operations.
+            compression (Compression)
+                compression of request bodies (e.g. uploaded signatures) and
+                negotiation of compressed responses. Disabled if not specified.
+            concurrency (AdaptiveConcurrency)
+                adapt the number of parallel requests (uploads and deletes) to
+                observed latency and errors, between its bounds. Its `max_limit`
+                is used instead of `threads`. Fixed to `threads` if not specified.
+            schedule_retries (bool)
+                retry failed parallel requests (uploads and deletes) from a
+                delayed queue instead of sleeping in worker threads, which go on
+                with other requests meanwhile. See `RetryScheduler`.
+            graphql_url (str)
+                URL of the Pyxis GraphQL API. If specified, repository metadata and
+                signatures are queried with GraphQL, batching lookups
+                (repositories, registries and pages) into one request and
+                selecting returned fields on the server. See `graphql` for the
+                queries using GraphQL.
         """
         self.thread_local = threading.local()
+        self.tracing = tracing or NO_TRACING
         self._session_factory = partial(
             PyxisSession,
             hostname,
             retries=retries,
             backoff_factor=backoff_factor,
             verify=verify,
+            tracing=self.tracing,
+            circuit_breakers=circuit_breakers,
+            timeout=timeout,
+            compression=compression,
         )
         self._auth = auth
-        self.threads_limit = threads
+        self.concurrency = concurrency
+        self.threads_limit = concurrency.max_limit if concurrency else threads
+        self.reuse_threads = reuse_threads
+        self._executor: Any = None
+        self._executor_lock = threading.Lock()
+        self.single_flight = SingleFlight() if coalesce_requests else None
+        self.hedging = hedging
+        self.deadline = deadline
+        # largest page size accepted by Pyxis, lowered by AUTO_PAGE_SIZE queries
+        self.max_page_size = MAX_PAGE_SIZE
+        self.retry_scheduler = (
+            RetryScheduler(retries, backoff_factor) if schedule_retries else None
+        )
+        self.graphql_url = graphql_url
 
     @property
     def pyxis_session(self) -> Union[PyxisSession, Any]:
@@ -67,13 +178,40 @@ class PyxisClient:
         return self.thread_local.pyxis_session
 
     def _make_session(self) -> PyxisSession:
-        session = self._session_factory()
+        if getattr(self.thread_local, "scheduled_retries", False):
+            # retried by the client, see _do_parallel_requests
+            session = self._session_factory(retries=0, raise_on_status=False)
+        else:
+            session = self._session_factory()
         if self._auth:
-            self._auth.apply_to_session(session)
+            with self.tracing.span("pyxis.auth"):
+                self._auth.apply_to_session(session)
         return session
 
+    def _get(self, endpoint: str, **kwargs: Any) -> Response:
+        """
+        Send an idempotent GET request, hedged if hedging is enabled.
+
+        Args:
+            endpoint (str): Endpoint of the request.
+            **kwargs: Additional arguments to add to the requests method.
+        Returns:
+            requests.Response: A response object.
+        """
+        if self.hedging is None:
+            return self.pyxis_session.get(endpoint, **kwargs)
+        # worker threads send the request with their own sessions
+        return self.hedging.run(  # type: ignore[no-any-return]
+            endpoint, lambda: self.pyxis_session.get(endpoint, **kwargs)
+        )
+
+    @traced("pyxis.get_operator_indices")
+    @coalesced
     def get_operator_indices(
-        self, ocp_versions_range: str, organization: Optional[str] = None
+        self,
+        ocp_versions_range: str,
+        organization: Optional[str] = None,
+        deadline: Optional[float] = None,
     ) -> Union[list[str], Any]:
         """Get a list of index images satisfying versioning and organization conditions.
 
@@ -82,24 +220,31 @@ class PyxisClient:
                 Supported OCP versions range.
             organization (str)
                 Organization understood by IIB.
+            deadline (float)
+                limit of seconds for the operation, see `PyxisClient`.
 
         Returns:
             list: List of index images satisfying the conditions.
         """
-        params = {"ocp_versions_range": ocp_versions_range}
-        if organization:
-            params["organization"] = organization
-        resp = self.pyxis_session.get("operators/indices", params=params)
-        resp.raise_for_status()
+        with self._deadline(deadline):
+            params = {"ocp_versions_range": ocp_versions_range}
+            if organization:
+                params["organization"] = organization
+            resp = self._get("operators/indices", params=params)
+            resp.raise_for_status()
 
-        return resp.json()["data"]
+            return self._decode(resp)["data"]
 
+    @traced("pyxis.get_repository_metadata")
+    @coalesced
     def get_repository_metadata(
         self,
         repo_name: str,
         custom_registry: Optional[str] = None,
         only_internal: bool = False,
         only_partner: bool = False,
+        deadline: Optional[float] = None,
+        include: Optional[Iterable[str]] = None,
     ) -> Union[dict[Any, Any], Any]:
         """Get metadata of a Comet repository.
 
@@ -115,43 +260,174 @@ class PyxisClient:
                 Whether to only check internal registry.
             only_partner (bool):
                 Whether to only check partner registry.
+            deadline (float):
+                Limit of seconds for the operation, see `PyxisClient`.
+            include (list):
+                Fields of the metadata to return, all of them if not specified
+                (`REPOSITORY_FIELDS` with GraphQL).
         Returns (dict):
             Metadata of the repository.
         """
-        internal_registry = "registry.access.redhat.com"
-        partner_registry = "registry.connect.redhat.com"
+        registries = _registries(custom_registry, only_internal, only_partner)
+        with self._deadline(deadline):
+            if self.graphql_url:
+                metadata = self._get_repositories_graphql(
+                    [repo_name], registries, include
+                )[repo_name]
+                if metadata is None:
+                    raise GraphQLError("Repository %s not found" % repo_name, 404)
+                return metadata
+
+            resp = self._get_repository(repo_name, registries, include)
+            resp.raise_for_status()
+            return self._decode(resp)
+
+    @traced("pyxis.get_repositories_metadata")
+    def get_repositories_metadata(
+        self,
+        repo_names: Iterable[str],
+        custom_registry: Optional[str] = None,
+        only_internal: bool = False,
+        only_partner: bool = False,
+        deadline: Optional[float] = None,
+        include: Optional[Iterable[str]] = None,
+    ) -> dict[str, Any]:
+        """Get metadata of many Comet repositories.
+
+        With GraphQL (see `graphql_url` of `PyxisClient`), all repositories are
+        looked up in both registries at once, in as few requests as possible.
+
+        Args:
+            repo_names (list):
+                Names of the repositories.
+            custom_registry (str):
+                Use a custom registry address instead of the default ones.
+            only_internal (bool):
+                Whether to only check internal registry.
+            only_partner (bool):
+                Whether to only check partner registry.
+            deadline (float):
+                Limit of seconds for the operation, see `PyxisClient`.
+            include (list):
+                Fields of the metadata to return, see `get_repository_metadata`.
+        Returns (dict):
+            Metadata of every repository by its name, None for repositories not
+            found.
+        """
+        registries = _registries(custom_registry, only_internal, only_partner)
+        with self._deadline(deadline):
+            if self.graphql_url:
+                return self._get_repositories_graphql(repo_names, registries, include)
+
+            result = {}
+            for repo_name in repo_names:
+                resp = self._get_repository(repo_name, registries, include)
+                if resp.status_code != 404:
+                    resp.raise_for_status()
+                result[repo_name] = (
+                    None if resp.status_code == 404 else self._decode(resp)
+                )
+            return result
+
+    def _get_repository(
+        self,
+        repo_name: str,
+        registries: list[str],
+        include: Optional[Iterable[str]] = None,
+    ) -> Response:
+        """Get REST response of the first registry having the repository."""
         endpoint = "repositories/registry/{0}/repository/{1}"
-        if custom_registry:
-            resp = self.pyxis_session.get(endpoint.format(custom_registry, repo_name))
-        elif only_internal:
-            resp = self.pyxis_session.get(endpoint.format(internal_registry, repo_name))
-        elif only_partner:
-            resp = self.pyxis_session.get(endpoint.format(partner_registry, repo_name))
-        else:
-            resp = self.pyxis_session.get(endpoint.format(internal_registry, repo_name))
+        kwargs = {"params": {"include": ",".join(include)}} if include else {}
+        for registry in registries:
+            resp = self._get(endpoint.format(registry, repo_name), **kwargs)
             # if 'not found' error, try another registry
-            if resp.status_code == 404:
-                resp = self.pyxis_session.get(
-                    endpoint.format(partner_registry, repo_name)
-                )
+            if resp.status_code != 404:
+                break
+        return resp
 
-        resp.raise_for_status()
-        return resp.json()
+    def _get_repositories_graphql(
+        self,
+        repo_names: Iterable[str],
+        registries: list[str],
+        include: Optional[Iterable[str]] = None,
+    ) -> dict[str, Any]:
+        """Look up repositories in all registries, return the first found ones."""
+        repo_names = list(repo_names)
+        arguments = [
+            {"registry": registry, "repository": repo_name}
+            for repo_name in repo_names
+            for registry in registries
+        ]
+        fields = ["data." + field for field in include or REPOSITORY_FIELDS]
+        results = iter(
+            self._graphql_batch(
+                "get_repository_by_registry_path", arguments, fields + _ERROR_FIELDS
+            )
+        )
+        metadata = {}
+        for repo_name in repo_names:
+            found = None
+            for result in itertools.islice(results, len(registries)):
+                error = result.get("error")
+                if found is None and not (error and error.get("status") == 404):
+                    found = check_result(result)
+            metadata[repo_name] = found
+        return metadata
 
-    def upload_signatures(self, signatures: list[str]) -> list[Any]:
+    def _graphql_batch(
+        self, name: str, arguments: list[dict[str, Any]], fields: list[str]
+    ) -> list[Any]:
+        """
+        Send a GraphQL query with each of given arguments, in batched requests.
+
+        Args:
+            name (str): Name of the query.
+            arguments (list): Arguments of every query.
+            fields (list): Fields selected from the results.
+        Returns:
+            list: Result of every query, in the order of the arguments.
+        """
+        assert self.graphql_url is not None
+        results: list[Any] = []
+        for start in range(0, len(arguments), MAX_BATCH_SIZE):
+            query = GraphQLQuery()
+            batch = itertools.islice(arguments, start, start + MAX_BATCH_SIZE)
+            aliases = [query.add(name, args, fields) for args in batch]
+            resp = self.pyxis_session.post(self.graphql_url, json=query.payload())
+            resp.raise_for_status()
+            body = query.results(self._decode(resp))
+            results.extend(body[alias] for alias in aliases)
+        return results
+
+    @traced("pyxis.upload_signatures")
+    def upload_signatures(
+        self,
+        signatures: Iterable[Any],
+        deadline: Optional[float] = None,
+        return_results: bool = True,
+    ) -> Union[list[Any], dict[str, Any]]:
         """
         Upload signatures from given JSON string.
 
         Args:
             signatures [str]
-                JSON with signatures to upload.  See Pyxis API for details.
+                JSON with signatures to upload.  See Pyxis API for details. Can be
+                any iterable, e.g. a generator, which is consumed as requests are
+                sent.
+            deadline (float)
+                limit of seconds for the operation, see `PyxisClient`.
+            return_results (bool)
+                return the uploaded signatures. If False, response bodies are
+                discarded unread and only a summary is returned, see
+                `_do_parallel_requests`.
 
         Returns:
             list: List of uploaded signatures including auto-populated fields.
         """
+        stream = not return_results
 
         def _send_post_request(data: dict[Any, Any]) -> Response:
-            response = self.pyxis_session.post("signatures", json=data)
+            response = self.pyxis_session.post("signatures", json=data, stream=stream)
             # SEE CLOUDDST-9698
             # Pyxis returns 500 error due to a potential sidecar config issue
             # As a workaround to that, it was suggested to clear the session
@@ -159,17 +435,29 @@ class PyxisClient:
             # After creating a new session and retrying, the request should succeed
             if response.status_code == 500:
                 self._clear_session()
-                response = self.pyxis_session.post("signatures", json=data)
+                response = self.pyxis_session.post(
+                    "signatures", json=data, stream=stream
+                )
             return response
 
-        return self._do_parallel_requests(_send_post_request, signatures)
+        with self._deadline(deadline):
+            return self._do_parallel_requests(
+                _send_post_request, signatures, return_results
+            )
+
+    def _deadline(self, deadline: Optional[float]) -> Any:
+        """Return context of an operation limited by given or default deadline."""
+        return until(expiry(self.deadline if deadline is None else deadline))
 
     def _clear_session(self) -> None:
         self.thread_local.pyxis_session.close()
         delattr(self.thread_local, "pyxis_session")
 
     def _do_parallel_requests(
-        self, make_request: Callable[[Any], Any], data_items: list[Any]
+        self,
+        make_request: Callable[[Any], Any],
+        data_items: Iterable[Any],
+        return_results: bool = True,
     ) -> Union[list[Any], Any]:
         """
         Call given function with given data items in parallel, collect responses.
@@ -178,40 +466,211 @@ class PyxisClient:
             make_request (function): a function that does the actual request.
                 Must accept a single argument: a data item.
                 Must return a `requests.models.Response` object.
-            data_items (list): a list of arbitrary objects to be passed
-                individually to `make_request()`.
+            data_items (iterable): arbitrary objects to be passed individually to
+                `make_request()`. Taken lazily, so it can be a generator.
+            return_results (bool): if False, bodies of successful responses are
+                discarded without being parsed (`make_request()` should send
+                requests with `stream=True`), and so are failed data items.
 
         The number of parallel requests is defined by
         `DEFAULT_REQUEST_THREADS_LIMIT` (can be overridden by the user) and
         of course by the number of actually available threads.
 
+        Data items are submitted to the worker threads only while fewer than
+        `_submission_window()` of them are in flight or waiting for a retry, so
+        that memory used for pending requests depends on the concurrency rather
+        than on the number of data items.
+
+        With `schedule_retries`, failed requests are put on a delayed queue and
+        submitted again once their backoff passes, before new data items.
+
         If a response fails consistently (see `PyxisSession` for retry policy),
         the execution is terminated and an informative error is raised.
-        See `PyxisClient._handle_json_response()` for details.
+        See `PyxisClient._handle_json_response()` for details. Without
+        `return_results`, failed requests are collected instead, and only
+        deadline and other errors are raised.
 
         Returns:
-            list(dict): list of dictionaries extracted from responses.
+            list(dict): list of dictionaries extracted from responses. Without
+                `return_results`, a dictionary with the number of ``succeeded``
+                data items and a list of ``failures``, each with the ``item``
+                (without signature data) and its ``error``.
         """
-        with Executors.thread_pool(max_workers=self.threads_limit).with_map(
-            self._handle_json_response
-        ) as executor:
-            futures = [executor.submit(make_request, data) for data in data_items]
+        if self.reuse_threads:
+            executor_context: Any = contextlib.nullcontext(self._shared_executor())
+        else:
+            from more_executors import Executors
+
+            executor_context = Executors.thread_pool(max_workers=self.threads_limit)
+
+        items = iter(data_items)
+        retries = DelayedQueue()
+        results: list[Any] = []
+        succeeded = 0
+        failures: list[dict[str, Any]] = []
+        error: Optional[Exception] = None
+        # submitted futures and their data items
+        pending: dict[Any, Any] = {}
+        with executor_context as executor:
+            request = (
+                self._traced_request if self.tracing.enabled else self._request_json
+            )
+
+            def _submit(data: Any, attempt: int) -> None:
+                # worker threads don't inherit the context of the current span
+                # and deadline
+                future = executor.submit(
+                    contextvars.copy_context().run,
+                    request,
+                    make_request,
+                    data,
+                    attempt,
+                    not return_results,
+                )
+                pending[future] = data
+
+            try:
+                while True:
+                    window = self._submission_window()
+                    for retry in retries.pop_due(window - len(pending)):
+                        _submit(retry.data, retry.attempt)
+                    free = max(window - len(pending) - len(retries), 0)
+                    for data in itertools.islice(items, free):
+                        _submit(data, 1)
+                    if not pending:
+                        if not retries:
+                            break
+                        # only retries left, none of them due yet
+                        time.sleep(retries.wait_time() or 0)
+                        continue
+                    done, _ = wait(
+                        pending,
+                        timeout=retries.wait_time(),
+                        return_when=FIRST_COMPLETED,
+                    )
+                    for future in done:
+                        data = pending.pop(future)
+                        try:
+                            result = future.result()
+                        except RequestException as e:
+                            if return_results or isinstance(e, DeadlineExceeded):
+                                error = error or e
+                            else:
+                                failures.append(
+                                    {"item": _describe(data), "error": str(e)}
+                                )
+                        except Exception as e:
+                            # like a closed thread pool, finish the other
+                            # requests first
+                            error = error or e
+                        else:
+                            if isinstance(result, ScheduledRetry):
+                                retries.push(result)
+                            elif return_results:
+                                results.append(result)
+                            else:
+                                succeeded += 1
+            except Exception:
+                # e.g. failed generator of data items
+                wait(pending)
+                raise
 
-            return [f.result() for f in as_completed(futures)]
+        if error is not None:
+            raise error
+        if not return_results:
+            return {"succeeded": succeeded, "failures": failures}
+        return results
+
+    def _submission_window(self) -> int:
+        """Return the highest number of data items submitted but not finished."""
+        limit = self.concurrency.limit if self.concurrency else self.threads_limit
+        return 2 * limit
+
+    def _shared_executor(self) -> Any:
+        with self._executor_lock:
+            if self._executor is None:
+                from more_executors import Executors
+
+                self._executor = Executors.thread_pool(max_workers=self.threads_limit)
+            return self._executor
+
+    def close(self) -> None:
+        """Stop worker threads kept by `reuse_threads` and close the current session."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+        if hasattr(self.thread_local, "pyxis_session"):
+            self._clear_session()
+
+    def _request_json(
+        self,
+        make_request: Callable[[Any], Any],
+        data: Any,
+        attempt: int = 1,
+        discard_body: bool = False,
+    ) -> Any:
+        scheduler = self.retry_scheduler
+        if scheduler is None:
+            return self._handle_json_response(
+                self._send_item(make_request, data), discard_body
+            )
 
-    def _handle_json_response(self, response: Response) -> Union[dict[Any, Any], Any]:
+        self.thread_local.scheduled_retries = True
+        try:
+            response = self._send_item(make_request, data)
+        except RequestException as e:
+            if not scheduler.should_retry(attempt, error=e):
+                raise
+            return ScheduledRetry(data, attempt + 1, scheduler.delay(attempt))
+        if scheduler.should_retry(attempt, response=response):
+            delay = scheduler.delay(attempt, response)
+            # release the connection of a streamed response, its body isn't read
+            response.close()
+            return ScheduledRetry(data, attempt + 1, delay)
+        return self._handle_json_response(response, discard_body)
+
+    def _send_item(self, make_request: Callable[[Any], Any], data: Any) -> Response:
+        if self.concurrency is None:
+            return make_request(data)  # type: ignore[no-any-return]
+
+        started = self.concurrency.acquire()
+        failed = True
+        try:
+            response = make_request(data)
+            failed = response.status_code >= 500 or response.status_code == 429
+        finally:
+            self.concurrency.release(started, failed)
+        return response  # type: ignore[no-any-return]
+
+    def _traced_request(
+        self,
+        make_request: Callable[[Any], Any],
+        data: Any,
+        attempt: int = 1,
+        discard_body: bool = False,
+    ) -> Any:
+        with self.tracing.span("pyxis.request_item") as span:
+            if isinstance(data, str):
+                span.set_attribute("pyxis.item", data)
+            if attempt > 1:
+                span.set_attribute("pyxis.attempt", attempt)
+            return self._request_json(make_request, data, attempt, discard_body)
+
+    def _decode(self, response: Response) -> Any:
+        with self.tracing.span("pyxis.decode"):
+            return response.json()
+
+    def _handle_json_response(
+        self, response: Response, discard_body: bool = False
+    ) -> Union[dict[Any, Any], Any]:
         """
         Get JSON from given response or raise an informative exception.
 
         Uses `requests.raise_for_status()` but tries to extract more details.
+        With `discard_body`, the body of a successful response is read and
+        dropped without being parsed, and None is returned.
         """
-        # the response may contain useful JSON even in case of 40x/50x
-        # but it can't be guaranteed
-        try:
-            data = response.json()
-        except ValueError:  # Python 2.x compat
-            data = {}
-
         tolerate_codes = []
         # Uploaded data already exists in Pyxis
         if response.request.method == "POST":
@@ -219,6 +678,20 @@ class PyxisClient:
         # Data already removed from Pyxis
         elif response.request.method == "DELETE":
             tolerate_codes = [404]
+
+        if discard_body and (response.ok or response.status_code in tolerate_codes):
+            # read the body to its end, to reuse the connection
+            for _ in response.iter_content(DISCARD_CHUNK_SIZE):
+                pass
+            return None
+
+        # the response may contain useful JSON even in case of 40x/50x
+        # but it can't be guaranteed
+        try:
+            data = self._decode(response)
+        except ValueError:  # Python 2.x compat
+            data = {}
+
         if response.status_code in tolerate_codes:
             return data
 
@@ -236,9 +709,21 @@ class PyxisClient:
 
         return data
 
+    @traced("pyxis.get_container_signatures")
+    @coalesced
     def get_container_signatures(
-        self, manifest_digests: Optional[str] = None, references: Optional[str] = None
-    ) -> list[str]:
+        self,
+        manifest_digests: Optional[str] = None,
+        references: Optional[str] = None,
+        as_records: bool = False,
+        deadline: Optional[float] = None,
+        include: Optional[Iterable[str]] = None,
+        exclude: Optional[Iterable[str]] = None,
+        page_size: PageSize = None,
+        cursor: bool = False,
+        ranges: int = 1,
+        filter: Union[Expression, str, None] = None,
+    ) -> list[Any]:
         """Get a list of signature metadata matching given fields.
 
         Args:
@@ -246,42 +731,427 @@ class PyxisClient:
                 manifest_digest used for searching in signatures.
             references (comma separated str)
                 pull reference for image of signature stored.
+            as_records (bool)
+                return compact `SignatureRecord` objects instead of dictionaries,
+                to hold large result sets in memory.
+            deadline (float)
+                limit of seconds for the operation, see `PyxisClient`.
+            include ([str])
+                names of the only fields of signatures to return, e.g. ``["_id"]``.
+                Selected by Pyxis, which then leaves out e.g. the large
+                signature_data.
+            exclude ([str])
+                names of fields of signatures not to return, e.g.
+                ``["signature_data"]``.
+            page_size (int or str)
+                number of signatures fetched per request, the default of Pyxis
+                if not specified. `AUTO_PAGE_SIZE` ("auto") uses the largest
+                page size Pyxis allows, to fetch large results in fewer requests.
+            cursor (bool)
+                page by ranges of `_id` (sorted by `_id`, each page starting after
+                the last `_id` of the previous one) instead of page numbers, so
+                that signatures added or removed during the query don't shift
+                pages, which would skip or repeat signatures.
+            ranges (int)
+                with `cursor`, split the `_id` range of the signatures into this
+                many ranges, fetched in parallel. Signatures are merged without
+                duplicates.
+            filter (Expression or str)
+                additional condition of signatures, filtered by Pyxis, e.g.
+                ``SignatureFields.sig_key_id.in_(key_ids)``. See `rsql`. Queries
+                with filters use REST, as do queries without `include` or
+                `as_records`, which return all fields of signatures.
 
         Returns:
             list: List of signature metadata matching given fields.
         """
-        signatures_endpoint = "signatures"
-        filter_criteria = []
-        if manifest_digests:
-            filter_criteria.append("manifest_digest=in=({0}),".format(manifest_digests))
-        if references:
-            filter_criteria.append("reference=in=({0}),".format(references))
+        item_factory = SignatureRecord.from_dict if as_records else None
+        # GraphQL returns selected fields only, the same ones as REST if given
+        graphql_fields = include is not None or as_records
+        if self.graphql_url and graphql_fields and not (cursor or filter):
+            with self._deadline(deadline):
+                return self._get_signatures_graphql(
+                    manifest_digests,
+                    references,
+                    _selected(include, exclude),
+                    item_factory,
+                    page_size,
+                )
+        if cursor:
+            endpoint_for = partial(
+                self._signatures_endpoint,
+                manifest_digests,
+                references,
+                None,
+                _with_id(include),
+                exclude,
+                filter,
+            )
+            with self._deadline(deadline):
+                return self._get_items_by_id(
+                    endpoint_for, item_factory, page_size, ranges
+                )
 
-        signatures_endpoint = "{0}{1}{2}".format(
-            signatures_endpoint, "?filter=", "".join(filter_criteria)
+        signatures_endpoint = self._signatures_endpoint(
+            manifest_digests, references, None, include, exclude, filter
         )
-        signatures_endpoint = signatures_endpoint[0:-1]
 
-        resp = self._get_items_from_all_pages(signatures_endpoint)
+        with self._deadline(deadline):
+            resp = self._get_items_from_all_pages(
+                signatures_endpoint, item_factory=item_factory, page_size=page_size
+            )
 
         return resp
 
-    def _get_items_from_all_pages(self, endpoint: str, **kwargs: Any) -> list[Any]:
+    def _get_signatures_graphql(
+        self,
+        manifest_digests: Optional[str],
+        references: Optional[str],
+        fields: list[str],
+        item_factory: Optional[Callable[[Any], Any]] = None,
+        page_size: PageSize = None,
+    ) -> list[Any]:
+        """
+        Get signatures with GraphQL, all pages after the first in batched requests.
+
+        Args:
+            manifest_digests (str): Comma-separated manifest digests.
+            references (str): Comma-separated references.
+            fields (list): Fields of signatures to return.
+            item_factory (function): Converts every signature.
+            page_size (int or str): Number of signatures per page, see
+                `get_container_signatures`.
+        Returns:
+            list: Signatures of all pages.
+        """
+        criteria = [
+            {field: {"in": values.split(",")}}
+            for field, values in (
+                ("manifest_digest", manifest_digests),
+                ("reference", references),
+            )
+            if values
+        ]
+        arguments: dict[str, Any] = {
+            "filter": (
+                {"or": criteria} if len(criteria) > 1 else next(iter(criteria), None)
+            ),
+            "page_size": (
+                self.max_page_size if page_size == AUTO_PAGE_SIZE else page_size
+            ),
+        }
+        selection = ["data." + f for f in fields] + list(PAGING_FIELDS) + _ERROR_FIELDS
+
+        first = self._graphql_batch(
+            "find_signatures", [dict(arguments, page=0)], selection
+        )
+        items = list(check_result(first[0]))
+        total_pages = math.ceil(first[0]["total"] / (first[0]["page_size"] or 1))
+        pages = self._graphql_batch(
+            "find_signatures",
+            [dict(arguments, page=page) for page in range(1, total_pages)],
+            selection,
+        )
+        for page in pages:
+            items.extend(check_result(page))
+        return list(map(item_factory, items)) if item_factory else items
+
+    def _signatures_endpoint(
+        self,
+        manifest_digests: Optional[str],
+        references: Optional[str],
+        updated_since: Optional[str] = None,
+        include: Optional[Iterable[str]] = None,
+        exclude: Optional[Iterable[str]] = None,
+        filter: Union[Expression, str, None] = None,
+        conditions: Iterable[Expression] = (),
+    ) -> str:
+        criteria: list[Expression] = []
+        if manifest_digests:
+            criteria.append(
+                SignatureFields.manifest_digest.in_(_split_csv(manifest_digests))
+            )
+        if references:
+            criteria.append(SignatureFields.reference.in_(_split_csv(references)))
+        conditions = [Or(*criteria), *conditions]
+        if updated_since:
+            conditions.insert(1, SignatureFields.last_update_date.ge(updated_since))
+        if filter:
+            conditions.append(as_expression(filter))
+        # values may contain "+", which would be decoded as a space
+        filter_expr = quote(str(And(*conditions)), safe=_RSQL_SAFE)
+
+        query = ["filter={0}".format(filter_expr)] if filter_expr else []
+        if include:
+            # paging fields are needed to fetch further pages
+            paths = ["data.{0}".format(field) for field in include]
+            query.append("include={0}".format(",".join(paths + list(PAGING_FIELDS))))
+        if exclude:
+            paths = ["data.{0}".format(field) for field in exclude]
+            query.append("exclude={0}".format(",".join(paths)))
+
+        if not query:
+            return "signatures"
+        return "signatures?{0}".format("&".join(query))
+
+    def iter_container_signatures(
+        self,
+        manifest_digests: Optional[str] = None,
+        references: Optional[str] = None,
+        updated_since: Optional[str] = None,
+        as_records: bool = False,
+        deadline: Optional[float] = None,
+        include: Optional[Iterable[str]] = None,
+        exclude: Optional[Iterable[str]] = None,
+        page_size: PageSize = None,
+        cursor: bool = False,
+        filter: Union[Expression, str, None] = None,
+    ) -> Iterator[Any]:
+        """Iterate over signature metadata matching given fields, page by page.
+
+        Unlike `get_container_signatures`, only a single page of signatures is
+        held in memory by the client, e.g. to build a `SignatureIndex`.
+
+        Args:
+            manifest_digests (comma separated str)
+                manifest_digest used for searching in signatures.
+            references (comma separated str)
+                pull reference for image of signature stored.
+            updated_since (str)
+                only signatures whose last_update_date is the same or later
+                than this timestamp.
+            as_records (bool)
+                yield compact `SignatureRecord` objects instead of dictionaries.
+            deadline (float)
+                limit of seconds for fetching all pages, starting with the first
+                one, see `PyxisClient`. Time spent by the caller between pages
+                counts too.
+            include ([str])
+                names of the only fields of signatures to return, see
+                `get_container_signatures`.
+            exclude ([str])
+                names of fields of signatures not to return.
+            page_size (int or str)
+                number of signatures fetched per request, see
+                `get_container_signatures`.
+            cursor (bool)
+                page by ranges of `_id` instead of page numbers, see
+                `get_container_signatures`.
+            filter (Expression or str)
+                additional condition of signatures, see
+                `get_container_signatures`.
+
+        Yields:
+            dict: Signature metadata matching given fields.
+        """
+        pages: Iterator[list[Any]]
+        if cursor:
+            pages = self._iter_pages_by_id(
+                partial(
+                    self._signatures_endpoint,
+                    manifest_digests,
+                    references,
+                    updated_since,
+                    _with_id(include),
+                    exclude,
+                    filter,
+                ),
+                page_size,
+            )
+        else:
+            endpoint = self._signatures_endpoint(
+                manifest_digests, references, updated_since, include, exclude, filter
+            )
+            pages = self._iter_pages(endpoint, page_size)
+        expires = expiry(self.deadline if deadline is None else deadline)
+        while True:
+            # the deadline only applies while fetching, not to the caller
+            with until(expires):
+                page = next(pages, None)
+            if page is None:
+                return
+            yield from map(SignatureRecord.from_dict, page) if as_records else page
+
+    def scan_signatures(
+        self,
+        shards: int = 4,
+        shard_by: str = "digest",
+        filter: Union[Expression, str, None] = None,
+        as_records: bool = False,
+        deadline: Optional[float] = None,
+        include: Optional[Iterable[str]] = None,
+        exclude: Optional[Iterable[str]] = None,
+        page_size: PageSize = None,
+    ) -> Iterator[Any]:
+        """Iterate over all signatures, scanning shards of them in parallel.
+
+        The signatures are split into shards, by ranges of the hexadecimal
+        manifest digests (e.g. "sha256:0" to "sha256:4") or of `_id` (see
+        `get_container_signatures`), which are scanned concurrently by worker
+        threads, each paging its shard by `_id`. Pages of all shards are
+        yielded as they arrive, so signatures come in no particular order. A
+        few pages per shard are buffered, workers wait while the caller
+        processes them.
+
+        Args:
+            shards (int)
+                number of shards scanned concurrently, up to the number of
+                threads of the client.
+            shard_by (str)
+                "digest" to split signatures by manifest digest, "id" by `_id`.
+            filter (Expression or str)
+                condition of scanned signatures, see `get_container_signatures`.
+            as_records (bool)
+                yield compact `SignatureRecord` objects instead of dictionaries.
+            deadline (float)
+                limit of seconds for the whole scan, see
+                `iter_container_signatures`.
+            include ([str])
+                names of the only fields of signatures to return, see
+                `get_container_signatures`.
+            exclude ([str])
+                names of fields of signatures not to return.
+            page_size (int or str)
+                number of signatures fetched per request, see
+                `get_container_signatures`.
+
+        Yields:
+            dict: Signature metadata.
+        """
+        if shard_by not in ("digest", "id"):
+            raise ValueError(
+                "Unsupported shard_by %r, expected digest or id" % shard_by
+            )
+        if shards < 1:
+            raise ValueError("At least 1 shard is needed")
+        from more_executors import Executors
+
+        def endpoint_for(
+            shard_conditions: list[Expression], conditions: list[Expression]
+        ) -> str:
+            return self._signatures_endpoint(
+                None,
+                None,
+                None,
+                _with_id(include),
+                exclude,
+                filter,
+                shard_conditions + conditions,
+            )
+
+        expires = expiry(self.deadline if deadline is None else deadline)
+        pages: queue.Queue[Any] = queue.Queue(maxsize=SCAN_QUEUE_PAGES * shards)
+        stop = threading.Event()
+
+        def _put(item: Any) -> bool:
+            # stop waiting for the caller once the scan is closed
+            while not stop.is_set():
+                with contextlib.suppress(queue.Full):
+                    pages.put(item, timeout=0.1)
+                    return True
+            return False
+
+        def _scan(shard: tuple[list[Expression], IdRange]) -> None:
+            shard_conditions, id_range = shard
+            shard_pages = self._iter_pages_by_id(
+                partial(endpoint_for, shard_conditions), page_size, id_range
+            )
+            try:
+                for page in shard_pages:
+                    if not _put(page):
+                        return
+            except Exception as e:
+                _put(e)
+                return
+            finally:
+                shard_pages.close()
+            _put(None)
+
+        shard_list: list[tuple[list[Expression], IdRange]]
+        with until(expires):
+            if shard_by == "digest":
+                shard_list = [
+                    (conditions, (None, None)) for conditions in _digest_shards(shards)
+                ]
+            else:
+                id_ranges = self._id_ranges(partial(endpoint_for, []), shards)
+                shard_list = [([], id_range) for id_range in id_ranges]
+            executor: Any = Executors.thread_pool(
+                max_workers=min(len(shard_list), self.threads_limit)
+            )
+            # workers fetch within the deadline, and the current span
+            futures = [
+                executor.submit(contextvars.copy_context().run, _scan, shard)
+                for shard in shard_list
+            ]
+        try:
+            done = 0
+            while done < len(futures):
+                item = pages.get()
+                if isinstance(item, list):
+                    yield from (
+                        map(SignatureRecord.from_dict, item) if as_records else item
+                    )
+                elif item is None:
+                    done += 1
+                else:
+                    raise item
+        finally:
+            stop.set()
+            executor.shutdown(wait=True)
+
+    def _get_items_from_all_pages(
+        self,
+        endpoint: str,
+        item_factory: Optional[Callable[[Any], Any]] = None,
+        page_size: PageSize = None,
+        **kwargs: Any,
+    ) -> list[Any]:
         """
         Get response from all pages of pyxis.
 
         Args:
             endpoint (str): Endpoint of the request.
+            item_factory (function): Converts every data record, page by page,
+                so that the decoded records of all pages are not held at once.
+            page_size (int or str): Number of records per page, `AUTO_PAGE_SIZE`
+                or None for the default of Pyxis.
             **kwargs: Additional arguments to add to the requests method.
         Returns:
             list: list of all data records returned from pyxis
 
         """
-        all_resp = []
-        first_resp = self.pyxis_session.get(endpoint, **kwargs)
+        all_resp: list[Any] = []
+        for page in self._iter_pages(endpoint, page_size, **kwargs):
+            all_resp.extend(map(item_factory, page) if item_factory else page)
+        return all_resp
+
+    def _iter_pages(
+        self, endpoint: str, page_size: PageSize = None, **kwargs: Any
+    ) -> Iterator[list[Any]]:
+        """
+        Get data records of all pages of pyxis, one page at a time.
+
+        Args:
+            endpoint (str): Endpoint of the request.
+            page_size (int or str): Number of records per page, `AUTO_PAGE_SIZE`
+                or None for the default of Pyxis.
+            **kwargs: Additional arguments to add to the requests method. Sent
+                with every page.
+        Yields:
+            list: data records of a page
+
+        """
+        params = dict(kwargs.pop("params", None) or {})
+        if page_size == AUTO_PAGE_SIZE:
+            first_resp = self._get_first_page_auto(endpoint, params, **kwargs)
+        else:
+            if page_size is not None:
+                params["page_size"] = page_size
+            first_resp = self._get(endpoint, params=params, **kwargs)
         first_resp.raise_for_status()
-        first_resp_json = first_resp.json()
-        all_resp.extend(first_resp_json["data"])
+        first_resp_json = self._decode(first_resp)
+        yield first_resp_json["data"]
         # if total data is greater than data returned in first page,
         # calculate number of pages and then consequently get response from each page
         if len(first_resp_json["data"]) < first_resp_json["total"]:
@@ -289,23 +1159,295 @@ class PyxisClient:
                 math.ceil(first_resp_json["total"] / first_resp_json["page_size"])
             )
             for page in range(1, total_pages):
-                params = {"page": page}
-                resp = self.pyxis_session.get(endpoint, params=params)
+                with self.tracing.span("pyxis.page", **{"pyxis.page": page}):
+                    resp = self._get(endpoint, params=dict(params, page=page), **kwargs)
+                    resp.raise_for_status()
+                    data = self._decode(resp)["data"]
+                yield data
+
+    def _iter_pages_by_id(
+        self,
+        endpoint_for: Callable[[list[Expression]], str],
+        page_size: PageSize = None,
+        id_range: IdRange = (None, None),
+    ) -> Generator[list[Any], None, None]:
+        """
+        Get data records of all pages of pyxis sorted by `_id`, one page at a time.
+
+        Every page is requested with a filter on `_id` starting after the last
+        `_id` of the previous page, rather than by page number, so records added
+        or removed meanwhile don't shift the pages.
+
+        Args:
+            endpoint_for (function): Returns the endpoint of a request with given
+                additional conditions.
+            page_size (int or str): Number of records per page, `AUTO_PAGE_SIZE`
+                or None for the default of Pyxis.
+            id_range (tuple): Lowest `_id` (inclusive) and highest `_id`
+                (exclusive) of the records, None for no limit.
+        Yields:
+            list: data records of a page
+        """
+        params: dict[str, Any] = {"sort_by": "_id[asc]"}
+        if page_size is not None and page_size != AUTO_PAGE_SIZE:
+            params["page_size"] = page_size
+        lowest, before = id_range
+        bounds: list[Expression] = [SignatureFields.id.lt(before)] if before else []
+        start: list[Expression] = [SignatureFields.id.ge(lowest)] if lowest else []
+        page = 0
+        while True:
+            endpoint = endpoint_for(start + bounds)
+            with self.tracing.span("pyxis.page", **{"pyxis.page": page}):
+                if page_size == AUTO_PAGE_SIZE and "page_size" not in params:
+                    resp = self._get_first_page_auto(endpoint, params)
+                else:
+                    resp = self._get(endpoint, params=params)
                 resp.raise_for_status()
-                all_resp.extend(resp.json()["data"])
-        return all_resp
+                body = self._decode(resp)
+            data = body["data"]
+            if data:
+                yield data
+            # total counts the records left, starting with this page
+            if not data or len(data) >= body["total"]:
+                return
+            start = [SignatureFields.id.gt(data[-1]["_id"])]
+            page += 1
+
+    def _get_items_by_id(
+        self,
+        endpoint_for: Callable[[list[Expression]], str],
+        item_factory: Optional[Callable[[Any], Any]] = None,
+        page_size: PageSize = None,
+        ranges: int = 1,
+    ) -> list[Any]:
+        """
+        Get data records of all pages of pyxis, by `_id` ranges in parallel.
+
+        Args:
+            endpoint_for (function): Returns the endpoint of a request with given
+                additional conditions.
+            item_factory (function): Converts every data record, page by page.
+            page_size (int or str): Number of records per page, see `_iter_pages`.
+            ranges (int): Number of `_id` ranges fetched in parallel.
+        Returns:
+            list: list of all data records returned from pyxis, without records
+                repeated in several ranges.
+        """
+        seen: set[str] = set()
+        lock = threading.Lock()
+
+        def _scan(id_range: IdRange) -> list[Any]:
+            items: list[Any] = []
+            for page in self._iter_pages_by_id(endpoint_for, page_size, id_range):
+                with lock:
+                    page = [r for r in page if r["_id"] not in seen]
+                    seen.update(r["_id"] for r in page)
+                items.extend(map(item_factory, page) if item_factory else page)
+            return items
+
+        id_ranges = self._id_ranges(endpoint_for, ranges)
+        if len(id_ranges) == 1:
+            return _scan(id_ranges[0])
+        return list(itertools.chain.from_iterable(self._map_parallel(_scan, id_ranges)))
+
+    def _id_ranges(
+        self, endpoint_for: Callable[[list[Expression]], str], ranges: int
+    ) -> list[IdRange]:
+        """
+        Split `_id` values of the queried records into ranges of equal width.
+
+        The lowest and highest `_id` are queried, and the hexadecimal values
+        between them are split. Records aren't spread evenly across ranges, as
+        `_id` values are not, but MongoDB object IDs start with their creation
+        time, so ranges cover similar periods of time.
+
+        Args:
+            endpoint_for (function): Returns the endpoint of a request with given
+                additional conditions.
+            ranges (int): Number of ranges.
+        Returns:
+            list: (lowest, before) `_id` pairs, None for no limit, see
+                `_iter_pages_by_id`.
+        """
+        whole: list[IdRange] = [(None, None)]
+        if ranges <= 1:
+            return whole
+        ends = []
+        for order in ("asc", "desc"):
+            resp = self._get(
+                endpoint_for([]), params={"sort_by": "_id[%s]" % order, "page_size": 1}
+            )
+            resp.raise_for_status()
+            data = self._decode(resp)["data"]
+            if not data:
+                return whole
+            ends.append(data[0]["_id"])
+        try:
+            lowest, highest = (int(end, 16) for end in ends)
+        except ValueError:
+            # not hexadecimal IDs, which can't be split
+            return whole
+        width = len(ends[0])
+        points = sorted(
+            {lowest + (highest - lowest + 1) * i // ranges for i in range(1, ranges)}
+        )
+        bounds: list[Optional[str]] = [None]
+        bounds.extend("{0:0{1}x}".format(point, width) for point in points)
+        bounds.append(None)
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def _map_parallel(
+        self, function: Callable[[Any], Any], items: list[Any]
+    ) -> list[Any]:
+        """
+        Call given function with every item in worker threads, return the results.
+
+        The threads are not shared with parallel requests, whose sessions may not
+        retry requests (see `schedule_retries`).
+        """
+        from more_executors import Executors
+
+        workers = min(len(items), self.threads_limit)
+        with Executors.thread_pool(max_workers=workers) as executor:
+            # worker threads don't inherit the context of the current span and
+            # deadline
+            futures = [
+                executor.submit(contextvars.copy_context().run, function, item)
+                for item in items
+            ]
+            try:
+                return [future.result() for future in futures]
+            except Exception:
+                wait(futures)
+                raise
+
+    def _get_first_page_auto(
+        self, endpoint: str, params: dict[str, Any], **kwargs: Any
+    ) -> Response:
+        """
+        Get the first page with the largest page size Pyxis accepts.
+
+        Page sizes rejected by Pyxis are halved, and the accepted one is kept in
+        `max_page_size` for further queries.
+
+        Args:
+            endpoint (str): Endpoint of the request.
+            params (dict): Query parameters, updated with the page size.
+            **kwargs: Additional arguments to add to the requests method.
+        Returns:
+            requests.Response: Response with the first page.
+        """
+        while True:
+            page_size = self.max_page_size
+            params["page_size"] = page_size
+            resp = self._get(endpoint, params=params, **kwargs)
+            rejected = resp.status_code == 400 and "page_size" in resp.text
+            if not rejected or page_size <= 1:
+                return resp
+            self.max_page_size = min(self.max_page_size, page_size // 2)
 
-    def delete_container_signatures(self, signature_ids: list[str]) -> list[Any]:
+    @traced("pyxis.delete_container_signatures")
+    def delete_container_signatures(
+        self,
+        signature_ids: Iterable[str],
+        deadline: Optional[float] = None,
+        return_results: bool = True,
+    ) -> Union[list[Any], dict[str, Any]]:
         """Delete signatures matching given fields.
 
         Args:
             signature_ids ([str])
                 Internal Pyxis signature IDs of signatures which should be removed.
+                Can be any iterable, e.g. a generator.
+            deadline (float)
+                limit of seconds for the operation, see `PyxisClient`.
+            return_results (bool)
+                return the parsed responses. If False, response bodies are
+                discarded unread and only a summary is returned, see
+                `_do_parallel_requests`.
         """
+        stream = not return_results
 
         def _send_delete_request(signature_id: str) -> Response:
             delete_endpoint = "signatures/id/{id}"
-            resp = self.pyxis_session.delete(delete_endpoint.format(id=signature_id))
+            resp = self.pyxis_session.delete(
+                delete_endpoint.format(id=signature_id), stream=stream
+            )
             return resp
 
-        return self._do_parallel_requests(_send_delete_request, signature_ids)
+        with self._deadline(deadline):
+            return self._do_parallel_requests(
+                _send_delete_request, signature_ids, return_results
+            )
+
+
+def _describe(data: Any) -> Any:
+    """Return a data item of a failed request, without large signature data."""
+    if isinstance(data, dict):
+        return {key: value for key, value in data.items() if key != "signature_data"}
+    return data
+
+
+_ERROR_FIELDS = ["error.status", "error.detail"]
+
+# characters of RSQL filters left unquoted in URLs
+_RSQL_SAFE = "/:@=(),;*!<>~"
+
+
+def _registries(
+    custom_registry: Optional[str], only_internal: bool, only_partner: bool
+) -> list[str]:
+    """Return registries to look up repositories in, in order of precedence."""
+    if custom_registry:
+        return [custom_registry]
+    if only_internal:
+        return [INTERNAL_REGISTRY]
+    if only_partner:
+        return [PARTNER_REGISTRY]
+    return [INTERNAL_REGISTRY, PARTNER_REGISTRY]
+
+
+def _digest_shards(shards: int) -> list[list[Expression]]:
+    """
+    Split manifest digests into shards by ranges of their hexadecimal prefixes.
+
+    The first and last shards are open-ended, so that digests of other
+    algorithms than sha256 belong to a shard too.
+    """
+    width = max(1, math.ceil(math.log(shards, 16)))
+    prefixes = [
+        "sha256:{0:0{1}x}".format(index * 16**width // shards, width)
+        for index in range(1, shards)
+    ]
+    bounds: list[Optional[str]] = [None, *prefixes, None]
+    shard_conditions = []
+    for lowest, before in zip(bounds[:-1], bounds[1:]):
+        conditions: list[Expression] = []
+        if lowest:
+            conditions.append(SignatureFields.manifest_digest.ge(lowest))
+        if before:
+            conditions.append(SignatureFields.manifest_digest.lt(before))
+        shard_conditions.append(conditions)
+    return shard_conditions
+
+
+def _split_csv(values: str) -> list[str]:
+    """Return values of a comma-separated string, without surrounding spaces."""
+    return [value.strip() for value in values.split(",")]
+
+
+def _selected(
+    include: Optional[Iterable[str]], exclude: Optional[Iterable[str]]
+) -> list[str]:
+    """Return fields of signatures selected in a GraphQL query."""
+    if include is not None:
+        return list(include)
+    return [field for field in SIGNATURE_FIELDS if field not in (exclude or ())]
+
+
+def _with_id(include: Optional[Iterable[str]]) -> Optional[list[str]]:
+    """Return fields to include, with `_id` needed to page by `_id` ranges."""
+    if include is None:
+        return None
+    include = list(include)
+    return include if "_id" in include else include + ["_id"]
@@ -2,12 +2,21 @@ import json
 import sys
 import tempfile
 from argparse import ArgumentParser, Namespace
-from typing import Any, Optional, Union
+from typing import Any, Iterator, Optional, Union
 
+# imported first to measure import time of the rest
+from . import profiling
+
+from . import batch, daemon
+from .compression import Compression
+from .concurrency import AdaptiveConcurrency
 from .constants import DEFAULT_REQUEST_THREADS_LIMIT
 from .pyxis_authentication import PyxisKrbAuth, PyxisSSLAuth, PyxisAuth
 from .pyxis_client import PyxisClient
-from .utils import setup_arg_parser
+from .tracing import PyxisTracing
+from .utils import page_size_arg, setup_arg_parser
+
+profiling.mark_imported()
 
 CMD_ARGS = {
     ("--pyxis-server",): {
@@ -40,6 +49,36 @@ CMD_ARGS = {
         "required": False,
         "type": str,
     },
+    ("--pyxis-timeout",): {
+        "help": "Seconds to wait for a connection to Pyxis and for data of its responses",
+        "required": False,
+        "type": float,
+    },
+    ("--pyxis-deadline",): {
+        "help": "Maximum seconds the operation may take, including retries and "
+        "page fetches",
+        "required": False,
+        "type": float,
+    },
+    ("--pyxis-compression",): {
+        "help": "Compress request bodies with given encoding (gzip or deflate) and "
+        "request compressed responses",
+        "required": False,
+        "type": str,
+    },
+    ("--pyxis-graphql-url",): {
+        "help": "URL of the Pyxis GraphQL API, used to query repositories and "
+        "signatures in batched requests",
+        "required": False,
+        "type": str,
+    },
+    ("--profile",): {
+        "help": "Write cProfile dump of all threads to given file and wall-clock "
+        "breakdown of import, auth, network and serialization time to "
+        "<file>.breakdown.json",
+        "required": False,
+        "type": str,
+    },
 }
 
 GET_OPERATORS_INDICES_ARGS = CMD_ARGS.copy()
@@ -90,6 +129,24 @@ UPLOAD_SIGNATURES_ARGS[("--request-threads",)] = {
     "default": DEFAULT_REQUEST_THREADS_LIMIT,
     "type": int,
 }
+UPLOAD_SIGNATURES_ARGS[("--adaptive-request-threads",)] = {
+    "help": "Adapt the number of parallel requests to latency and errors of Pyxis, "
+    "up to --request-threads",
+    "required": False,
+    "type": bool,
+}
+UPLOAD_SIGNATURES_ARGS[("--schedule-retries",)] = {
+    "help": "Retry failed requests from a delayed queue, without blocking "
+    "other requests during their backoff",
+    "required": False,
+    "type": bool,
+}
+UPLOAD_SIGNATURES_ARGS[("--quiet-results",)] = {
+    "help": "Discard response bodies and print only the number of succeeded "
+    "requests and the failures",
+    "required": False,
+    "type": bool,
+}
 
 GET_SIGNATURES_ARGS = CMD_ARGS.copy()
 GET_SIGNATURES_ARGS[("--manifest-digest",)] = {
@@ -102,6 +159,29 @@ GET_SIGNATURES_ARGS[("--reference",)] = {
     "required": False,
     "type": str,
 }
+GET_SIGNATURES_ARGS[("--fields",)] = {
+    "help": "comma separated fields of signatures to return, e.g. _id,reference",
+    "required": False,
+    "type": str,
+}
+GET_SIGNATURES_ARGS[("--page-size",)] = {
+    "help": "number of signatures fetched per request, or 'auto' for the largest "
+    "page size Pyxis allows",
+    "required": False,
+    "type": page_size_arg,
+}
+GET_SIGNATURES_ARGS[("--filter",)] = {
+    "help": "RSQL condition signatures must also satisfy, e.g. "
+    "sig_key_id==199e2f91fd431d51",
+    "required": False,
+    "type": str,
+}
+GET_SIGNATURES_ARGS[("--id-ranges",)] = {
+    "help": "page by _id instead of page numbers, fetching this many ranges of _id "
+    "in parallel",
+    "required": False,
+    "type": int,
+}
 
 DELETE_SIGNATURES_ARGS = CMD_ARGS.copy()
 DELETE_SIGNATURES_ARGS[("--ids",)] = {
@@ -115,17 +195,97 @@ DELETE_SIGNATURES_ARGS[("--request-threads",)] = {
     "default": DEFAULT_REQUEST_THREADS_LIMIT,
     "type": int,
 }
+DELETE_SIGNATURES_ARGS[("--adaptive-request-threads",)] = {
+    "help": "Adapt the number of parallel requests to latency and errors of Pyxis, "
+    "up to --request-threads",
+    "required": False,
+    "type": bool,
+}
+DELETE_SIGNATURES_ARGS[("--schedule-retries",)] = {
+    "help": "Retry failed requests from a delayed queue, without blocking "
+    "other requests during their backoff",
+    "required": False,
+    "type": bool,
+}
+DELETE_SIGNATURES_ARGS[("--quiet-results",)] = {
+    "help": "Discard response bodies and print only the number of succeeded "
+    "requests and the failures",
+    "required": False,
+    "type": bool,
+}
+
+BATCH_ARGS = CMD_ARGS.copy()
+BATCH_ARGS[("--operations",)] = {
+    "help": "Operations in JSON list or NDJSON format (as a string) or an @-prefixed "
+    "file path, e.g. --operations=@/tmp/operations.ndjson",
+    "required": True,
+    "type": str,
+}
+BATCH_ARGS[("--operation-threads",)] = {
+    "help": "Maximum number of operations to run at once",
+    "required": False,
+    "default": 4,
+    "type": int,
+}
+BATCH_ARGS[("--request-threads",)] = {
+    "help": "Maximum number of threads to use for parallel requests",
+    "required": False,
+    "default": DEFAULT_REQUEST_THREADS_LIMIT,
+    "type": int,
+}
+BATCH_ARGS[("--adaptive-request-threads",)] = {
+    "help": "Adapt the number of parallel requests to latency and errors of Pyxis, "
+    "up to --request-threads",
+    "required": False,
+    "type": bool,
+}
+BATCH_ARGS[("--schedule-retries",)] = {
+    "help": "Retry failed requests from a delayed queue, without blocking "
+    "other requests during their backoff",
+    "required": False,
+    "type": bool,
+}
 
 
-def setup_pyxis_client(args: Namespace, ccache_file: str) -> PyxisClient:
+def setup_pyxis_client(
+    args: Namespace, ccache_file: str
+) -> Union[PyxisClient, daemon.DaemonClient]:
     """
     Set up a PyxisClient instance according to specified parameters.
 
+    If a daemon (see `pubtools-pyxis-daemon`) is running, a client forwarding
+    the operations to the daemon is returned instead, unless the run is profiled,
+    as the daemon's auth and network times wouldn't show up in the profile.
+
+    Args:
+        args (argparse.Namespace)
+            Arguments of the program.
+        cache_dir (str):
+            Path to a file used for storing ccache by Kerberos authentication.
+
+    Returns:
+        PyxisClient: Configured PyxisClient instance.
+    """
+    if not getattr(args, "profile", None):
+        daemon_client = daemon.connect(args)
+        if daemon_client:
+            return daemon_client
+    return create_pyxis_client(args, ccache_file)
+
+
+def create_pyxis_client(
+    args: Namespace, ccache_file: str, reuse_threads: bool = False
+) -> PyxisClient:
+    """
+    Create a PyxisClient instance according to specified parameters.
+
     Args:
         args (argparse.Namespace)
             Arguments of the program.
         cache_dir (str):
             Path to a file used for storing ccache by Kerberos authentication.
+        reuse_threads (bool):
+            Keep worker threads of parallel requests alive between calls.
 
     Returns:
         PyxisClient: Configured PyxisClient instance.
@@ -146,15 +306,43 @@ def setup_pyxis_client(args: Namespace, ccache_file: str) -> PyxisClient:
             "files must be provided for Pyxis authentication."
         )
 
+    profile = profiling.active()
+    tracing = PyxisTracing(profile) if profile else None
+
+    options: dict[str, Any] = {}
+    if getattr(args, "pyxis_timeout", None) is not None:
+        options["timeout"] = args.pyxis_timeout
+    if getattr(args, "pyxis_deadline", None) is not None:
+        options["deadline"] = args.pyxis_deadline
+    if getattr(args, "pyxis_compression", None):
+        options["compression"] = Compression(args.pyxis_compression)
+    if getattr(args, "pyxis_graphql_url", None):
+        options["graphql_url"] = args.pyxis_graphql_url
+
+    if getattr(args, "adaptive_request_threads", False):
+        options["concurrency"] = AdaptiveConcurrency(max_limit=args.request_threads)
+    if getattr(args, "schedule_retries", False):
+        options["schedule_retries"] = True
+
     if hasattr(args, "request_threads"):
         return PyxisClient(
             args.pyxis_server,
             auth=auth,
             verify=not args.pyxis_insecure,
             threads=args.request_threads,
+            tracing=tracing,
+            reuse_threads=reuse_threads,
+            **options,
         )
     else:
-        return PyxisClient(args.pyxis_server, auth=auth, verify=not args.pyxis_insecure)
+        return PyxisClient(
+            args.pyxis_server,
+            auth=auth,
+            verify=not args.pyxis_insecure,
+            tracing=tracing,
+            reuse_threads=reuse_threads,
+            **options,
+        )
 
 
 def set_get_operator_indices_args() -> ArgumentParser:
@@ -174,6 +362,7 @@ def _get_operator_indices(sysargs: Optional[list[str]] = None) -> Union[list[str
         args = parser.parse_args(sysargs[1:])
     else:
         args = parser.parse_args()  # pragma: no cover"
+    profiling.enable(args.profile)
 
     with tempfile.NamedTemporaryFile() as tmpfile:
         pyxis_client = setup_pyxis_client(args, tmpfile.name)
@@ -191,8 +380,12 @@ def get_operator_indices_main(sysargs: Optional[list[str]] = None) -> int:
         int: Exit code (0 for success).
     """
     try:
-        resp = _get_operator_indices(sysargs)
-        json.dump(resp, sys.stdout, sort_keys=True, indent=4, separators=(",", ": "))
+        with profiling.session():
+            resp = _get_operator_indices(sysargs)
+            with profiling.timed("serialization"):
+                json.dump(
+                    resp, sys.stdout, sort_keys=True, indent=4, separators=(",", ": ")
+                )
         return 0
     except Exception as e:
         print(f"Error getting operator indices: {e}", file=sys.stderr)
@@ -208,7 +401,8 @@ def get_operator_indices_mod(
     This function is used when running the script as a module.
     It does not return an exit code, but rather prints the result directly.
     """
-    return _get_operator_indices(sysargs)
+    with profiling.session():
+        return _get_operator_indices(sysargs)
 
 
 def set_get_repo_metadata_args() -> ArgumentParser:
@@ -231,6 +425,7 @@ def _get_repo_metadata(
         args = parser.parse_args(sysargs[1:])
     else:
         args = parser.parse_args()  # pragma: no cover"
+    profiling.enable(args.profile)
 
     if args.only_internal_registry and args.only_partner_registry:
         raise ValueError(
@@ -258,8 +453,12 @@ def get_repo_metadata_main(
         int: Exit code (0 for success).
     """
     try:
-        res = _get_repo_metadata(sysargs)
-        json.dump(res, sys.stdout, sort_keys=True, indent=4, separators=(",", ": "))
+        with profiling.session():
+            res = _get_repo_metadata(sysargs)
+            with profiling.timed("serialization"):
+                json.dump(
+                    res, sys.stdout, sort_keys=True, indent=4, separators=(",", ": ")
+                )
         return 0
     except Exception as e:
         print(f"Error getting repository metadata: {e}", file=sys.stderr)
@@ -275,7 +474,8 @@ def get_repo_metadata_mod(
     This function is used when running the script as a module.
     It does not return an exit code, but rather prints the result directly.
     """
-    return _get_repo_metadata(sysargs)
+    with profiling.session():
+        return _get_repo_metadata(sysargs)
     # No return value, output is printed directly
 
 
@@ -284,24 +484,30 @@ def set_upload_signatures_args() -> ArgumentParser:
     return setup_arg_parser(UPLOAD_SIGNATURES_ARGS)
 
 
-def _upload_signatures(sysargs: Optional[list[str]] = None) -> list[Any]:
+def _upload_signatures(
+    sysargs: Optional[list[str]] = None,
+) -> Union[list[Any], dict[str, Any]]:
     """
     Entrypoint for uploading signatures from JSON or a file.
 
     Returns:
-        list: List of uploaded signatures including auto-populated fields.
+        list: List of uploaded signatures including auto-populated fields, or
+            with --quiet-results, a summary of succeeded and failed uploads.
     """
     parser = set_upload_signatures_args()
     if sysargs:
         args = parser.parse_args(sysargs[1:])
     else:
         args = parser.parse_args()  # pragma: no cover
+    profiling.enable(args.profile)
 
     signatures_json = deserialize_list_from_arg(args.signatures)
 
     with tempfile.NamedTemporaryFile() as tmpfile:
         pyxis_client = setup_pyxis_client(args, tmpfile.name)
-        resp = pyxis_client.upload_signatures(signatures_json)
+        resp = pyxis_client.upload_signatures(
+            signatures_json, return_results=not args.quiet_results
+        )
         return resp
 
 
@@ -313,22 +519,29 @@ def upload_signatures_main(sysargs: Optional[list[str]] = None) -> int:
         int: Exit code (0 for success).
     """
     try:
-        resp = _upload_signatures(sysargs)
-        json.dump(resp, sys.stdout, sort_keys=True, indent=4, separators=(",", ": "))
-        return 0
+        with profiling.session():
+            resp = _upload_signatures(sysargs)
+            with profiling.timed("serialization"):
+                json.dump(
+                    resp, sys.stdout, sort_keys=True, indent=4, separators=(",", ": ")
+                )
+        return 1 if isinstance(resp, dict) and resp["failures"] else 0
     except Exception as e:
         print(f"Error uploading signatures: {e}", file=sys.stderr)
         return 1
 
 
-def upload_signatures_mod(sysargs: Optional[list[str]] = None) -> list[Any]:
+def upload_signatures_mod(
+    sysargs: Optional[list[str]] = None,
+) -> Union[list[Any], dict[str, Any]]:
     """
     Entrypoint for uploading signatures from JSON or a file in module mode.
 
     This function is used when running the script as a module.
     It does not return an exit code, but rather prints the result directly.
     """
-    return _upload_signatures(sysargs)
+    with profiling.session():
+        return _upload_signatures(sysargs)
     # No return value, output is printed directly
 
 
@@ -350,11 +563,12 @@ def deserialize_list_from_arg(
             # convert comma separated string into list
             return value.split(",")
         # convert json string into list
-        return json.loads(value)
+        with profiling.timed("serialization"):
+            return json.loads(value)
 
     filename = value[1:]
 
-    with open(filename, "r") as f:
+    with open(filename, "r") as f, profiling.timed("serialization"):
         # all file content is returned as list
         return json.load(f)
 
@@ -381,10 +595,13 @@ def _get_signatures(sysargs: Optional[list[str]] = None) -> list[str]:
         args = parser.parse_args(sysargs[1:])
     else:
         args = parser.parse_args()  # pragma: no cover"
+    profiling.enable(args.profile)
 
     csv_references = csv_manifest_digests = None
-    if not (args.manifest_digest or args.reference):
-        parser.error("Give atleast 1 filter, --manifest-digest and/or --reference")
+    if not (args.manifest_digest or args.reference or args.filter):
+        parser.error(
+            "Give atleast 1 filter, --manifest-digest, --reference and/or --filter"
+        )
     if args.manifest_digest:
         csv_manifest_digests = serialize_to_csv_from_list(
             deserialize_list_from_arg(args.manifest_digest, csv_input=True)
@@ -396,8 +613,18 @@ def _get_signatures(sysargs: Optional[list[str]] = None) -> list[str]:
 
     with tempfile.NamedTemporaryFile() as tmpfile:
         pyxis_client = setup_pyxis_client(args, tmpfile.name)
+        options: dict[str, Any] = {}
+        if args.fields:
+            options["include"] = args.fields.split(",")
+        if args.page_size:
+            options["page_size"] = args.page_size
+        if args.filter:
+            options["filter"] = args.filter
+        if args.id_ranges:
+            options["cursor"] = True
+            options["ranges"] = args.id_ranges
         res = pyxis_client.get_container_signatures(
-            csv_manifest_digests, csv_references
+            csv_manifest_digests, csv_references, **options
         )
         return res
 
@@ -410,8 +637,12 @@ def get_signatures_main(sysargs: Optional[list[str]] = None) -> int:
         int: Exit code (0 for success).
     """
     try:
-        res = _get_signatures(sysargs)
-        json.dump(res, sys.stdout, sort_keys=True, indent=4, separators=(",", ": "))
+        with profiling.session():
+            res = _get_signatures(sysargs)
+            with profiling.timed("serialization"):
+                json.dump(
+                    res, sys.stdout, sort_keys=True, indent=4, separators=(",", ": ")
+                )
         return 0
     except Exception as e:
         print(f"Error getting signatures: {e}", file=sys.stderr)
@@ -425,7 +656,8 @@ def get_signatures_mod(sysargs: Optional[list[str]] = None) -> list[str]:
     This function is used when running the script as a module.
     It does not return an exit code, but rather prints the result directly.
     """
-    return _get_signatures(sysargs)
+    with profiling.session():
+        return _get_signatures(sysargs)
     # No return value, output is printed directly
 
 
@@ -434,25 +666,31 @@ def set_delete_signatures_args() -> ArgumentParser:
     return setup_arg_parser(DELETE_SIGNATURES_ARGS)
 
 
-def _delete_signatures(sysargs: Optional[list[str]] = None) -> None:
+def _delete_signatures(sysargs: Optional[list[str]] = None) -> Optional[dict[str, Any]]:
     """
     Entrypoint for removing existing signatures.
 
     Returns:
-        list: Signatures which were deleted.
+        dict: With --quiet-results, a summary of succeeded and failed deletes.
     """
     parser = set_delete_signatures_args()
     if sysargs:
         args = parser.parse_args(sysargs[1:])
     else:
         args = parser.parse_args()  # pragma: no cover"
+    profiling.enable(args.profile)
 
     if args.ids:
         signature_ids = deserialize_list_from_arg(args.ids, csv_input=True)
 
     with tempfile.NamedTemporaryFile() as tmpfile:
         pyxis_client = setup_pyxis_client(args, tmpfile.name)
-        pyxis_client.delete_container_signatures(signature_ids)
+        if not args.quiet_results:
+            pyxis_client.delete_container_signatures(signature_ids)
+            return None
+        return pyxis_client.delete_container_signatures(  # type: ignore[return-value]
+            signature_ids, return_results=False
+        )
 
 
 def delete_signatures_main(sysargs: Optional[list[str]] = None) -> int:
@@ -463,19 +701,177 @@ def delete_signatures_main(sysargs: Optional[list[str]] = None) -> int:
         int: Exit code (0 for success).
     """
     try:
-        _delete_signatures(sysargs)
-        return 0
+        with profiling.session():
+            resp = _delete_signatures(sysargs)
+            if resp is not None:
+                with profiling.timed("serialization"):
+                    json.dump(
+                        resp,
+                        sys.stdout,
+                        sort_keys=True,
+                        indent=4,
+                        separators=(",", ": "),
+                    )
+        return 1 if resp and resp["failures"] else 0
     except Exception as e:
         print(f"Error deleting signatures: {e}", file=sys.stderr)
         return 1
 
 
-def delete_signatures_mod(sysargs: Optional[list[str]] = None) -> None:
+def delete_signatures_mod(
+    sysargs: Optional[list[str]] = None,
+) -> Optional[dict[str, Any]]:
     """
     Entrypoint for removing existing signatures in module mode.
 
     This function is used when running the script as a module.
     It does not return an exit code, but rather prints the result directly.
     """
-    return _delete_signatures(sysargs)
+    with profiling.session():
+        return _delete_signatures(sysargs)
     # No return value, output is printed directly
+
+
+def set_batch_args() -> ArgumentParser:
+    """Set up argparser without extra parameters, this method is used for auto doc generation."""
+    return setup_arg_parser(BATCH_ARGS)
+
+
+def _batch(sysargs: Optional[list[str]] = None) -> Iterator[dict[str, Any]]:
+    """
+    Entrypoint for running a batch of operations on a single client.
+
+    Yields:
+        dict: Result of every operation, see `batch.run_batch`.
+    """
+    parser = set_batch_args()
+    if sysargs:
+        args = parser.parse_args(sysargs[1:])
+    else:
+        args = parser.parse_args()  # pragma: no cover
+    profiling.enable(args.profile)
+
+    if args.operations.startswith("@"):
+        with open(args.operations[1:], "r") as f:
+            text = f.read()
+    else:
+        text = args.operations
+    with profiling.timed("serialization"):
+        operations = batch.load_operations(text)
+
+    with tempfile.NamedTemporaryFile() as tmpfile:
+        pyxis_client = create_pyxis_client(args, tmpfile.name, reuse_threads=True)
+        try:
+            yield from batch.run_batch(pyxis_client, operations, args.operation_threads)
+        finally:
+            pyxis_client.close()
+
+
+def batch_main(sysargs: Optional[list[str]] = None) -> int:
+    """
+    Entrypoint for running a batch of operations on a single client.
+
+    Results are printed as JSON lines, one per operation.
+
+    Returns:
+        int: Exit code (0 if all operations succeeded).
+    """
+    failed = False
+    try:
+        with profiling.session():
+            for result in _batch(sysargs):
+                failed = failed or "error" in result
+                with profiling.timed("serialization"):
+                    json.dump(result, sys.stdout, sort_keys=True)
+                print(flush=True)
+    except Exception as e:
+        print(f"Error running batch: {e}", file=sys.stderr)
+        return 1
+    return 1 if failed else 0
+
+
+def batch_mod(sysargs: Optional[list[str]] = None) -> list[dict[str, Any]]:
+    """
+    Entrypoint for running a batch of operations in module mode.
+
+    This function is used when running the script as a module.
+    It does not return an exit code, but rather returns results of the operations.
+    """
+    with profiling.session():
+        return list(_batch(sysargs))
+
+
+DAEMON_ARGS = {
+    ("--socket",): {
+        "help": "Path of the Unix socket to listen on. Defaults to "
+        "$PUBTOOLS_PYXIS_DAEMON_SOCKET or a per-user socket in $XDG_RUNTIME_DIR.",
+        "required": False,
+        "type": str,
+    },
+    ("--workers",): {
+        "help": "Number of threads running forwarded operations",
+        "required": False,
+        "default": 8,
+        "type": int,
+    },
+    ("--client-ttl",): {
+        "help": "Seconds after which a client, and its Kerberos ticket, is renewed",
+        "required": False,
+        "default": 3600,
+        "type": float,
+    },
+    ("--idle-timeout",): {
+        "help": "Seconds without requests after which the daemon exits. 0 means never.",
+        "required": False,
+        "default": 0,
+        "type": float,
+    },
+    ("--stop",): {
+        "help": "Stop the running daemon",
+        "required": False,
+        "type": bool,
+    },
+}
+
+
+def set_daemon_args() -> ArgumentParser:
+    """Set up argparser without extra parameters, this method is used for auto doc generation."""
+    return setup_arg_parser(DAEMON_ARGS)
+
+
+def daemon_main(sysargs: Optional[list[str]] = None) -> int:
+    """
+    Entrypoint running a daemon which other entrypoints forward their work to.
+
+    Returns:
+        int: Exit code (0 for success).
+    """
+    parser = set_daemon_args()
+    if sysargs:
+        args = parser.parse_args(sysargs[1:])
+    else:
+        args = parser.parse_args()  # pragma: no cover
+
+    if args.stop:
+        if not daemon.stop(args.socket):
+            print("Daemon is not running", file=sys.stderr)
+            return 1
+        return 0
+
+    pyxis_daemon = daemon.PyxisDaemon(
+        args.socket,
+        workers=args.workers,
+        client_ttl=args.client_ttl,
+        idle_timeout=args.idle_timeout,
+    )
+    try:
+        pyxis_daemon.start()
+    except daemon.DaemonError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    print("Listening on %s" % pyxis_daemon.socket_path, file=sys.stderr)
+    try:
+        pyxis_daemon.serve_forever()
+    except KeyboardInterrupt:  # pragma: no cover
+        pass
+    return 0
@@ -1,8 +1,13 @@
-from typing import Any
+from typing import Any, Optional
 
 import requests
 from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+
+from . import deadline
+from .circuit_breaker import CircuitBreaker, CircuitBreakers
+from .compression import Compression
+from .constants import DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, RETRY_STATUSES
+from .tracing import NO_TRACING, PyxisTracing
 
 
 class PyxisSession:
@@ -14,6 +19,14 @@ class PyxisSession:
         retries: int = 5,
         backoff_factor: int = 5,
         verify: bool = False,
+        tracing: Optional[PyxisTracing] = None,
+        circuit_breakers: Optional[CircuitBreakers] = None,
+        timeout: deadline.RequestTimeout = (
+            DEFAULT_CONNECT_TIMEOUT,
+            DEFAULT_READ_TIMEOUT,
+        ),
+        compression: Optional[Compression] = None,
+        raise_on_status: bool = True,
     ) -> None:
         """
         Initialize.
@@ -27,19 +40,40 @@ class PyxisSession:
                 backoff factor to apply between attempts after the second try.
             verify (bool)
                 enable/disable SSL CA verification.
+            tracing (PyxisTracing)
+                tracing of the HTTP requests. Disabled if not specified.
+            circuit_breakers (CircuitBreakers)
+                circuit breakers failing requests fast while their endpoint keeps
+                failing. Disabled if not specified.
+            timeout (float or tuple)
+                timeout of every attempt of a request: seconds, or (connect, read)
+                seconds. Shortened to the deadline of the current operation.
+            compression (Compression)
+                compression of JSON request bodies and negotiation of compressed
+                responses. Disabled if not specified.
+            raise_on_status (bool)
+                raise `RetryError` when the last attempt of a request gets a
+                retried status (e.g. 503), instead of returning the response.
         """
         self.session = requests.Session()
         self.hostname = hostname
         self.session.verify = verify
         self.krb5ccname_path = None
-
-        status_forcelist = list(range(500, 512)) + [429]
-        retry = Retry(
+        self.tracing = tracing or NO_TRACING
+        self.circuit_breakers = circuit_breakers
+        self.timeout = timeout
+        self.compression = compression
+        if compression is not None:
+            self.session.headers["Accept-Encoding"] = compression.accept_encoding
+
+        # retries stop at the deadline of the current operation
+        retry = deadline.DeadlineRetry(
             total=retries,
             read=retries,
             connect=retries,
             backoff_factor=backoff_factor,
-            status_forcelist=status_forcelist,
+            status_forcelist=RETRY_STATUSES,
+            raise_on_status=raise_on_status,
             allowed_methods=[
                 "HEAD",
                 "GET",
@@ -64,7 +98,7 @@ class PyxisSession:
         Returns:
             requests.Response: A response object.
         """
-        return self.session.get(self._api_url(endpoint), **kwargs)
+        return self._request("get", endpoint, **kwargs)
 
     def post(self, endpoint: str, **kwargs: Any) -> requests.Response:
         """
@@ -76,7 +110,7 @@ class PyxisSession:
         Returns:
             requests.Response: A response object.
         """
-        return self.session.post(self._api_url(endpoint), **kwargs)
+        return self._request("post", endpoint, **kwargs)
 
     def put(self, endpoint: str, **kwargs: Any) -> requests.Response:
         """
@@ -88,7 +122,7 @@ class PyxisSession:
         Returns:
             requests.Response: A response object.
         """
-        return self.session.put(self._api_url(endpoint), **kwargs)
+        return self._request("put", endpoint, **kwargs)
 
     def delete(self, endpoint: str, **kwargs: Any) -> requests.Response:
         """
@@ -100,7 +134,88 @@ class PyxisSession:
         Returns:
             requests.Response: A response object.
         """
-        return self.session.delete(self._api_url(endpoint), **kwargs)
+        return self._request("delete", endpoint, **kwargs)
+
+    def _request(self, method: str, endpoint: str, **kwargs: Any) -> requests.Response:
+        """
+        Send HTTP request against Pyxis server API, unless its circuit is open.
+
+        Requests failing with a server error, after all retries, count as failures
+        of the endpoint's circuit breaker, if enabled. Requests cut short by the
+        deadline of the current operation don't count.
+
+        Args:
+            method (str): Name of the requests method.
+            endpoint (str): Endpoint of the request.
+            **kwargs: Additional arguments to add to the requests method.
+        Returns:
+            requests.Response: A response object.
+        Raises:
+            CircuitOpenError: If the circuit of the endpoint is open.
+            DeadlineExceeded: If the deadline of the current operation expires.
+        """
+        url = self._api_url(endpoint)
+        if self.compression is not None and kwargs.get("json") is not None:
+            self.compression.compress_json(kwargs)
+        kwargs["timeout"] = deadline.request_timeout(
+            kwargs.get("timeout", self.timeout)
+        )
+        breaker = None
+        if self.circuit_breakers is not None:
+            breaker = self.circuit_breakers.for_endpoint(endpoint)
+            breaker.before_request(endpoint)
+
+        response = None
+        failed = False
+        try:
+            response = self._send(method, url, **kwargs)
+        except requests.exceptions.RequestException as e:
+            if not isinstance(e, deadline.DeadlineExceeded):
+                # timed out, or ran out of retries, because of the deadline
+                deadline.check(cause=e)
+                failed = True
+            raise
+        finally:
+            # every request sent, even a half-open probe, ends with an outcome
+            if breaker is not None:
+                _record_outcome(breaker, response, failed)
+
+        if self.compression is not None and not kwargs.get("stream"):
+            self.compression.record_response(response)
+        return response
+
+    def _send(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """
+        Send HTTP request, in a span if tracing is enabled.
+
+        Args:
+            method (str): Name of the requests method.
+            url (str): Full URL of the request.
+            **kwargs: Additional arguments to add to the requests method.
+        Returns:
+            requests.Response: A response object.
+        """
+        send = getattr(self.session, method)
+        if not self.tracing.enabled:
+            return send(url, **kwargs)  # type: ignore[no-any-return]
+
+        with self.tracing.span(
+            "pyxis.http", **{"http.method": method.upper(), "http.url": url}
+        ) as span:
+            if kwargs.get("params"):
+                span.set_attribute("http.params", str(kwargs["params"]))
+            kwargs["headers"] = self.tracing.inject_headers(kwargs.get("headers"))
+            response = send(url, **kwargs)
+            span.set_attribute("http.status_code", response.status_code)
+            # attempts retried by urllib3 within this request
+            retries = getattr(response.raw, "retries", None)
+            if retries is not None and retries.history:
+                span.set_attribute("http.retries", len(retries.history))
+                span.set_attribute(
+                    "http.retry_statuses",
+                    [attempt.status or 0 for attempt in retries.history],
+                )
+            return response  # type: ignore[no-any-return]
 
     def _api_url(self, endpoint: str) -> str:
         """
@@ -112,6 +227,9 @@ class PyxisSession:
         Returns:
             str: Full URL of the endpoint.
         """
+        if endpoint.startswith(("http://", "https://")):
+            # APIs other than REST, e.g. GraphQL
+            return endpoint
         if "http://" not in self.hostname and "https://" not in self.hostname:
             return "https://%s/v1/%s" % (self.hostname.rstrip("/"), endpoint)
         else:
@@ -120,3 +238,18 @@ class PyxisSession:
     def close(self) -> None:
         """Close the current session."""
         self.session.close()
+
+
+def _record_outcome(
+    breaker: CircuitBreaker, response: Optional[requests.Response], failed: bool
+) -> None:
+    """Count the outcome of a request in the circuit breaker of its endpoint."""
+    if response is not None:
+        failed = response.status_code >= 500 or response.status_code == 429
+    if failed:
+        breaker.record_failure()
+    elif response is not None:
+        breaker.record_success()
+    else:
+        # cut short by the deadline, or failed before getting to Pyxis
+        breaker.record_cancelled()
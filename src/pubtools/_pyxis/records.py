@@ -0,0 +1,108 @@
+import base64
+import sys
+from typing import Any, Optional
+
+SIGNATURE_FIELDS = (
+    "_id",
+    "manifest_digest",
+    "reference",
+    "sig_key_id",
+    "repository",
+    "signature_data",
+)
+"Fields of signature metadata kept by `SignatureRecord`."
+
+
+class SignatureRecord:
+    """Compact container signature metadata.
+
+    Records take a fraction of the memory of the dictionaries returned by Pyxis:
+    they have no per-instance dictionary, keep only the `SIGNATURE_FIELDS` and
+    share the strings repeated across many signatures (manifest digests,
+    repositories and key IDs). The base64-encoded signature is kept as received
+    and only decoded when `signature` is accessed.
+    """
+
+    __slots__ = SIGNATURE_FIELDS
+
+    def __init__(
+        self,
+        _id: Optional[str] = None,
+        manifest_digest: Optional[str] = None,
+        reference: Optional[str] = None,
+        sig_key_id: Optional[str] = None,
+        repository: Optional[str] = None,
+        signature_data: Optional[str] = None,
+    ) -> None:
+        """
+        Initialize.
+
+        Args:
+            _id (str)
+                Internal Pyxis ID of the signature.
+            manifest_digest (str)
+                Digest of the signed manifest.
+            reference (str)
+                Pull reference of the signed image.
+            sig_key_id (str)
+                ID of the signing key.
+            repository (str)
+                Repository of the signed image.
+            signature_data (str)
+                Base64-encoded signature.
+        """
+        self._id = _id
+        self.manifest_digest = _intern(manifest_digest)
+        self.reference = reference
+        self.sig_key_id = _intern(sig_key_id)
+        self.repository = _intern(repository)
+        self.signature_data = signature_data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "SignatureRecord":
+        """
+        Create a record from signature metadata returned by Pyxis.
+
+        Args:
+            data (dict)
+                Signature metadata. Fields other than `SIGNATURE_FIELDS` are dropped.
+        Returns:
+            SignatureRecord: Record with fields of the metadata.
+        """
+        return cls(
+            data.get("_id"),
+            data.get("manifest_digest"),
+            data.get("reference"),
+            data.get("sig_key_id"),
+            data.get("repository"),
+            data.get("signature_data"),
+        )
+
+    @property
+    def signature(self) -> Optional[bytes]:
+        """Return decoded signature data."""
+        if self.signature_data is None:
+            return None
+        return base64.b64decode(self.signature_data)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the record as signature metadata, e.g. for JSON serialization."""
+        return {field: getattr(self, field) for field in SIGNATURE_FIELDS}
+
+    def __eq__(self, other: object) -> bool:
+        """Compare all fields of the records."""
+        if not isinstance(other, SignatureRecord):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        """Show identifying fields of the record."""
+        return "SignatureRecord(_id=%r, manifest_digest=%r, reference=%r)" % (
+            self._id,
+            self.manifest_digest,
+            self.reference,
+        )
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value is not None else None
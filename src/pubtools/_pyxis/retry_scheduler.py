@@ -0,0 +1,153 @@
+import heapq
+import itertools
+import time
+from typing import Any, Iterator, NamedTuple, Optional
+
+from requests.exceptions import RequestException
+from urllib3.util.retry import Retry
+
+from . import deadline
+from .circuit_breaker import CircuitOpenError
+from .constants import RETRY_STATUSES
+
+
+class ScheduledRetry(NamedTuple):
+    """Data item of a failed request, to be sent again after a delay."""
+
+    data: Any
+    attempt: int
+    delay: float
+
+
+class RetryScheduler:
+    """Retries of parallel requests which don't block worker threads.
+
+    Sessions of worker threads send parallel requests (uploads and deletes)
+    without retries. A request failing with a connection error, 429 or a server
+    error (`RETRY_STATUSES`) is instead put on a `DelayedQueue` and the worker
+    moves on to other items, rather than sleeping through the backoff. Delays
+    follow the backoff of `PyxisSession` and Retry-After, and never pass the
+    deadline of the operation.
+
+    Example:
+    ::
+
+        client = PyxisClient("pyxis-server-url", schedule_retries=True)
+        client.delete_container_signatures(signature_ids)
+    """
+
+    def __init__(
+        self, retries: int = 5, backoff_factor: float = 5, max_backoff: float = 120
+    ) -> None:
+        """
+        Initialize.
+
+        Args:
+            retries (int)
+                number of retries of a request.
+            backoff_factor (float)
+                backoff factor to apply between attempts after the second try.
+            max_backoff (float)
+                longest delay of a retry, in seconds.
+        """
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self._retry_after = Retry(respect_retry_after_header=True)
+
+    def should_retry(
+        self,
+        attempt: int,
+        response: Any = None,
+        error: Optional[Exception] = None,
+    ) -> bool:
+        """
+        Return whether a failed attempt of a request should be scheduled again.
+
+        Args:
+            attempt (int)
+                number of the attempt, starting with 1.
+            response (requests.Response)
+                response of the attempt, if any.
+            error (Exception)
+                exception raised by the attempt, if any.
+        Returns:
+            bool: True if the request should be retried.
+        """
+        if attempt > self.retries:
+            return False
+        if error is not None:
+            # requests which can't succeed before the deadline or the circuit closes
+            return isinstance(error, RequestException) and not isinstance(
+                error, (deadline.DeadlineExceeded, CircuitOpenError)
+            )
+        return response is not None and response.status_code in RETRY_STATUSES
+
+    def delay(self, attempt: int, response: Any = None) -> float:
+        """
+        Return seconds to wait before the next attempt of a request.
+
+        Args:
+            attempt (int)
+                number of the failed attempt, starting with 1.
+            response (requests.Response)
+                response of the failed attempt, if any, to respect Retry-After.
+        Returns:
+            float: Seconds, cut to the time remaining until the deadline.
+        """
+        retry_after = None
+        if response is not None:
+            retry_after = self._retry_after.get_retry_after(response)
+        if retry_after is not None:
+            seconds = retry_after
+        elif attempt <= 1:
+            seconds = 0
+        else:
+            seconds = min(self.backoff_factor * 2 ** (attempt - 1), self.max_backoff)
+        left = deadline.remaining()
+        return seconds if left is None else max(min(seconds, left), 0)
+
+
+class DelayedQueue:
+    """Queue of `ScheduledRetry` items, available once their delay passes."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._heap: list[tuple[float, int, ScheduledRetry]] = []
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        """Return the number of scheduled items."""
+        return len(self._heap)
+
+    def push(self, retry: ScheduledRetry) -> None:
+        """
+        Schedule an item.
+
+        Args:
+            retry (ScheduledRetry)
+                item to be available after its delay.
+        """
+        due = time.monotonic() + retry.delay
+        heapq.heappush(self._heap, (due, next(self._counter), retry))
+
+    def pop_due(self, count: int) -> Iterator[ScheduledRetry]:
+        """
+        Take up to `count` items whose delay has passed, earliest first.
+
+        Args:
+            count (int)
+                highest number of items to take.
+        Yields:
+            ScheduledRetry: Items due now.
+        """
+        now = time.monotonic()
+        while count > 0 and self._heap and self._heap[0][0] <= now:
+            count -= 1
+            yield heapq.heappop(self._heap)[2]
+
+    def wait_time(self) -> Optional[float]:
+        """Return seconds until the next item is due, None if there are none."""
+        if not self._heap:
+            return None
+        return max(self._heap[0][0] - time.monotonic(), 0)
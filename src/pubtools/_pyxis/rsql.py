@@ -0,0 +1,274 @@
+import datetime
+import re
+from typing import Any, Iterable, Union
+
+Value = Union[str, int, float, bool, datetime.datetime]
+"Types of values compared in filters."
+
+_PLAIN_VALUE = re.compile(r"""[^\s"'(),;=!~<>]+""")
+
+
+class Expression:
+    """RSQL filter expression of Pyxis queries.
+
+    Expressions are combined with ``&`` (and) and ``|`` (or), and rendered by
+    `str` in a compact form: nested expressions of the same kind are flattened,
+    repeated conditions are dropped, equality conditions of a field joined by
+    "or" are merged into a single ``=in=`` (and ``!=`` joined by "and" into a
+    single ``=out=``), and parentheses are only added where needed.
+
+    Example:
+    ::
+
+        expression = (
+            SignatureFields.reference.in_(["registry.io/ns/a:1", "registry.io/ns/a:2"])
+            | SignatureFields.reference.eq("registry.io/ns/b:1")
+        ) & SignatureFields.sig_key_id.ne("199e2f91fd431d51")
+        str(expression)
+        # reference=in=(registry.io/ns/a:1,registry.io/ns/a:2,registry.io/ns/b:1);
+        # sig_key_id!=199e2f91fd431d51
+    """
+
+    def __and__(self, other: "Expression") -> "Expression":
+        """Return an expression matching both expressions."""
+        return And(self, other)
+
+    def __or__(self, other: "Expression") -> "Expression":
+        """Return an expression matching any of the expressions."""
+        return Or(self, other)
+
+    def __str__(self) -> str:
+        """Return the compacted RSQL of the expression."""
+        return self.compact().render()
+
+    def compact(self) -> "Expression":
+        """Return an equivalent expression with a shorter RSQL."""
+        return self
+
+    def render(self) -> str:
+        """Return the RSQL of the expression as it is."""
+        raise NotImplementedError  # pragma: no cover
+
+
+class Raw(Expression):
+    """RSQL expression given as a string, e.g. by users."""
+
+    def __init__(self, text: str) -> None:
+        """
+        Initialize.
+
+        Args:
+            text (str)
+                RSQL expression.
+        """
+        self.text = text
+
+    def render(self) -> str:
+        """Return the RSQL of the expression as it is."""
+        return self.text
+
+
+class Comparison(Expression):
+    """Comparison of a field with values."""
+
+    def __init__(self, field: str, operator: str, *values: Value) -> None:
+        """
+        Initialize.
+
+        Args:
+            field (str)
+                name of the compared field, dotted for nested fields.
+            operator (str)
+                RSQL operator, e.g. "==" or "=in=".
+            values
+                compared values, one unless the operator takes a list.
+        """
+        self.field = field
+        self.operator = operator
+        self.values = values
+
+    def render(self) -> str:
+        """Return the RSQL of the expression as it is."""
+        values = [_format(value) for value in self.values]
+        if self.operator in ("=in=", "=out="):
+            return "%s%s(%s)" % (self.field, self.operator, ",".join(values))
+        return "%s%s%s" % (self.field, self.operator, values[0])
+
+
+class _Composite(Expression):
+    separator = ""
+    # (single, list) operators of comparisons merged when joined by separator
+    merged = ("", "")
+
+    def __init__(self, *operands: Expression) -> None:
+        """
+        Initialize.
+
+        Args:
+            operands
+                joined expressions, none for an empty expression.
+        """
+        self.operands = operands
+
+    def compact(self) -> Expression:
+        """Return an equivalent expression with a shorter RSQL."""
+        operands: list[Expression] = []
+        for operand in self.operands:
+            operand = operand.compact()
+            if isinstance(operand, _Composite) and not operand.operands:
+                continue
+            if isinstance(operand, type(self)):
+                operands.extend(operand.operands)
+            else:
+                operands.append(operand)
+        operands = _dedupe(self._merge(operands))
+        if len(operands) == 1:
+            return operands[0]
+        return type(self)(*operands)
+
+    def _merge(self, operands: list[Expression]) -> list[Expression]:
+        """Merge comparisons of the same field into a list comparison."""
+        merged: dict[str, Comparison] = {}
+        result: list[Expression] = []
+        for operand in operands:
+            if not _mergeable(operand, self.merged):
+                result.append(operand)
+                continue
+            assert isinstance(operand, Comparison)
+            first = merged.get(operand.field)
+            if first is None:
+                merged[operand.field] = operand
+                result.append(operand)
+                continue
+            values = first.values + tuple(
+                value for value in operand.values if value not in first.values
+            )
+            combined = Comparison(operand.field, self.merged[1], *values)
+            result[result.index(first)] = merged[operand.field] = combined
+        return result
+
+    def render(self) -> str:
+        """Return the RSQL of the expression as it is."""
+        return self.separator.join(self._render_operand(o) for o in self.operands)
+
+    def _render_operand(self, operand: Expression) -> str:
+        return operand.render()
+
+
+class And(_Composite):
+    """Expression matching all of its operands."""
+
+    separator = ";"
+    merged = ("!=", "=out=")
+
+    def _render_operand(self, operand: Expression) -> str:
+        text = operand.render()
+        # "and" binds tighter than "or"
+        if isinstance(operand, Or) or isinstance(operand, Raw) and "," in text:
+            return "(%s)" % text
+        return text
+
+
+class Or(_Composite):
+    """Expression matching any of its operands."""
+
+    separator = ","
+    merged = ("==", "=in=")
+
+
+class Field:
+    """Field of Pyxis records, making comparisons with values."""
+
+    def __init__(self, name: str) -> None:
+        """
+        Initialize.
+
+        Args:
+            name (str)
+                name of the field, dotted for nested fields.
+        """
+        self.name = name
+
+    def eq(self, value: Value) -> Comparison:
+        """Field equals the value, which may have "*" wildcards."""
+        return Comparison(self.name, "==", value)
+
+    def ne(self, value: Value) -> Comparison:
+        """Field doesn't equal the value."""
+        return Comparison(self.name, "!=", value)
+
+    def gt(self, value: Value) -> Comparison:
+        """Field is greater than the value."""
+        return Comparison(self.name, "=gt=", value)
+
+    def ge(self, value: Value) -> Comparison:
+        """Field is greater than or equal to the value."""
+        return Comparison(self.name, "=ge=", value)
+
+    def lt(self, value: Value) -> Comparison:
+        """Field is less than the value."""
+        return Comparison(self.name, "=lt=", value)
+
+    def le(self, value: Value) -> Comparison:
+        """Field is less than or equal to the value."""
+        return Comparison(self.name, "=le=", value)
+
+    def in_(self, values: Iterable[Value]) -> Comparison:
+        """Field equals one of the values."""
+        return Comparison(self.name, "=in=", *_unique(values))
+
+    def out(self, values: Iterable[Value]) -> Comparison:
+        """Field equals none of the values."""
+        return Comparison(self.name, "=out=", *_unique(values))
+
+    def like(self, value: str) -> Comparison:
+        """Field contains the value."""
+        return Comparison(self.name, "=like=", value)
+
+
+class SignatureFields:
+    """Fields of container signatures which queries can filter on."""
+
+    id = Field("_id")
+    manifest_digest = Field("manifest_digest")
+    reference = Field("reference")
+    repository = Field("repository")
+    sig_key_id = Field("sig_key_id")
+    creation_date = Field("creation_date")
+    last_update_date = Field("last_update_date")
+
+
+def as_expression(value: Union[Expression, str]) -> Expression:
+    """Return given expression, or RSQL string as a `Raw` expression."""
+    return value if isinstance(value, Expression) else Raw(value)
+
+
+def _format(value: Value) -> str:
+    """Render a value, quoted if it has characters reserved by RSQL."""
+    if isinstance(value, datetime.datetime):
+        value = value.isoformat()
+    elif isinstance(value, bool):
+        value = "true" if value else "false"
+    text = str(value)
+    if _PLAIN_VALUE.fullmatch(text):
+        return text
+    return '"%s"' % text.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _mergeable(operand: Expression, operators: tuple[str, str]) -> bool:
+    """Return whether a comparison can be merged into a list comparison."""
+    if not isinstance(operand, Comparison) or operand.operator not in operators:
+        return False
+    # "==" and "!=" match "*" as a wildcard, unlike list comparisons
+    return operand.operator == operators[1] or "*" not in str(operand.values[0])
+
+
+def _unique(values: Iterable[Any]) -> list[Any]:
+    return list(dict.fromkeys(values))
+
+
+def _dedupe(operands: list[Expression]) -> list[Expression]:
+    rendered: dict[str, Expression] = {}
+    for operand in operands:
+        rendered.setdefault(operand.render(), operand)
+    return list(rendered.values())
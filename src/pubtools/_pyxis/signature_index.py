@@ -0,0 +1,205 @@
+from typing import Any, Iterable, Iterator, Optional, Union
+
+from .records import SIGNATURE_FIELDS, SignatureRecord
+
+INDEXED_FIELDS = ("_id", "manifest_digest", "reference", "sig_key_id", "repository")
+"Fields of signatures which can be looked up in `SignatureIndex`."
+
+IDENTITY_FIELDS = ("manifest_digest", "reference", "sig_key_id")
+"Fields identifying a signature when comparing indexes, like the Pyxis unique key."
+
+
+class SignatureIndex:
+    """Columnar in-memory index of container signatures.
+
+    Every field of the signatures is stored in its own column, with the strings
+    repeated across signatures (digests, keys, repositories) interned. Signatures
+    can be looked up by any of the `INDEXED_FIELDS` in constant time, and indexes
+    can be combined with set operators (``|``, ``&``, ``-``) comparing signatures
+    by `IDENTITY_FIELDS`.
+
+    Example:
+    ::
+
+        index = SignatureIndex(client.iter_container_signatures(digests))
+        signed_by_key = index.distinct("manifest_digest", sig_key_id="199E2F91FD431D51")
+        unsigned = index.missing("reference", expected_references)
+    """
+
+    def __init__(
+        self, signatures: Iterable[Union[dict[str, Any], SignatureRecord]] = ()
+    ) -> None:
+        """
+        Initialize.
+
+        Args:
+            signatures (iterable)
+                Signature metadata (dicts or `SignatureRecord`) to add, e.g. a stream
+                of signatures returned by `PyxisClient.iter_container_signatures`.
+        """
+        self._columns: dict[str, list[Optional[str]]] = {
+            field: [] for field in SIGNATURE_FIELDS
+        }
+        self._rows: dict[str, dict[Optional[str], list[int]]] = {
+            field: {} for field in INDEXED_FIELDS
+        }
+        self._identities: dict[tuple[Optional[str], ...], int] = {}
+        self.update(signatures)
+
+    def add(self, signature: Union[dict[str, Any], SignatureRecord]) -> bool:
+        """
+        Add a signature unless the index has one with the same identity.
+
+        Args:
+            signature (dict or SignatureRecord)
+                Signature metadata.
+        Returns:
+            bool: Whether the signature was added.
+        """
+        if not isinstance(signature, SignatureRecord):
+            # records intern the strings repeated across signatures
+            signature = SignatureRecord.from_dict(signature)
+        values = {field: getattr(signature, field) for field in SIGNATURE_FIELDS}
+        identity = tuple(values[field] for field in IDENTITY_FIELDS)
+        if identity in self._identities:
+            return False
+
+        row = len(self)
+        self._identities[identity] = row
+        for field, value in values.items():
+            self._columns[field].append(value)
+        for field in INDEXED_FIELDS:
+            self._rows[field].setdefault(values[field], []).append(row)
+        return True
+
+    def update(
+        self, signatures: Iterable[Union[dict[str, Any], SignatureRecord]]
+    ) -> None:
+        """Add all given signatures, see `add`."""
+        for signature in signatures:
+            self.add(signature)
+
+    def record(self, row: int) -> SignatureRecord:
+        """Return the signature stored at given row."""
+        return SignatureRecord(
+            *(self._columns[field][row] for field in SIGNATURE_FIELDS)
+        )
+
+    def lookup(self, field: str, value: str) -> list[SignatureRecord]:
+        """
+        Return signatures with given value of a field.
+
+        Args:
+            field (str)
+                One of `INDEXED_FIELDS`.
+            value (str)
+                Value of the field.
+        Returns:
+            list: Matching signatures, in the order they were added.
+        """
+        return [self.record(row) for row in self._index(field).get(value, ())]
+
+    def by_digest(self, manifest_digest: str) -> list[SignatureRecord]:
+        """Return signatures of given manifest digest."""
+        return self.lookup("manifest_digest", manifest_digest)
+
+    def by_reference(self, reference: str) -> list[SignatureRecord]:
+        """Return signatures of given pull reference."""
+        return self.lookup("reference", reference)
+
+    def by_key(self, sig_key_id: str) -> list[SignatureRecord]:
+        """Return signatures made by given signing key."""
+        return self.lookup("sig_key_id", sig_key_id)
+
+    def by_repository(self, repository: str) -> list[SignatureRecord]:
+        """Return signatures of given repository."""
+        return self.lookup("repository", repository)
+
+    def distinct(self, field: str, **where: str) -> set[Optional[str]]:
+        """
+        Return distinct values of a field, optionally of matching signatures only.
+
+        Args:
+            field (str)
+                Field whose values are returned.
+            **where
+                Values of `INDEXED_FIELDS` the signatures must have, e.g.
+                ``distinct("manifest_digest", sig_key_id="199E2F91FD431D51")``.
+        Returns:
+            set: Values of the field.
+        """
+        if not where:
+            if field in self._rows:
+                return set(self._rows[field])
+            return set(self._columns[field])
+
+        rows: Optional[set[int]] = None
+        for where_field, value in where.items():
+            matching = set(self._index(where_field).get(value, ()))
+            rows = matching if rows is None else rows & matching
+        column = self._columns[field]
+        return {column[row] for row in rows or ()}
+
+    def missing(self, field: str, values: Iterable[str]) -> set[str]:
+        """
+        Return given values of a field which no signature has.
+
+        Args:
+            field (str)
+                One of `INDEXED_FIELDS`, e.g. "reference".
+            values (iterable)
+                Expected values, e.g. references which should be signed.
+        Returns:
+            set: Values without any signature.
+        """
+        index = self._index(field)
+        return {value for value in values if value not in index}
+
+    def _index(self, field: str) -> dict[Optional[str], list[int]]:
+        if field not in self._rows:
+            raise ValueError(
+                "Field %r is not indexed, expected one of: %s"
+                % (field, ", ".join(INDEXED_FIELDS))
+            )
+        return self._rows[field]
+
+    def _identity(self, row: int) -> tuple[Optional[str], ...]:
+        return tuple(self._columns[field][row] for field in IDENTITY_FIELDS)
+
+    def __len__(self) -> int:
+        """Return number of signatures."""
+        return len(self._columns["_id"])
+
+    def __iter__(self) -> Iterator[SignatureRecord]:
+        """Iterate over signatures in the order they were added."""
+        return (self.record(row) for row in range(len(self)))
+
+    def __contains__(self, signature: object) -> bool:
+        """Return whether a signature with the same identity is in the index."""
+        if isinstance(signature, SignatureRecord):
+            signature = signature.to_dict()
+        if not isinstance(signature, dict):
+            return False
+        return tuple(signature.get(f) for f in IDENTITY_FIELDS) in self._identities
+
+    def __or__(self, other: "SignatureIndex") -> "SignatureIndex":
+        """Return signatures of either index."""
+        union = SignatureIndex(self)
+        union.update(other)
+        return union
+
+    def __and__(self, other: "SignatureIndex") -> "SignatureIndex":
+        """Return signatures of this index which are also in the other one."""
+        return SignatureIndex(
+            self.record(row)
+            for row in range(len(self))
+            if self._identity(row) in other._identities
+        )
+
+    def __sub__(self, other: "SignatureIndex") -> "SignatureIndex":
+        """Return signatures of this index which are not in the other one."""
+        return SignatureIndex(
+            self.record(row)
+            for row in range(len(self))
+            if self._identity(row) not in other._identities
+        )
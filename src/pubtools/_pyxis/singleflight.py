@@ -0,0 +1,81 @@
+import copy
+import functools
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, TypeVar, cast
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls into a single one.
+
+    While a call with some key is running, other calls with the same key wait
+    for it and get a copy of its result (or its exception) instead of running
+    on their own, so no caller sees another one modify its result.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, "Future[Any]"] = {}
+
+    def do(
+        self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any
+    ) -> Any:
+        """
+        Call the function unless a call with the same key is already running.
+
+        Args:
+            key (hashable)
+                Key identifying identical calls.
+            fn (function)
+                Function to call.
+            *args, **kwargs
+                Arguments of the function.
+        Returns:
+            Result of the function, copied for every coalesced caller but the
+            one which called it.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if future is None:
+                future = self._calls[key] = Future()
+        if not leader:
+            return copy.deepcopy(future.result())
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+def coalesced(method: F) -> F:
+    """
+    Coalesce concurrent calls of the method with the same arguments.
+
+    Calls are coalesced by the `single_flight` attribute of the instance, which
+    is a `SingleFlight` or None if disabled.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        single_flight = self.single_flight
+        if single_flight is None:
+            return method(self, *args, **kwargs)
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return method(self, *args, **kwargs)
+        return single_flight.do(key, method, self, *args, **kwargs)
+
+    return cast(F, wrapper)
@@ -0,0 +1,117 @@
+import functools
+from typing import Any, Callable, Optional, TypeVar, cast
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class _NullSpan:
+    """Span stand-in used when tracing is disabled."""
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Discard the attribute."""
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class PyxisTracing:
+    """Optional span creation and trace-context propagation for Pyxis requests."""
+
+    def __init__(
+        self,
+        tracer: Any = None,
+        inject: Optional[Callable[[dict[str, str]], None]] = None,
+    ) -> None:
+        """
+        Initialize.
+
+        Args:
+            tracer (object)
+                OpenTelemetry-compatible tracer providing `start_as_current_span`.
+                If not specified, tracing is disabled.
+            inject (function)
+                Function injecting the current trace context into a dict of HTTP
+                headers (e.g. `opentelemetry.propagate.inject`).
+        """
+        self.tracer = tracer
+        self.inject = inject
+
+    @classmethod
+    def from_opentelemetry(cls, name: str = "pubtools.pyxis") -> "PyxisTracing":
+        """
+        Create tracing using the globally configured OpenTelemetry tracer provider.
+
+        Args:
+            name (str)
+                Name of the instrumenting library reported with the spans.
+        Returns:
+            PyxisTracing: Tracing bound to the OpenTelemetry tracer.
+        """
+        from opentelemetry import propagate, trace
+
+        return cls(trace.get_tracer(name), propagate.inject)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether spans are recorded."""
+        return self.tracer is not None
+
+    def span(self, name: str, **attributes: Any) -> Any:
+        """
+        Start a span as a context manager, or a no-op one if tracing is disabled.
+
+        Args:
+            name (str)
+                Name of the span.
+            **attributes: Attributes to set on the span.
+        Returns:
+            Context manager yielding the span.
+        """
+        if self.tracer is None:
+            return _NULL_SPAN
+        return self.tracer.start_as_current_span(name, attributes=attributes)
+
+    def inject_headers(self, headers: Optional[dict[str, str]]) -> dict[str, str]:
+        """
+        Add trace-context headers of the current span to given headers.
+
+        Args:
+            headers (dict)
+                HTTP headers of the request, may be None.
+        Returns:
+            dict: Copy of the headers including the propagated trace context.
+        """
+        headers = dict(headers or {})
+        if self.inject is not None:
+            self.inject(headers)
+        return headers
+
+
+NO_TRACING = PyxisTracing()
+"Disabled tracing used by default."
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """
+    Wrap a PyxisClient method in an operation-level span.
+
+    Args:
+        name (str)
+            Name of the span.
+    """
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            with self.tracing.span(name):
+                return func(self, *args, **kwargs)
+
+        return cast(F, wrapper)
+
+    return decorator
@@ -1,5 +1,7 @@
 import argparse
-from typing import Any
+from typing import Any, Union
+
+from .constants import AUTO_PAGE_SIZE
 
 
 def setup_arg_parser(args: dict[Any, Any]) -> argparse.ArgumentParser:
@@ -38,3 +40,40 @@ def setup_arg_parser(args: dict[Any, Any]) -> argparse.ArgumentParser:
         holder.add_argument(*aliases, **kwargs)
 
     return parser
+
+
+def page_size_arg(value: str) -> Union[int, str]:
+    """
+    Parse the page size of paginated queries from a command line argument.
+
+    Args:
+        value (str)
+            Positive number of records per page, or "auto".
+    Returns:
+        (int or str) Page size, see `PyxisClient.get_container_signatures`.
+    """
+    if value == AUTO_PAGE_SIZE:
+        return value
+    try:
+        page_size = int(value)
+    except ValueError:
+        page_size = 0
+    if page_size < 1:
+        raise argparse.ArgumentTypeError(
+            "invalid page size %r, expected a positive number or %r"
+            % (value, AUTO_PAGE_SIZE)
+        )
+    return page_size
+
+
+def endpoint_group(endpoint: str) -> str:
+    """
+    Return the group of an API endpoint: the first segment of its path.
+
+    Args:
+        endpoint (str)
+            API specific endpoint, e.g. "signatures/id/abc" or "signatures?filter=...".
+    Returns:
+        (str) Group of the endpoint, e.g. "signatures".
+    """
+    return endpoint.split("?", 1)[0].split("/", 1)[0]
@@ -1,6 +1,27 @@
 import pytest
 
+from tests.pyxis_server import PyxisServer
+
 
 @pytest.fixture
 def hostname():
     return "https://pyxis-prod-url/"
+
+
+@pytest.fixture(scope="session")
+def _pyxis_server_instance():
+    with PyxisServer() as server:
+        yield server
+
+
+@pytest.fixture
+def pyxis_server(_pyxis_server_instance):
+    """Local Pyxis stand-in server, emptied before each test."""
+    _pyxis_server_instance.reset()
+    return _pyxis_server_instance
+
+
+@pytest.fixture(autouse=True)
+def no_daemon(monkeypatch):
+    """Don't forward entrypoint operations to a daemon possibly running locally."""
+    monkeypatch.setenv("PUBTOOLS_PYXIS_DAEMON_SOCKET", "")
@@ -0,0 +1,764 @@
+"""Local stand-in for the Pyxis API used by tests and benchmarks.
+
+The server implements the subset of the Pyxis REST API used by PyxisClient:
+signatures (query, upload, delete), repositories and operator indices, and
+the GraphQL queries ``find_signatures`` and ``get_repository_by_registry_path``
+at ``/graphql/``.
+Latency, error injection and pagination limits are configurable, so the
+client can be exercised over real sockets without a Pyxis instance.
+
+It can be used as the ``pyxis_server`` pytest fixture (see conftest.py)
+or started as a standalone process::
+
+    python -m tests.pyxis_server --port 8080 --signatures 10000 --latency 0.01
+"""
+
+import argparse
+import collections
+import datetime
+import gzip
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+__all__ = [
+    "GraphQLSyntaxError",
+    "PyxisServer",
+    "RSQLError",
+    "make_signature",
+    "rsql_match",
+]
+
+
+class RSQLError(ValueError):
+    """Invalid RSQL filter expression."""
+
+
+class GraphQLSyntaxError(ValueError):
+    """Invalid or unsupported GraphQL document."""
+
+
+_COMPARISON = re.compile(
+    r"\s*([\w.]+)\s*(==|!=|=in=|=out=|=gt=|=ge=|=lt=|=le=|>=|<=|>|<|=like=)\s*"
+)
+_OPERATOR_ALIASES = {">": "=gt=", ">=": "=ge=", "<": "=lt=", "<=": "=le="}
+
+
+def _parse_rsql(text):
+    """Parse RSQL expression into nested tuples: ("and"|"or", [nodes]) or comparison."""
+    pos = 0
+
+    def parse_or():
+        nonlocal pos
+        nodes = [parse_and()]
+        while pos < len(text) and text[pos] == ",":
+            pos += 1
+            nodes.append(parse_and())
+        return nodes[0] if len(nodes) == 1 else ("or", nodes)
+
+    def parse_and():
+        nonlocal pos
+        nodes = [parse_term()]
+        while pos < len(text) and text[pos] == ";":
+            pos += 1
+            nodes.append(parse_term())
+        return nodes[0] if len(nodes) == 1 else ("and", nodes)
+
+    def parse_term():
+        nonlocal pos
+        if pos < len(text) and text[pos] == "(":
+            pos += 1
+            node = parse_or()
+            if pos >= len(text) or text[pos] != ")":
+                raise RSQLError("Unbalanced parentheses in %r" % text)
+            pos += 1
+            return node
+        match = _COMPARISON.match(text, pos)
+        if not match:
+            raise RSQLError("Invalid comparison at %d in %r" % (pos, text))
+        field, operator = match.group(1), match.group(2)
+        operator = _OPERATOR_ALIASES.get(operator, operator)
+        pos = match.end()
+        if operator in ("=in=", "=out="):
+            if pos >= len(text) or text[pos] != "(":
+                raise RSQLError("Expected list of values at %d in %r" % (pos, text))
+            start, end = pos + 1, text.index(")", pos)
+            items = text[start:end]
+            values = [_unquote_value(v) for v in items.split(",")]
+            pos = end + 1
+            return ("cmp", field, operator, values)
+        value, pos = _read_value(text, pos)
+        return ("cmp", field, operator, value)
+
+    node = parse_or()
+    if pos != len(text):
+        raise RSQLError("Unexpected input at %d in %r" % (pos, text))
+    return node
+
+
+def _read_value(text, pos):
+    if pos < len(text) and text[pos] in "\"'":
+        end = text.index(text[pos], pos + 1)
+        start = pos + 1
+        return text[start:end], end + 1
+    end = pos
+    while end < len(text) and text[end] not in ",;()":
+        end += 1
+    return text[pos:end].strip(), end
+
+
+def _unquote_value(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
+
+
+def _compare(field_value, operator, value):
+    if operator == "==":
+        if isinstance(value, str) and "*" in value:
+            return (
+                re.fullmatch(re.escape(value).replace(r"\*", ".*"), str(field_value))
+                is not None
+            )
+        return str(field_value) == value
+    if operator == "!=":
+        return str(field_value) != value
+    if operator == "=in=":
+        return str(field_value) in value
+    if operator == "=out=":
+        return str(field_value) not in value
+    if operator == "=like=":
+        return value.strip("%") in str(field_value)
+    if field_value is None:
+        return False
+    return {
+        "=gt=": field_value > value,
+        "=ge=": field_value >= value,
+        "=lt=": field_value < value,
+        "=le=": field_value <= value,
+    }[operator]
+
+
+def rsql_match(node, record):
+    """Evaluate parsed RSQL expression against a record."""
+    if node[0] == "and":
+        return all(rsql_match(child, record) for child in node[1])
+    if node[0] == "or":
+        return any(rsql_match(child, record) for child in node[1])
+    _, field, operator, value = node
+    return _compare(record.get(field), operator, value)
+
+
+_GRAPHQL_TOKEN = re.compile(
+    r'[\s,]*(?:([{}()\[\]:])|("(?:[^"\\]|\\.)*")|(-?\d+(?:\.\d+)?)|([_A-Za-z]\w*))'
+)
+
+
+def _parse_graphql(text):
+    """
+    Parse a GraphQL query document into its selection set.
+
+    Only queries without variables or fragments are supported. Fields of a
+    selection set are (alias, name, arguments, selection set or None) tuples.
+    """
+    tokens = []
+    pos = 0
+    text = text.rstrip(" \t\n,")
+    while pos < len(text):
+        match = _GRAPHQL_TOKEN.match(text, pos)
+        if not match:
+            raise GraphQLSyntaxError("Invalid token at %d" % pos)
+        kind = match.lastindex
+        tokens.append((kind, match.group(kind)))
+        pos = match.end()
+    tokens.append((None, None))
+    pos = 0
+
+    def take(expected=None):
+        nonlocal pos
+        kind, token = tokens[pos]
+        if token is None or expected is not None and token != expected:
+            raise GraphQLSyntaxError("Expected %s, got %r" % (expected, token))
+        pos += 1
+        return kind, token
+
+    def parse_value():
+        kind, token = take()
+        if token == "{":
+            value = {}
+            while tokens[pos][1] != "}":
+                key = take()[1]
+                take(":")
+                value[key] = parse_value()
+            take("}")
+            return value
+        if token == "[":
+            items = []
+            while tokens[pos][1] != "]":
+                items.append(parse_value())
+            take("]")
+            return items
+        if kind in (2, 3) or token in ("true", "false", "null"):
+            return json.loads(token)
+        raise GraphQLSyntaxError("Unsupported value %r" % token)
+
+    def parse_selection():
+        take("{")
+        fields = []
+        while tokens[pos][1] != "}":
+            alias = name = take()[1]
+            if tokens[pos][1] == ":":
+                take(":")
+                name = take()[1]
+            arguments = {}
+            if tokens[pos][1] == "(":
+                take("(")
+                while tokens[pos][1] != ")":
+                    key = take()[1]
+                    take(":")
+                    arguments[key] = parse_value()
+                take(")")
+            selection = parse_selection() if tokens[pos][1] == "{" else None
+            fields.append((alias, name, arguments, selection))
+        take("}")
+        return fields
+
+    if tokens[pos][1] == "query":
+        take()
+    selection = parse_selection()
+    if tokens[pos][1] is not None:
+        raise GraphQLSyntaxError("Unexpected %r after the query" % tokens[pos][1])
+    return selection
+
+
+def graphql_match(condition, record):
+    """Evaluate a GraphQL filter (e.g. ``{"or": [{"reference": {"in": []}}]}``)."""
+    for key, value in condition.items():
+        if key == "and" and not all(graphql_match(c, record) for c in value):
+            return False
+        if key == "or" and not any(graphql_match(c, record) for c in value):
+            return False
+        if key not in ("and", "or"):
+            for operator, operand in value.items():
+                field_value = record.get(key)
+                if operator == "in" and field_value not in operand:
+                    return False
+                if operator == "eq" and field_value != operand:
+                    return False
+    return True
+
+
+def _select(value, selection):
+    """Keep fields of a value selected by a GraphQL selection set."""
+    if selection is None or value is None:
+        return value
+    if isinstance(value, list):
+        return [_select(item, selection) for item in value]
+    return {
+        alias: _select(value.get(name), subselection)
+        for alias, name, _, subselection in selection
+    }
+
+
+def _now():
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+def make_signature(index, payload_size=512, repository=None, digest_count=None):
+    """
+    Generate a deterministic signature record for upload.
+
+    Args:
+        index (int): Sequence number making the record unique.
+        payload_size (int): Length of the ``signature_data`` field.
+        repository (str): Repository of the signature.
+        digest_count (int): Number of distinct manifest digests to spread
+            signatures over. Every index has its own digest by default.
+    """
+    digest_index = index % digest_count if digest_count else index
+    digest = hashlib.sha256(str(digest_index).encode()).hexdigest()
+    repository = repository or "namespace/repo-%d" % (index % 50)
+    return {
+        "manifest_digest": "sha256:%s" % digest,
+        "reference": "registry.example.com/%s:tag-%d" % (repository, index),
+        "repository": repository,
+        "sig_key_id": "%08X" % (index % 4),
+        "signature_data": ("x" * payload_size),
+    }
+
+
+class PyxisState:
+    """Data served by the stand-in server."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.signatures = collections.OrderedDict()
+        self._signature_keys = {}
+        self.repositories = {}
+        self.indices = []
+        self._counter = 0
+
+    def add_signature(self, record):
+        """Store signature record, return (stored record, created)."""
+        key = (
+            record.get("manifest_digest"),
+            record.get("reference"),
+            record.get("sig_key_id"),
+        )
+        with self.lock:
+            existing = self.signatures.get(self._signature_keys.get(key))
+            if existing is not None:
+                return existing, False
+            self._counter += 1
+            now = _now()
+            stored = dict(record)
+            stored.setdefault("_id", "%024x" % self._counter)
+            stored.setdefault("creation_date", now)
+            stored.setdefault("last_update_date", now)
+            self.signatures[stored["_id"]] = stored
+            self._signature_keys[key] = stored["_id"]
+            return stored, True
+
+    def remove_signature(self, signature_id):
+        """Remove signature record, return whether it existed."""
+        with self.lock:
+            stored = self.signatures.pop(signature_id, None)
+            if stored is None:
+                return False
+            self._signature_keys.pop(
+                (
+                    stored.get("manifest_digest"),
+                    stored.get("reference"),
+                    stored.get("sig_key_id"),
+                ),
+                None,
+            )
+            return True
+
+
+class PyxisServer:
+    """Threaded local HTTP server emulating the Pyxis API."""
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        latency=0.0,
+        latency_jitter=0.0,
+        error_rates=None,
+        default_page_size=100,
+        max_page_size=500,
+        seed=0,
+        compress_responses=False,
+    ):
+        """
+        Initialize.
+
+        Args:
+            host (str): Address to listen on.
+            port (int): Port to listen on, 0 picks a free one.
+            latency (float): Seconds to wait before each response.
+            latency_jitter (float): Maximum random seconds added to ``latency``.
+            error_rates (dict): Status code -> probability of a random failure.
+            default_page_size (int): Page size used when the request has none.
+            max_page_size (int): Largest page size accepted from requests.
+            seed (int): Seed of the random generator used for jitter and errors.
+            compress_responses (bool): Gzip responses of requests accepting it.
+        """
+        self.state = PyxisState()
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rates = dict(error_rates or {})
+        self.default_page_size = default_page_size
+        self.max_page_size = max_page_size
+        self.compress_responses = compress_responses
+        self._settings = (default_page_size, max_page_size, compress_responses)
+        self.random = random.Random(seed)
+        self.request_log = []
+        self.encoding_log = []
+        self._scripted_errors = []
+        self._scripted_delays = []
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        """Base URL to be used as PyxisClient hostname."""
+        host, port = self.httpd.server_address[:2]
+        return "http://%s:%d/" % (host, port)
+
+    def start(self):
+        """Serve requests in a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the socket."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        """Start the server."""
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        """Stop the server."""
+        self.stop()
+
+    def reset(self):
+        """Drop all data, injected errors and delays, request logs and setting changes."""
+        self.state = PyxisState()
+        self.error_rates = {}
+        self.latency = self.latency_jitter = 0.0
+        (
+            self.default_page_size,
+            self.max_page_size,
+            self.compress_responses,
+        ) = self._settings
+        with self._lock:
+            self._scripted_errors = []
+            self._scripted_delays = []
+            self.request_log = []
+            self.encoding_log = []
+
+    def inject_error(self, status, count=1, method=None, path=None):
+        """
+        Fail the next ``count`` matching requests with given status code.
+
+        Args:
+            status (int): HTTP status of the failure (e.g. 500, 429, 409, 404).
+            count (int): Number of requests to fail.
+            method (str): Only fail requests with this method.
+            path (str): Only fail requests whose path contains this string.
+        """
+        with self._lock:
+            self._scripted_errors.append([status, count, method, path])
+
+    def inject_delay(self, seconds, count=1, method=None, path=None):
+        """
+        Delay the next ``count`` matching requests, in addition to ``latency``.
+
+        Args:
+            seconds (float): Seconds to wait before responding.
+            count (int): Number of requests to delay.
+            method (str): Only delay requests with this method.
+            path (str): Only delay requests whose path contains this string.
+        """
+        with self._lock:
+            self._scripted_delays.append([seconds, count, method, path])
+
+    def populate_signatures(self, count, payload_size=512, digest_count=None):
+        """Store ``count`` generated signatures, see `make_signature`."""
+        for index in range(count):
+            self.state.add_signature(
+                make_signature(index, payload_size, digest_count=digest_count)
+            )
+
+    def requests_matching(self, method=None, path=None):
+        """Return logged (method, path, query) tuples matching the arguments."""
+        with self._lock:
+            log = list(self.request_log)
+        if method is not None:
+            log = [entry for entry in log if entry[0] == method]
+        if path is not None:
+            log = [entry for entry in log if path in entry[1]]
+        return log
+
+    def _pick_error(self, method, path):
+        with self._lock:
+            for scripted in self._scripted_errors:
+                status, count, err_method, err_path = scripted
+                if (err_method is None or err_method == method) and (
+                    err_path is None or err_path in path
+                ):
+                    scripted[1] -= 1
+                    if scripted[1] <= 0:
+                        self._scripted_errors.remove(scripted)
+                    return status
+            for status, rate in self.error_rates.items():
+                if self.random.random() < rate:
+                    return status
+        return None
+
+    def _delay(self, method, path):
+        with self._lock:
+            delay = self.latency
+            for scripted in self._scripted_delays:
+                seconds, count, delay_method, delay_path = scripted
+                if (delay_method is None or delay_method == method) and (
+                    delay_path is None or delay_path in path
+                ):
+                    scripted[1] -= 1
+                    if scripted[1] <= 0:
+                        self._scripted_delays.remove(scripted)
+                    delay += seconds
+                    break
+            if self.latency_jitter:
+                delay += self.random.uniform(0, self.latency_jitter)
+        if delay:
+            time.sleep(delay)
+
+    def handle(self, method, raw_path, body):
+        """Dispatch a request, return (status, JSON-serializable body)."""
+        split = urlsplit(raw_path)
+        path = unquote(split.path)
+        query = parse_qs(split.query, keep_blank_values=True)
+        with self._lock:
+            self.request_log.append((method, path, query))
+
+        self._delay(method, path)
+        status = self._pick_error(method, path)
+        if status:
+            return status, {"detail": "Injected error", "status": status}
+
+        if path.rstrip("/") == "/graphql" and method == "POST":
+            return self._graphql(body)
+
+        prefix, _, path = path.partition("/v1/")
+        if prefix:
+            return 404, {"detail": "Not found", "status": 404}
+
+        try:
+            if path == "signatures" and method == "GET":
+                return self._query_signatures(query)
+            if path == "signatures" and method == "POST":
+                return self._post_signature(body)
+            if path.startswith("signatures/id/") and method == "DELETE":
+                return self._delete_signature(path.split("/", 2)[2])
+            if path.startswith("repositories/registry/") and method == "GET":
+                return self._get_repository(path.split("/", 2)[2])
+            if path == "operators/indices" and method == "GET":
+                return self._get_indices(query)
+        except RSQLError as e:
+            return 400, {"detail": str(e), "status": 400}
+        return 404, {"detail": "Not found", "status": 404}
+
+    def _page_params(self, query):
+        page = int(query.get("page", ["0"])[0])
+        page_size = int(query.get("page_size", [str(self.default_page_size)])[0])
+        if page_size > self.max_page_size:
+            raise RSQLError("page_size must not exceed %d" % self.max_page_size)
+        return page, page_size
+
+    def _query_signatures(self, query):
+        page, page_size = self._page_params(query)
+        records = list(self.state.signatures.values())
+        filter_expr = query.get("filter", [""])[0]
+        if filter_expr:
+            node = _parse_rsql(filter_expr)
+            records = [r for r in records if rsql_match(node, r)]
+        sort_by = query.get("sort_by", [""])[0]
+        if sort_by:
+            for key in reversed(sort_by.split(",")):
+                match = re.match(r"([\w.]+)(?:\[(asc|desc)\])?$", key)
+                if not match:
+                    raise RSQLError("Invalid sort_by %r" % sort_by)
+                records.sort(
+                    key=lambda r: r.get(match.group(1)) or "",
+                    reverse=match.group(2) == "desc",
+                )
+        total = len(records)
+        start, end = page * page_size, (page + 1) * page_size
+        data = records[start:end]
+        body = {"data": data, "page": page, "page_size": page_size, "total": total}
+        return 200, _project(body, query)
+
+    def _post_signature(self, body):
+        record = json.loads(body or b"{}")
+        stored, created = self.state.add_signature(record)
+        if not created:
+            return 409, {
+                "detail": "E11000 duplicate key error",
+                "status": 409,
+            }
+        return 201, stored
+
+    def _delete_signature(self, signature_id):
+        if not self.state.remove_signature(signature_id):
+            return 404, {"detail": "Signature not found", "status": 404}
+        return 200, {}
+
+    def _get_repository(self, rest):
+        registry, _, repository = rest.partition("/repository/")
+        data = self.state.repositories.get((registry, repository))
+        if data is None:
+            return 404, {"detail": "Repository not found", "status": 404}
+        return 200, data
+
+    def _graphql(self, body):
+        try:
+            selection = _parse_graphql(json.loads(body or b"{}").get("query", ""))
+        except (GraphQLSyntaxError, ValueError) as e:
+            return 400, {"data": None, "errors": [{"message": str(e)}]}
+        resolvers = {
+            "find_signatures": self._find_signatures,
+            "get_repository_by_registry_path": self._find_repository,
+        }
+        data = {}
+        for alias, name, arguments, subselection in selection:
+            if name not in resolvers:
+                message = "Cannot query field %r on type 'Query'" % name
+                return 400, {"data": None, "errors": [{"message": message}]}
+            data[alias] = _select(resolvers[name](**arguments), subselection)
+        return 200, {"data": data}
+
+    def _find_signatures(self, filter=None, page=0, page_size=None):
+        page_size = page_size or self.default_page_size
+        result = {"data": None, "error": None, "page": page, "page_size": page_size}
+        if page_size > self.max_page_size:
+            detail = "page_size must not exceed %d" % self.max_page_size
+            result["error"] = {"status": 400, "detail": detail}
+            return result
+        records = [
+            r
+            for r in self.state.signatures.values()
+            if filter is None or graphql_match(filter, r)
+        ]
+        start, end = page * page_size, (page + 1) * page_size
+        result["data"] = records[start:end]
+        result["total"] = len(records)
+        return result
+
+    def _find_repository(self, registry, repository):
+        data = self.state.repositories.get((registry, repository))
+        if data is None:
+            error = {"status": 404, "detail": "Repository not found"}
+            return {"data": None, "error": error}
+        return {"data": data, "error": None}
+
+    def _get_indices(self, query):
+        organization = query.get("organization", [None])[0]
+        data = [
+            index
+            for index in self.state.indices
+            if organization is None or index.get("organization") == organization
+        ]
+        return 200, {"data": data}
+
+
+def _project(body, query):
+    """Apply ``include`` and ``exclude`` field paths (e.g. ``data._id``) to a body."""
+    include = [p for p in query.get("include", [""])[0].split(",") if p]
+    exclude = [p for p in query.get("exclude", [""])[0].split(",") if p]
+    if not (include or exclude):
+        return body
+
+    def keep(path):
+        if path in exclude:
+            return False
+        return not include or path in include
+
+    data_fields = [p for p in include if p.startswith("data.")]
+    projected = {
+        key: value
+        for key, value in body.items()
+        if key == "data" and (data_fields or not include) or keep(key)
+    }
+    if "data" in projected:
+        projected["data"] = [
+            {key: value for key, value in item.items() if keep("data." + key)}
+            for item in body["data"]
+        ]
+    return projected
+
+
+def _make_handler(server):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # send headers and body in one segment, avoid delayed-ACK stalls
+        wbufsize = -1
+        disable_nagle_algorithm = True
+
+        def _serve(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            encoding = self.headers.get("Content-Encoding")
+            accept_encoding = self.headers.get("Accept-Encoding", "")
+            with server._lock:
+                server.encoding_log.append(
+                    (self.command, encoding, len(body), accept_encoding)
+                )
+            if encoding == "gzip":
+                body = gzip.decompress(body)
+            elif encoding == "deflate":
+                body = zlib.decompress(body)
+            status, data = server.handle(self.command, self.path, body)
+            payload = json.dumps(data).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            if server.compress_responses and "gzip" in accept_encoding:
+                payload = gzip.compress(payload)
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        do_GET = do_POST = do_PUT = do_DELETE = _serve
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def _parse_error_rates(values):
+    rates = {}
+    for value in values or []:
+        status, _, rate = value.partition("=")
+        rates[int(status)] = float(rate)
+    return rates
+
+
+def main(argv=None):
+    """Run the stand-in server as a standalone process."""
+    parser = argparse.ArgumentParser(description="Local Pyxis stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument(
+        "--error-rate",
+        action="append",
+        help="STATUS=PROBABILITY, e.g. --error-rate 500=0.01 (repeatable)",
+    )
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--max-page-size", type=int, default=500)
+    parser.add_argument("--signatures", type=int, default=0)
+    parser.add_argument("--payload-size", type=int, default=512)
+    parser.add_argument("--gzip", action="store_true", help="Gzip responses")
+    args = parser.parse_args(argv)
+
+    server = PyxisServer(
+        args.host,
+        args.port,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rates=_parse_error_rates(args.error_rate),
+        default_page_size=args.page_size,
+        max_page_size=args.max_page_size,
+        compress_responses=args.gzip,
+    )
+    server.populate_signatures(args.signatures, args.payload_size)
+    print("Serving Pyxis stand-in on %s" % server.url, flush=True)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import json
+
+import pytest
+
+from pubtools._pyxis import batch, pyxis_ops
+from tests.pyxis_server import make_signature
+
+
+def _args(server, operations, *extra):
+    # certificate files have to exist, although plain HTTP doesn't use them
+    return [
+        "dummy",
+        "--pyxis-server",
+        server.url,
+        "--pyxis-ssl-crtfile",
+        __file__,
+        "--pyxis-ssl-keyfile",
+        __file__,
+        "--operations",
+        operations,
+    ] + list(extra)
+
+
+def test_load_operations():
+    operations = [
+        {"operation": "get-operator-indices", "args": {"ocp_versions_range": "4.6"}},
+        {"operation": "delete-signatures", "args": {"ids": ["a"]}, "id": "x"},
+    ]
+    assert batch.load_operations(json.dumps(operations)) == operations
+    ndjson = "\n".join(json.dumps(o) for o in operations) + "\n\n"
+    assert batch.load_operations(ndjson) == operations
+
+
+def test_load_operations_unsupported():
+    with pytest.raises(
+        ValueError, match="Unsupported operation 'get-foo' at position 1"
+    ):
+        batch.load_operations(
+            '{"operation": "delete-signatures"}\n{"operation": "get-foo"}'
+        )
+
+
+def test_batch_mod(pyxis_server):
+    signatures = [make_signature(i, payload_size=8) for i in range(3)]
+    existing = make_signature(10, payload_size=8)
+    pyxis_server.state.add_signature(dict(existing, _id="existing"))
+    # operations run concurrently, the deleted signature is not queried
+    pyxis_server.state.add_signature(make_signature(11, payload_size=8, digest_count=1))
+    (deleted,) = set(pyxis_server.state.signatures) - {"existing"}
+    pyxis_server.state.repositories[("registry.access.redhat.com", "ns/repo")] = {
+        "name": "ns/repo"
+    }
+    pyxis_server.state.indices = [{"path": "index:4.6"}]
+    operations = [
+        {"operation": "upload-signatures", "args": {"signatures": signatures}},
+        {
+            "operation": "get-signatures",
+            "args": {"manifest_digest": [existing["manifest_digest"]]},
+            "id": "query",
+        },
+        {"operation": "get-repo-metadata", "args": {"repo_name": "ns/repo"}},
+        {"operation": "get-operator-indices", "args": {"ocp_versions_range": "4.6"}},
+        {"operation": "delete-signatures", "args": {"ids": deleted}},
+    ]
+
+    results = pyxis_ops.batch_mod(_args(pyxis_server, json.dumps(operations)))
+
+    assert [r["index"] for r in results] == [0, 1, 2, 3, 4]
+    assert [r["operation"] for r in results] == [o["operation"] for o in operations]
+    assert len(results[0]["result"]) == 3
+    assert results[1]["id"] == "query"
+    assert [s["_id"] for s in results[1]["result"]] == ["existing"]
+    assert results[2]["result"] == {"name": "ns/repo"}
+    assert results[3]["result"] == [{"path": "index:4.6"}]
+    assert len(results[4]["result"]) == 1
+    assert deleted not in pyxis_server.state.signatures
+
+
+def test_batch_main_from_file(pyxis_server, tmp_path, capsys):
+    pyxis_server.state.indices = [{"path": "index:4.6"}]
+    pyxis_server.inject_error(400, path="repositories")
+    operations_file = tmp_path / "operations.ndjson"
+    operations_file.write_text(
+        '{"operation": "get-operator-indices", "args": {"ocp_versions_range": "4.6"}}\n'
+        '{"operation": "get-repo-metadata", "args": {"repo_name": "ns/repo"}}\n'
+        '{"operation": "get-signatures", "args": {}}\n'
+        '{"operation": "get-repo-metadata", "args": {"repo_name": "ns/repo", '
+        '"only_internal_registry": true, "only_partner_registry": true}}\n'
+    )
+
+    ret = pyxis_ops.batch_main(
+        _args(pyxis_server, "@%s" % operations_file, "--operation-threads", "2")
+    )
+
+    # failed operations don't stop the others
+    assert ret == 1
+    out, _ = capsys.readouterr()
+    results = [json.loads(line) for line in out.splitlines()]
+    assert results[0]["result"] == [{"path": "index:4.6"}]
+    assert "400 Client Error" in results[1]["error"]
+    assert results[2]["error"].startswith("Give at least 1 filter")
+    assert results[3]["error"].startswith("Can't check only internal registry")
+
+
+def test_batch_main_success(pyxis_server, capsys):
+    ret = pyxis_ops.batch_main(
+        _args(
+            pyxis_server,
+            '[{"operation": "get-signatures", "args": {"reference": "r1,r2"}}]',
+        )
+    )
+
+    assert ret == 0
+    out, _ = capsys.readouterr()
+    assert json.loads(out) == {
+        "index": 0,
+        "operation": "get-signatures",
+        "result": [],
+    }
+
+
+def test_batch_main_invalid_input(pyxis_server, capsys):
+    ret = pyxis_ops.batch_main(_args(pyxis_server, '[{"operation": "foo"}]'))
+
+    assert ret == 1
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert "Error running batch: Unsupported operation 'foo'" in err
+
+
+def test_batch_quiet_results(pyxis_server):
+    signatures = [make_signature(i, payload_size=8) for i in range(2)]
+    operations = [
+        {
+            "operation": "upload-signatures",
+            "args": {"signatures": signatures, "quiet_results": True},
+        },
+    ]
+
+    (result,) = pyxis_ops.batch_mod(_args(pyxis_server, json.dumps(operations)))
+    assert result["result"] == {"succeeded": 2, "failures": []}
+
+    operations = [
+        {
+            "operation": "delete-signatures",
+            "args": {"ids": list(pyxis_server.state.signatures), "quiet_results": True},
+        },
+    ]
+    (result,) = pyxis_ops.batch_mod(_args(pyxis_server, json.dumps(operations)))
+    assert result["result"] == {"succeeded": 2, "failures": []}
+
+
+def test_batch_get_signatures_fields(pyxis_server):
+    pyxis_server.populate_signatures(2, payload_size=8, digest_count=1)
+    digest = next(iter(pyxis_server.state.signatures.values()))["manifest_digest"]
+    operations = [
+        {
+            "operation": "get-signatures",
+            "args": {
+                "manifest_digest": digest,
+                "fields": "_id,reference",
+                "page_size": 1,
+            },
+        },
+    ]
+
+    (result,) = pyxis_ops.batch_mod(_args(pyxis_server, json.dumps(operations)))
+
+    assert len(result["result"]) == 2
+    assert all(set(r) == {"_id", "reference"} for r in result["result"])
+
+
+def test_batch_get_signatures_filter(pyxis_server):
+    pyxis_server.populate_signatures(8, payload_size=8)
+    operations = [
+        {"operation": "get-signatures", "args": {"filter": "sig_key_id==00000001"}},
+    ]
+
+    (result,) = pyxis_ops.batch_mod(_args(pyxis_server, json.dumps(operations)))
+
+    assert [r["reference"] for r in result["result"]] == [
+        make_signature(i)["reference"] for i in (1, 5)
+    ]
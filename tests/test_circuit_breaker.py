@@ -0,0 +1,199 @@
+import mock
+import pytest
+import requests
+
+from pubtools._pyxis import pyxis_client
+from pubtools._pyxis.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitBreakers,
+    CircuitOpenError,
+)
+from pubtools._pyxis.deadline import DeadlineExceeded
+
+
+class FakeClock:
+    """Clock moved forward by tests."""
+
+    def __init__(self):
+        """Start at 0."""
+        self.now = 0.0
+
+    def __call__(self):
+        """Return current time."""
+        return self.now
+
+
+def test_circuit_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, clock=FakeClock())
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.before_request("signatures")
+    assert breaker.state == CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError, match="signatures is open after 3 failed"):
+        breaker.before_request("signatures")
+
+
+def test_half_open_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+
+    clock.now = 9.9
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request("signatures")
+
+    # a single probe is let through
+    clock.now = 10
+    breaker.before_request("signatures")
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request("signatures")
+
+    # failed probe waits for another timeout
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    clock.now = 15
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request("signatures")
+
+    clock.now = 20
+    breaker.before_request("signatures")
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.failures == 0
+    breaker.before_request("signatures")
+
+
+def test_cancelled_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    breaker.record_cancelled()
+    assert breaker.state == OPEN
+
+    clock.now = 10
+    breaker.before_request("signatures")
+    breaker.record_cancelled()
+    assert breaker.state == OPEN
+    assert breaker.failures == 1
+    # the next request probes right away
+    breaker.before_request("signatures")
+    assert breaker.state == HALF_OPEN
+
+
+def test_breakers_per_endpoint():
+    breakers = CircuitBreakers(
+        failure_threshold=5,
+        reset_timeout=10,
+        endpoints={"signatures": {"failure_threshold": 2}},
+    )
+
+    signatures = breakers.for_endpoint("signatures?filter=reference=in=(r1)")
+    assert breakers.for_endpoint("signatures/id/abc") is signatures
+    assert signatures.failure_threshold == 2
+    assert signatures.reset_timeout == 10
+    repositories = breakers.for_endpoint("repositories/registry/r/repository/n")
+    assert repositories is not signatures
+    assert repositories.failure_threshold == 5
+
+
+def test_client_fails_fast_while_open(pyxis_server):
+    clock = FakeClock()
+    breakers = CircuitBreakers(failure_threshold=2, reset_timeout=30, clock=clock)
+    my_client = pyxis_client.PyxisClient(
+        pyxis_server.url, 0, None, 0, False, threads=1, circuit_breakers=breakers
+    )
+    pyxis_server.inject_error(503, count=10, path="signatures")
+
+    # the first failure is raised, after the other requests failed fast
+    with pytest.raises(requests.exceptions.RetryError):
+        my_client.delete_container_signatures(["a", "b", "c", "d", "e"])
+
+    # only requests until the circuit opened were sent
+    assert len(pyxis_server.requests_matching("DELETE")) == 2
+    # other endpoints have their own circuit
+    assert my_client.get_operator_indices("4.6") == []
+    with pytest.raises(CircuitOpenError):
+        my_client.get_container_signatures("sha256:a")
+
+    clock.now = 30
+    pyxis_server.reset()
+    assert my_client.get_container_signatures("sha256:a") == []
+    assert breakers.for_endpoint("signatures").state == CLOSED
+
+
+def test_client_connection_errors_open_circuit(pyxis_server):
+    breakers = CircuitBreakers(failure_threshold=1)
+    # nothing listens on the discard port
+    my_client = pyxis_client.PyxisClient(
+        "http://127.0.0.1:9/", 0, None, 0, False, circuit_breakers=breakers
+    )
+
+    with pytest.raises(requests.exceptions.ConnectionError) as exc_info:
+        my_client.get_operator_indices("4.6")
+    assert not isinstance(exc_info.value, CircuitOpenError)
+    with pytest.raises(CircuitOpenError):
+        my_client.get_operator_indices("4.6")
+
+
+def test_client_unretried_server_errors_open_circuit(pyxis_server):
+    breakers = CircuitBreakers(failure_threshold=1)
+    my_client = pyxis_client.PyxisClient(
+        pyxis_server.url, 0, None, 0, False, circuit_breakers=breakers
+    )
+    # not one of the statuses retried by the session
+    pyxis_server.inject_error(520, path="operators")
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        my_client.get_operator_indices("4.6")
+    with pytest.raises(CircuitOpenError):
+        my_client.get_operator_indices("4.6")
+
+
+def test_client_deadline_not_a_failure(pyxis_server):
+    breakers = CircuitBreakers(failure_threshold=3)
+    my_client = pyxis_client.PyxisClient(
+        pyxis_server.url, 0, None, 0, False, circuit_breakers=breakers
+    )
+    pyxis_server.latency = 0.3
+
+    # the caller's deadline is too short for a healthy Pyxis
+    for _ in range(3):
+        with pytest.raises(DeadlineExceeded):
+            my_client.get_operator_indices("4.6", deadline=0.05)
+
+    assert breakers.for_endpoint("operators").state == CLOSED
+    assert my_client.get_operator_indices("4.6") == []
+
+
+def test_client_probe_outcome_recorded_on_any_error(pyxis_server):
+    clock = FakeClock()
+    breakers = CircuitBreakers(failure_threshold=1, reset_timeout=10, clock=clock)
+    my_client = pyxis_client.PyxisClient(
+        pyxis_server.url, 0, None, 0, False, circuit_breakers=breakers
+    )
+    pyxis_server.inject_error(520, path="operators")
+    with pytest.raises(requests.exceptions.HTTPError):
+        my_client.get_operator_indices("4.6")
+    breaker = breakers.for_endpoint("operators")
+    assert breaker.state == OPEN
+
+    clock.now = 10
+    session = my_client.pyxis_session
+    with mock.patch.object(session, "_send", side_effect=ValueError("bad")):
+        with pytest.raises(ValueError):
+            my_client.get_operator_indices("4.6")
+    assert breaker.state == OPEN
+
+    assert my_client.get_operator_indices("4.6") == []
+    assert breaker.state == CLOSED
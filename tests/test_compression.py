@@ -0,0 +1,116 @@
+import gzip
+import zlib
+
+import pytest
+
+from pubtools._pyxis import pyxis_client, pyxis_ops
+from pubtools._pyxis.compression import Compression
+from tests.pyxis_server import make_signature
+
+
+def test_encode():
+    body = b'{"signature_data": "%s"}' % (b"a" * 2000)
+
+    gzipped, encoding = Compression("gzip").encode(body)
+    assert encoding == "gzip"
+    assert gzip.decompress(gzipped) == body
+
+    deflated, encoding = Compression("deflate", level=9).encode(body)
+    assert encoding == "deflate"
+    assert zlib.decompress(deflated) == body
+
+    compression = Compression(min_size=len(body) + 1)
+    assert compression.encode(body) == (body, None)
+    assert compression.request_ratio == 1
+
+
+def test_unsupported_encoding():
+    with pytest.raises(ValueError, match="Unsupported encoding 'br'"):
+        Compression("br")
+
+
+def test_compress_json_keeps_headers():
+    kwargs = {"json": {"a": "b" * 10}, "headers": {"X-Test": "1"}}
+
+    Compression(min_size=1).compress_json(kwargs)
+
+    assert "json" not in kwargs
+    assert gzip.decompress(kwargs["data"]) == b'{"a": "bbbbbbbbbb"}'
+    assert kwargs["headers"] == {
+        "X-Test": "1",
+        "Content-Type": "application/json",
+        "Content-Encoding": "gzip",
+    }
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "deflate"])
+def test_client_upload_compressed(pyxis_server, encoding):
+    compression = Compression(encoding)
+    my_client = pyxis_client.PyxisClient(
+        pyxis_server.url, 0, None, 0, False, compression=compression
+    )
+    signatures = [make_signature(i, payload_size=4096) for i in range(3)]
+
+    uploaded = my_client.upload_signatures(signatures)
+
+    assert sorted(s["reference"] for s in uploaded) == sorted(
+        s["reference"] for s in signatures
+    )
+    posts = [entry for entry in pyxis_server.encoding_log if entry[0] == "POST"]
+    assert [entry[1] for entry in posts] == [encoding] * 3
+    assert compression.request_ratio < 0.9
+    assert compression.request_wire_bytes == sum(entry[2] for entry in posts)
+
+
+def test_client_small_bodies_not_compressed(pyxis_server):
+    my_client = pyxis_client.PyxisClient(
+        pyxis_server.url, 0, None, 0, False, compression=Compression(min_size=10**6)
+    )
+
+    my_client.upload_signatures([make_signature(0, payload_size=8)])
+
+    assert [entry[1] for entry in pyxis_server.encoding_log] == [None]
+
+
+def test_client_compressed_responses(pyxis_server, monkeypatch):
+    monkeypatch.setattr(pyxis_server, "compress_responses", True)
+    pyxis_server.populate_signatures(20, payload_size=1024)
+    compression = Compression()
+    my_client = pyxis_client.PyxisClient(
+        pyxis_server.url, 0, None, 0, False, compression=compression
+    )
+
+    assert len(my_client.get_container_signatures()) == 20
+
+    assert pyxis_server.encoding_log[0][3] == "gzip, deflate"
+    assert compression.response_ratio < 0.9
+    assert compression.request_ratio is None
+
+
+def test_client_without_compression(pyxis_server):
+    my_client = pyxis_client.PyxisClient(pyxis_server.url, 0, None, 0, False)
+
+    my_client.upload_signatures([make_signature(0, payload_size=4096)])
+
+    assert pyxis_server.encoding_log[0][1] is None
+
+
+def test_compression_arg(pyxis_server):
+    args = pyxis_ops.set_upload_signatures_args().parse_args(
+        [
+            "--pyxis-server",
+            pyxis_server.url,
+            "--pyxis-ssl-crtfile",
+            __file__,
+            "--pyxis-ssl-keyfile",
+            __file__,
+            "--pyxis-compression",
+            "deflate",
+            "--signatures",
+            "[]",
+        ]
+    )
+
+    client = pyxis_ops.create_pyxis_client(args, "ccache")
+
+    assert client.pyxis_session.compression.encoding == "deflate"
@@ -0,0 +1,138 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from pubtools._pyxis import pyxis_client, pyxis_ops
+from pubtools._pyxis.concurrency import AdaptiveConcurrency
+
+
+def _complete(concurrency, latency=0.01, failed=False):
+    started = concurrency.acquire()
+    concurrency.release(started - latency, failed)
+
+
+def test_additive_increase():
+    concurrency = AdaptiveConcurrency(min_limit=1, max_limit=4)
+    assert concurrency.limit == 1
+
+    _complete(concurrency)
+    assert concurrency.limit == 2
+    # about one more request per round of limit requests
+    _complete(concurrency)
+    _complete(concurrency)
+    assert concurrency.limit == 2
+    _complete(concurrency)
+    assert concurrency.limit == 3
+    for _ in range(20):
+        _complete(concurrency)
+    assert concurrency.limit == 4
+    assert concurrency.in_flight == 0
+
+
+def test_multiplicative_decrease_once_per_burst():
+    concurrency = AdaptiveConcurrency(min_limit=2, max_limit=16, initial_limit=16)
+    burst = [concurrency.acquire() for _ in range(8)]
+
+    for started in burst:
+        concurrency.release(started, failed=True)
+    # the requests were sent before the first failure was seen
+    assert concurrency.limit == 8
+
+    _complete(concurrency, latency=0, failed=True)
+    assert concurrency.limit == 4
+    _complete(concurrency, latency=0, failed=True)
+    _complete(concurrency, latency=0, failed=True)
+    assert concurrency.limit == 2
+
+
+def test_slow_requests_decrease():
+    concurrency = AdaptiveConcurrency(initial_limit=8, latency_tolerance=3)
+    _complete(concurrency, latency=0.1)
+    _complete(concurrency, latency=0.25)
+    assert concurrency.limit == 8
+
+    _complete(concurrency, latency=0.5)
+    assert concurrency.limit == 4
+
+
+def test_invalid_limits():
+    with pytest.raises(ValueError, match="min_limit <= max_limit"):
+        AdaptiveConcurrency(min_limit=5, max_limit=4)
+    with pytest.raises(ValueError):
+        AdaptiveConcurrency(min_limit=0)
+
+
+def test_acquire_waits_for_free_slot():
+    concurrency = AdaptiveConcurrency(min_limit=1, max_limit=1)
+    started = concurrency.acquire()
+    acquired = threading.Event()
+
+    def _acquire():
+        concurrency.acquire()
+        acquired.set()
+
+    thread = threading.Thread(target=_acquire)
+    thread.start()
+    assert not acquired.wait(0.2)
+    concurrency.release(started, failed=False)
+    assert acquired.wait(5)
+    thread.join()
+
+
+def test_client_adapts_to_errors(pyxis_server):
+    concurrency = AdaptiveConcurrency(min_limit=1, max_limit=8, initial_limit=8)
+    my_client = pyxis_client.PyxisClient(
+        pyxis_server.url, 0, None, 0, False, concurrency=concurrency
+    )
+    assert my_client.threads_limit == 8
+    # not one of the statuses retried by the session
+    pyxis_server.inject_error(520, method="DELETE")
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        my_client.delete_container_signatures(["a", "b", "c", "d"])
+    assert concurrency.limit == 4
+    assert concurrency.in_flight == 0
+
+    pyxis_server.inject_error(503, method="DELETE")
+    with pytest.raises(requests.exceptions.RetryError):
+        my_client.delete_container_signatures(["a"])
+    assert concurrency.limit == 2
+
+
+def test_client_grows_concurrency(pyxis_server):
+    concurrency = AdaptiveConcurrency(max_limit=4)
+    my_client = pyxis_client.PyxisClient(
+        pyxis_server.url, 0, None, 0, False, concurrency=concurrency
+    )
+    pyxis_server.latency = 0.01
+    start = time.monotonic()
+
+    assert len(my_client.delete_container_signatures(list("abcdefghij"))) == 10
+
+    assert concurrency.limit > 1
+    assert time.monotonic() - start < 5
+
+
+def test_adaptive_request_threads_arg(hostname):
+    args = pyxis_ops.set_delete_signatures_args().parse_args(
+        [
+            "--pyxis-server",
+            hostname,
+            "--pyxis-ssl-crtfile",
+            __file__,
+            "--pyxis-ssl-keyfile",
+            __file__,
+            "--ids",
+            "a",
+            "--request-threads",
+            "6",
+            "--adaptive-request-threads",
+        ]
+    )
+
+    client = pyxis_ops.create_pyxis_client(args, "ccache")
+
+    assert client.concurrency.max_limit == 6
+    assert client.threads_limit == 6
@@ -0,0 +1,401 @@
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from argparse import Namespace
+
+import mock
+import pytest
+
+from pubtools._pyxis import daemon, pyxis_ops
+from pubtools._pyxis.pyxis_client import PyxisClient
+from tests.pyxis_server import make_signature
+
+
+@pytest.fixture
+def socket_path(monkeypatch):
+    # Unix socket paths are limited in length, keep them short
+    directory = tempfile.mkdtemp(dir="/tmp")
+    path = os.path.join(directory, "d.sock")
+    monkeypatch.setenv(daemon.DAEMON_SOCKET_ENV, path)
+    yield path
+    shutil.rmtree(directory)
+
+
+def _serve(pyxis_daemon):
+    pyxis_daemon.start()
+    thread = threading.Thread(target=pyxis_daemon.serve_forever)
+    thread.start()
+    return thread
+
+
+@pytest.fixture
+def running_daemon(socket_path):
+    pyxis_daemon = daemon.PyxisDaemon(socket_path, workers=2)
+    thread = _serve(pyxis_daemon)
+    yield pyxis_daemon
+    pyxis_daemon.shutdown()
+    thread.join()
+
+
+def _args(server, *extra):
+    # certificate files have to exist, although plain HTTP doesn't use them
+    return [
+        "dummy",
+        "--pyxis-server",
+        server.url,
+        "--pyxis-ssl-crtfile",
+        __file__,
+        "--pyxis-ssl-keyfile",
+        __file__,
+    ] + list(extra)
+
+
+def test_default_socket_path(monkeypatch):
+    monkeypatch.delenv(daemon.DAEMON_SOCKET_ENV)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1000")
+    assert daemon.default_socket_path() == "/run/user/1000/pubtools-pyxis-%d.sock" % (
+        os.getuid()
+    )
+
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    assert daemon.default_socket_path() == os.path.join(
+        tempfile.gettempdir(), "pubtools-pyxis-%d" % os.getuid(), "daemon.sock"
+    )
+
+
+def test_fallback_directory(monkeypatch):
+    monkeypatch.delenv(daemon.DAEMON_SOCKET_ENV)
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    tmp_dir = tempfile.mkdtemp(dir="/tmp")
+    monkeypatch.setattr(tempfile, "tempdir", tmp_dir)
+    try:
+        pyxis_daemon = daemon.PyxisDaemon()
+        thread = _serve(pyxis_daemon)
+        directory = os.path.dirname(pyxis_daemon.socket_path)
+        assert os.stat(directory).st_mode & 0o777 == 0o700
+        assert daemon.connect(object()) is not None
+        pyxis_daemon.shutdown()
+        thread.join()
+
+        # someone else could have created the directory
+        os.chmod(directory, 0o755)
+        with pytest.raises(daemon.DaemonError, match="is not private"):
+            daemon.PyxisDaemon().start()
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_entrypoints_forwarded(running_daemon, pyxis_server, capsys):
+    signatures = [make_signature(i, payload_size=8) for i in range(3)]
+    pyxis_server.state.repositories[("registry.access.redhat.com", "ns/repo")] = {
+        "name": "ns/repo"
+    }
+    pyxis_server.state.indices = [{"path": "index:4.6"}]
+
+    resp = pyxis_ops.upload_signatures_mod(
+        _args(pyxis_server, "--signatures", json.dumps(signatures))
+    )
+    assert len(resp) == 3
+
+    digests = ",".join(s["manifest_digest"] for s in signatures)
+    res = pyxis_ops.get_signatures_mod(
+        _args(pyxis_server, "--manifest-digest", digests)
+    )
+    assert sorted(r["_id"] for r in res) == sorted(r["_id"] for r in resp)
+    res = pyxis_ops.get_signatures_mod(
+        _args(
+            pyxis_server,
+            "--manifest-digest",
+            digests,
+            "--fields",
+            "_id",
+            "--page-size",
+            "auto",
+        )
+    )
+    assert sorted(res, key=lambda r: r["_id"]) == sorted(
+        ({"_id": r["_id"]} for r in resp), key=lambda r: r["_id"]
+    )
+
+    assert pyxis_ops.get_repo_metadata_mod(
+        _args(pyxis_server, "--repo-name", "ns/repo")
+    ) == {"name": "ns/repo"}
+    assert pyxis_ops.get_operator_indices_mod(
+        _args(pyxis_server, "--ocp-versions-range", "4.6")
+    ) == [{"path": "index:4.6"}]
+
+    assert pyxis_ops.delete_signatures_mod(
+        _args(
+            pyxis_server, "--ids", ",".join(r["_id"] for r in resp), "--quiet-results"
+        )
+    ) == {"succeeded": 3, "failures": []}
+    assert pyxis_server.state.signatures == {}
+
+    # all operations shared the clients warmed up by the daemon
+    assert len(running_daemon.clients) == 2
+    assert all(w.client.reuse_threads for w in running_daemon.clients.values())
+    assert all(w.in_flight == 0 for w in running_daemon.clients.values())
+
+
+def test_get_signatures_filter_forwarded(running_daemon, pyxis_server):
+    pyxis_server.populate_signatures(8, payload_size=8)
+
+    res = pyxis_ops.get_signatures_mod(
+        _args(pyxis_server, "--filter", "sig_key_id==%08X" % 1)
+    )
+
+    assert sorted(r["_id"] for r in res) == sorted(
+        s["_id"]
+        for s in pyxis_server.state.signatures.values()
+        if s["sig_key_id"] == "%08X" % 1
+    )
+    assert len(res) == 2
+    assert len(running_daemon.clients) == 1
+
+
+def test_get_signatures_id_ranges_forwarded(running_daemon, pyxis_server):
+    pyxis_server.populate_signatures(6, payload_size=8, digest_count=2)
+    digest = next(iter(pyxis_server.state.signatures.values()))["manifest_digest"]
+
+    res = pyxis_ops.get_signatures_mod(
+        _args(pyxis_server, "--manifest-digest", digest, "--id-ranges", "2")
+    )
+
+    assert sorted(r["_id"] for r in res) == sorted(
+        s["_id"]
+        for s in pyxis_server.state.signatures.values()
+        if s["manifest_digest"] == digest
+    )
+    # ranges of _id were paged by the daemon's client
+    filters = [query["filter"][0] for _, _, query in pyxis_server.requests_matching()]
+    assert any("_id=lt=" in f for f in filters)
+    assert len(running_daemon.clients) == 1
+
+
+def test_forwarded_error(running_daemon, pyxis_server, capsys):
+    pyxis_server.inject_error(400, path="operators")
+
+    ret = pyxis_ops.get_operator_indices_main(
+        _args(pyxis_server, "--ocp-versions-range", "4.6")
+    )
+
+    assert ret == 1
+    _, err = capsys.readouterr()
+    assert "400 Client Error" in err
+
+
+def test_client_renewed_after_ttl(running_daemon, pyxis_server):
+    running_daemon.client_ttl = 0
+    args = _args(pyxis_server, "--ocp-versions-range", "4.6")
+
+    pyxis_ops.get_operator_indices_mod(args)
+    (first,) = running_daemon.clients.values()
+    with mock.patch.object(first.client, "close") as close:
+        pyxis_ops.get_operator_indices_mod(args)
+    (second,) = running_daemon.clients.values()
+
+    assert first.client is not second.client
+    assert first.retired
+    close.assert_called_once_with()
+
+
+def test_retired_client_closed_when_unused(running_daemon, pyxis_server):
+    client_args = {"pyxis_server": pyxis_server.url, "pyxis_ssl_crtfile": __file__}
+    client_args["pyxis_ssl_keyfile"] = __file__
+    # an operation still runs with the client when it expires
+    first = running_daemon._acquire_client(client_args)
+    running_daemon.client_ttl = 0
+    with mock.patch.object(first.client, "close") as close:
+        second = running_daemon._acquire_client(client_args)
+        running_daemon._release_client(second)
+        assert first.retired
+        close.assert_not_called()
+
+        running_daemon._release_client(first)
+        close.assert_called_once_with()
+
+
+def test_single_kerberos_principal(running_daemon, pyxis_server):
+    client_args = {"pyxis_server": pyxis_server.url, "pyxis_krb_principal": "a@X"}
+    running_daemon._release_client(running_daemon._acquire_client(client_args))
+    assert running_daemon.principal == "a@X"
+
+    # other principals run without the daemon
+    args = Namespace(pyxis_krb_principal="b@X")
+    assert daemon.connect(args) is None
+    args.pyxis_krb_principal = "a@X"
+    assert daemon.connect(args) is not None
+    with pytest.raises(daemon.DaemonError, match="serves Kerberos principal a@X"):
+        daemon._send(
+            running_daemon.socket_path,
+            {
+                "method": "get_operator_indices",
+                "args": ["4.6"],
+                "client": dict(client_args, pyxis_krb_principal="b@X"),
+            },
+        )
+
+
+def test_unsupported_operation(running_daemon):
+    with pytest.raises(daemon.DaemonError, match="Unsupported operation: close"):
+        daemon._send(running_daemon.socket_path, {"method": "close"})
+
+
+def test_socket_permissions(running_daemon):
+    assert os.stat(running_daemon.socket_path).st_mode & 0o777 == 0o600
+
+
+def test_no_daemon_running(socket_path):
+    assert daemon.connect(object()) is None
+    assert daemon.connect(object(), "") is None
+    assert not daemon.stop()
+
+
+def test_foreign_socket_ignored(running_daemon):
+    with mock.patch("os.getuid", return_value=os.getuid() + 1):
+        assert daemon.connect(object()) is None
+        assert not daemon.stop()
+
+    os.chmod(running_daemon.socket_path, 0o660)
+    assert daemon.connect(object()) is None
+
+
+def test_stuck_daemon(socket_path, monkeypatch):
+    monkeypatch.setattr(daemon, "PING_TIMEOUT", 0.1)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(socket_path)
+    os.chmod(socket_path, 0o600)
+    # listening, but never answering
+    sock.listen(1)
+    try:
+        assert daemon.connect(object()) is None
+    finally:
+        sock.close()
+
+
+def test_stale_socket(socket_path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(socket_path)
+    sock.close()
+    os.chmod(socket_path, 0o600)
+
+    assert daemon.connect(object()) is None
+    assert not daemon.stop()
+
+    # a new daemon replaces the stale socket
+    pyxis_daemon = daemon.PyxisDaemon(socket_path)
+    thread = _serve(pyxis_daemon)
+    assert daemon.connect(object()) is not None
+    pyxis_daemon.shutdown()
+    thread.join()
+
+
+def test_running_daemon_not_replaced(running_daemon, capsys):
+    with pytest.raises(daemon.DaemonError, match="already running"):
+        daemon.PyxisDaemon(running_daemon.socket_path).start()
+    args = ["dummy", "--socket", running_daemon.socket_path]
+    assert pyxis_ops.daemon_main(args) == 1
+    _, err = capsys.readouterr()
+    assert "Daemon already running on %s" % running_daemon.socket_path in err
+
+    # the running daemon still serves its socket
+    assert daemon.connect(object()) is not None
+
+
+def test_relative_paths_forwarded_absolute(running_daemon, monkeypatch):
+    monkeypatch.chdir(os.path.dirname(__file__))
+    args = Namespace(
+        pyxis_ssl_crtfile="data/name.crt",
+        pyxis_ssl_keyfile="/etc/name.key",
+        pyxis_krb_ktfile=None,
+    )
+
+    client = daemon.connect(args)
+
+    assert client.client_args["pyxis_ssl_crtfile"] == os.path.join(
+        os.path.dirname(__file__), "data", "name.crt"
+    )
+    assert client.client_args["pyxis_ssl_keyfile"] == "/etc/name.key"
+    assert client.client_args["pyxis_krb_ktfile"] is None
+
+
+def test_other_file_not_replaced(socket_path):
+    with open(socket_path, "w"):
+        pass
+    with pytest.raises(OSError):
+        daemon.PyxisDaemon(socket_path).start()
+    assert os.path.isfile(socket_path)
+
+
+def test_profiled_run_not_forwarded(running_daemon, pyxis_server):
+    parser = pyxis_ops.set_get_operator_indices_args()
+    args = parser.parse_args(_args(pyxis_server, "--ocp-versions-range", "4.6")[1:])
+    assert isinstance(pyxis_ops.setup_pyxis_client(args, "/tmp/x"), daemon.DaemonClient)
+
+    args.profile = "/tmp/profile"
+    assert isinstance(pyxis_ops.setup_pyxis_client(args, "/tmp/x"), PyxisClient)
+
+
+def test_connection_closed(socket_path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(socket_path)
+    sock.listen(1)
+
+    def _close_connection():
+        conn, _ = sock.accept()
+        conn.recv(1024)
+        conn.close()
+
+    thread = threading.Thread(target=_close_connection)
+    thread.start()
+    try:
+        with pytest.raises(daemon.DaemonError, match="closed the connection"):
+            daemon._send(socket_path, {"method": "ping"})
+    finally:
+        thread.join()
+        sock.close()
+
+
+def test_daemon_main_stop(socket_path, capsys):
+    thread = threading.Thread(
+        target=pyxis_ops.daemon_main, args=(["dummy", "--socket", socket_path],)
+    )
+    thread.start()
+    for _ in range(100):
+        if daemon.connect(object()):
+            break
+        time.sleep(0.05)
+
+    assert pyxis_ops.daemon_main(["dummy", "--stop"]) == 0
+    thread.join()
+    assert not os.path.exists(socket_path)
+    assert pyxis_ops.daemon_main(["dummy", "--stop"]) == 1
+    _, err = capsys.readouterr()
+    assert "Listening on %s" % socket_path in err
+    assert "Daemon is not running" in err
+
+
+def test_idle_timeout(socket_path):
+    pyxis_daemon = daemon.PyxisDaemon(socket_path, idle_timeout=0.1)
+    start = time.monotonic()
+    pyxis_daemon.serve_forever()
+    assert time.monotonic() - start >= 0.1
+    assert not os.path.exists(socket_path)
+
+
+def test_idle_timeout_waits_for_running_operations(socket_path, pyxis_server):
+    pyxis_daemon = daemon.PyxisDaemon(socket_path, idle_timeout=0.3)
+    thread = _serve(pyxis_daemon)
+    pyxis_server.state.indices = [{"path": "index:4.6"}]
+    pyxis_server.latency = 1.0
+
+    assert pyxis_ops.get_operator_indices_mod(
+        _args(pyxis_server, "--ocp-versions-range", "4.6")
+    ) == [{"path": "index:4.6"}]
+    # idle time counts from the end of the operation
+    assert daemon.connect(object()) is not None
+    thread.join()
@@ -0,0 +1,131 @@
+import time
+
+import pytest
+import requests
+
+from pubtools._pyxis import deadline, pyxis_client
+from pubtools._pyxis.deadline import DeadlineExceeded, DeadlineRetry
+
+
+def test_until_only_shortens():
+    assert deadline.remaining() is None
+    with deadline.until(deadline.expiry(None)):
+        assert deadline.remaining() is None
+    with deadline.until(deadline.expiry(10)):
+        assert 9 < deadline.remaining() <= 10
+        with deadline.until(deadline.expiry(20)):
+            assert deadline.remaining() <= 10
+        with deadline.until(deadline.expiry(1)):
+            assert deadline.remaining() <= 1
+        assert deadline.remaining() > 9
+    assert deadline.remaining() is None
+
+
+def test_request_timeout():
+    assert deadline.request_timeout((5, 60)) == (5, 60)
+    with deadline.until(deadline.expiry(10)):
+        connect, read = deadline.request_timeout((5, 60))
+        assert connect == 5
+        assert 9 < read <= 10
+        assert deadline.request_timeout(3) == 3
+    with deadline.until(deadline.expiry(-1)):
+        with pytest.raises(DeadlineExceeded):
+            deadline.request_timeout(3)
+
+
+def test_retry_stops_at_deadline():
+    retry = DeadlineRetry(total=5, backoff_factor=100).increment().increment()
+    assert retry.get_backoff_time() > 100
+    assert not retry.is_exhausted()
+    response = requests.Response()
+    response.headers["Retry-After"] = "120"
+    assert retry.get_retry_after(response) == 120
+    assert DeadlineRetry().get_retry_after(requests.Response()) is None
+
+    with deadline.until(deadline.expiry(0.2)):
+        assert retry.get_backoff_time() <= 0.2
+        assert retry.get_retry_after(response) <= 0.2
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            retry.sleep()
+        assert time.monotonic() - start < 1
+        assert retry.is_exhausted()
+        assert retry.get_backoff_time() == 0
+
+
+def test_read_timeout(pyxis_server):
+    my_client = pyxis_client.PyxisClient(
+        pyxis_server.url, 0, None, 0, False, timeout=0.2
+    )
+    pyxis_server.inject_delay(1, path="operators")
+
+    with pytest.raises(requests.exceptions.ConnectionError, match="timed out"):
+        my_client.get_operator_indices("4.6")
+
+
+def test_deadline_stops_retries(pyxis_server):
+    my_client = pyxis_client.PyxisClient(
+        pyxis_server.url, 5, None, 5, False, deadline=0.5
+    )
+    pyxis_server.inject_error(503, count=10, path="operators")
+
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        my_client.get_operator_indices("4.6")
+    assert time.monotonic() - start < 2
+
+
+def test_deadline_interrupts_slow_response(pyxis_server):
+    my_client = pyxis_client.PyxisClient(pyxis_server.url, 0, None, 0, False)
+    pyxis_server.inject_delay(2, path="repositories")
+
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded) as exc_info:
+        my_client.get_repository_metadata("ns/repo", deadline=0.3)
+    assert time.monotonic() - start < 1.5
+    assert isinstance(exc_info.value.__cause__, requests.exceptions.RequestException)
+
+
+def test_deadline_covers_pages(pyxis_server, monkeypatch):
+    pyxis_server.populate_signatures(5, payload_size=8)
+    monkeypatch.setattr(pyxis_server, "default_page_size", 1)
+    pyxis_server.latency = 0.2
+    my_client = pyxis_client.PyxisClient(pyxis_server.url, 0, None, 0, False)
+
+    with pytest.raises(DeadlineExceeded):
+        my_client.get_container_signatures(deadline=0.5)
+
+    pyxis_server.latency = 0
+    assert len(my_client.get_container_signatures(None, "r", deadline=5)) == 0
+
+
+def test_deadline_of_iteration_not_applied_to_caller(pyxis_server, monkeypatch):
+    pyxis_server.populate_signatures(3, payload_size=8)
+    monkeypatch.setattr(pyxis_server, "default_page_size", 1)
+    my_client = pyxis_client.PyxisClient(
+        pyxis_server.url, 0, None, 0, False, deadline=5
+    )
+
+    signatures = []
+    for signature in my_client.iter_container_signatures():
+        assert deadline.remaining() is None
+        signatures.append(signature)
+    assert len(signatures) == 3
+
+    pages = my_client.iter_container_signatures(deadline=0.3)
+    next(pages)
+    time.sleep(0.4)
+    with pytest.raises(DeadlineExceeded):
+        next(pages)
+
+
+def test_deadline_of_parallel_requests(pyxis_server):
+    pyxis_server.latency = 0.2
+    my_client = pyxis_client.PyxisClient(pyxis_server.url, 0, None, 0, False, threads=1)
+
+    with pytest.raises(DeadlineExceeded):
+        my_client.delete_container_signatures(["a", "b", "c", "d", "e"], deadline=0.5)
+    assert len(pyxis_server.requests_matching("DELETE")) < 5
+
+    pyxis_server.latency = 0
+    assert my_client.upload_signatures([], deadline=1) == []
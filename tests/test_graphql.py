@@ -0,0 +1,202 @@
+import pytest
+import requests
+
+from pubtools._pyxis import pyxis_client, pyxis_ops
+from pubtools._pyxis.graphql import GraphQLError, GraphQLQuery, check_result
+from tests.pyxis_server import make_signature
+
+INTERNAL = "registry.access.redhat.com"
+PARTNER = "registry.connect.redhat.com"
+
+
+def _client(server, **kwargs):
+    return pyxis_client.PyxisClient(
+        server.url, 0, None, 0, False, graphql_url=server.url + "graphql/", **kwargs
+    )
+
+
+def test_query_document():
+    query = GraphQLQuery()
+
+    alias = query.add(
+        "find_signatures",
+        {"filter": {"reference": {"in": ['a"b', "c"]}}, "page": 0, "page_size": None},
+        ["data._id", "data.repository.name", "total"],
+    )
+    assert alias == "q0"
+    assert query.add("ping", {}, ["ok"]) == "q1"
+
+    assert len(query) == 2
+    assert query.payload() == {
+        "query": '{q0: find_signatures(filter: {reference: {in: ["a\\"b", "c"]}}, '
+        "page: 0) {data {_id repository {name}} total} q1: ping {ok}}"
+    }
+
+
+def test_query_results_errors():
+    query = GraphQLQuery()
+    query.add("ping", {}, ["ok"])
+
+    assert query.results({"data": {"q0": {"ok": True}}}) == {"q0": {"ok": True}}
+    with pytest.raises(GraphQLError, match="bad query; other"):
+        query.results(
+            {"data": None, "errors": [{"message": "bad query"}, {"message": "other"}]}
+        )
+
+    assert check_result({"data": [1], "error": None}) == [1]
+    with pytest.raises(GraphQLError, match="Forbidden") as exc_info:
+        check_result({"data": None, "error": {"status": 403, "detail": "Forbidden"}})
+    assert exc_info.value.status == 403
+
+
+def test_get_signatures_batched_pages(pyxis_server):
+    pyxis_server.populate_signatures(25, payload_size=8, digest_count=5)
+    signatures = list(pyxis_server.state.signatures.values())
+    digests = sorted({s["manifest_digest"] for s in signatures})[:3]
+    my_client = _client(pyxis_server)
+
+    res = my_client.get_container_signatures(
+        ",".join(digests), page_size=4, as_records=True
+    )
+
+    expected = [s for s in signatures if s["manifest_digest"] in digests]
+    assert [r._id for r in res] == [s["_id"] for s in expected]
+    assert [r.signature_data for r in res] == [s["signature_data"] for s in expected]
+    # the first page, then all other pages in one request
+    assert len(pyxis_server.requests_matching("POST", "/graphql")) == 2
+    assert pyxis_server.requests_matching("GET") == []
+
+
+def test_get_signatures_all_fields_rest(pyxis_server):
+    pyxis_server.populate_signatures(3, payload_size=8)
+    my_client = _client(pyxis_server)
+
+    res = my_client.get_container_signatures(exclude=["signature_data"])
+
+    # the same fields as without GraphQL
+    assert [r["_id"] for r in res] == list(pyxis_server.state.signatures)
+    assert "creation_date" in res[0] and "last_update_date" in res[0]
+    assert "signature_data" not in res[0]
+    assert pyxis_server.requests_matching("POST") == []
+
+
+def test_get_signatures_fields_and_filters(pyxis_server, monkeypatch):
+    monkeypatch.setattr(pyxis_client, "MAX_BATCH_SIZE", 2)
+    pyxis_server.populate_signatures(6, payload_size=8)
+    signatures = list(pyxis_server.state.signatures.values())
+    my_client = _client(pyxis_server)
+
+    res = my_client.get_container_signatures(
+        signatures[0]["manifest_digest"],
+        ",".join(s["reference"] for s in signatures[3:]),
+        include=["_id"],
+        page_size=1,
+    )
+    assert res == [{"_id": s["_id"]} for s in signatures[:1] + signatures[3:]]
+    # pages 1 and 2, then page 3
+    assert len(pyxis_server.requests_matching("POST")) == 3
+
+    records = my_client.get_container_signatures(
+        exclude=["signature_data"], as_records=True, page_size="auto"
+    )
+    assert [r._id for r in records] == [s["_id"] for s in signatures]
+    assert all(r.signature_data is None for r in records)
+
+
+def test_get_signatures_graphql_error(pyxis_server):
+    my_client = _client(pyxis_server)
+    my_client.max_page_size = 1000
+
+    with pytest.raises(GraphQLError, match="page_size must not exceed 500"):
+        my_client.get_container_signatures(page_size="auto", as_records=True)
+
+    # cursor queries use REST
+    pyxis_server.state.add_signature(make_signature(0, payload_size=8))
+    assert len(my_client.get_container_signatures(cursor=True)) == 1
+
+
+def test_get_repositories_metadata(pyxis_server):
+    repositories = pyxis_server.state.repositories
+    repositories[(INTERNAL, "ns/both")] = {"repository": "ns/both", "published": True}
+    repositories[(PARTNER, "ns/both")] = {"repository": "ns/both", "published": False}
+    repositories[(PARTNER, "ns/partner")] = {"repository": "ns/partner"}
+    my_client = _client(pyxis_server)
+
+    res = my_client.get_repositories_metadata(
+        ["ns/both", "ns/partner", "ns/missing"], include=["published"]
+    )
+
+    assert res == {
+        "ns/both": {"published": True},
+        "ns/partner": {"published": None},
+        "ns/missing": None,
+    }
+    assert len(pyxis_server.requests_matching("POST", "/graphql")) == 1
+
+    assert my_client.get_repository_metadata("ns/both", only_partner=True) == {
+        "_id": None,
+        "registry": None,
+        "repository": "ns/both",
+        "published": False,
+        "release_categories": None,
+        "build_categories": None,
+        "auto_rebuild_tags": None,
+        "content_sets": None,
+        "non_production_only": None,
+        "protected_for_pull": None,
+        "protected_for_search": None,
+        "requires_terms": None,
+        "source_container_image_enabled": None,
+    }
+    with pytest.raises(GraphQLError, match="ns/partner not found") as exc_info:
+        my_client.get_repository_metadata("ns/partner", custom_registry="quay.io")
+    assert exc_info.value.status == 404
+    # as with REST
+    assert isinstance(exc_info.value, requests.exceptions.HTTPError)
+    assert exc_info.value.response.status_code == 404
+
+
+def test_get_repositories_metadata_rest(pyxis_server):
+    pyxis_server.state.repositories[(PARTNER, "ns/repo")] = {
+        "repository": "ns/repo",
+        "published": True,
+    }
+    my_client = pyxis_client.PyxisClient(pyxis_server.url, 0, None, 0, False)
+
+    res = my_client.get_repositories_metadata(
+        ["ns/repo", "ns/missing"], include=["published"]
+    )
+
+    assert res == {
+        "ns/repo": {"repository": "ns/repo", "published": True},
+        "ns/missing": None,
+    }
+    queries = [query for _, _, query in pyxis_server.requests_matching("GET")]
+    assert queries == [{"include": ["published"]}] * 4
+
+    pyxis_server.inject_error(403, method="GET")
+    with pytest.raises(Exception, match="403"):
+        my_client.get_repositories_metadata(["ns/repo"], only_internal=True)
+
+
+def test_graphql_url_arg(hostname):
+    args = pyxis_ops.set_get_repo_metadata_args().parse_args(
+        [
+            "--pyxis-server",
+            hostname,
+            "--pyxis-ssl-crtfile",
+            __file__,
+            "--pyxis-ssl-keyfile",
+            __file__,
+            "--repo-name",
+            "ns/repo",
+            "--pyxis-graphql-url",
+            "https://graphql.example.com/graphql/",
+        ]
+    )
+
+    client = pyxis_ops.create_pyxis_client(args, "ccache")
+
+    assert client.graphql_url == "https://graphql.example.com/graphql/"
+    url = client.pyxis_session._api_url(client.graphql_url)
+    assert url == "https://graphql.example.com/graphql/"
@@ -0,0 +1,151 @@
+import threading
+import time
+
+import pytest
+
+from pubtools._pyxis import pyxis_client
+from pubtools._pyxis.hedging import Hedging
+
+
+def _warm(hedging, endpoint, latencies):
+    for latency in latencies:
+        hedging.record(endpoint, latency)
+
+
+def test_delay_percentile_per_group():
+    hedging = Hedging(percentile=95, min_samples=3, window=20)
+    assert hedging.delay("signatures") is None
+    _warm(hedging, "signatures?filter=x", [0.1, 0.2])
+    assert hedging.delay("signatures") is None
+
+    _warm(hedging, "signatures/id/a", [i / 10 for i in range(3, 21)])
+    assert hedging.delay("signatures?page=2") == 1.9
+    assert hedging.delay("repositories/registry/r/repository/n") is None
+
+    # only the window of recent latencies is kept
+    _warm(hedging, "signatures", [0.01] * 20)
+    assert hedging.delay("signatures") == 0.01
+
+
+def test_fast_request_not_hedged():
+    hedging = Hedging(min_samples=1, budget=1)
+    _warm(hedging, "operators", [1])
+    calls = []
+
+    assert hedging.run("operators", lambda: calls.append(1) or "done") == "done"
+    assert calls == [1]
+    assert (hedging.requests, hedging.hedges) == (1, 0)
+    hedging.close()
+
+
+def test_slow_request_hedged():
+    hedging = Hedging(min_samples=1, budget=1)
+    _warm(hedging, "operators", [0.05])
+    release = threading.Event()
+    calls = []
+    lock = threading.Lock()
+
+    def _send():
+        with lock:
+            calls.append(1)
+            first = len(calls) == 1
+        if first:
+            release.wait(5)
+            return "slow"
+        return "fast"
+
+    assert hedging.run("operators", _send) == "fast"
+    release.set()
+    assert (hedging.requests, hedging.hedges, hedging.hedge_wins) == (1, 1, 1)
+    hedging.close()
+    # the slow response is recorded as well
+    assert hedging.delay("operators") > 0.05
+
+
+def test_hedge_failure_ignored():
+    hedging = Hedging(min_samples=1, budget=1)
+    _warm(hedging, "operators", [0.05])
+    calls = []
+    lock = threading.Lock()
+
+    def _send():
+        with lock:
+            calls.append(1)
+            first = len(calls) == 1
+        if first:
+            time.sleep(0.3)
+            return "slow"
+        raise ValueError("hedge failed")
+
+    assert hedging.run("operators", _send) == "slow"
+    assert hedging.hedge_wins == 0
+    hedging.close()
+
+
+def test_both_failures_raise_primary_error():
+    hedging = Hedging(min_samples=1, budget=1)
+    _warm(hedging, "operators", [0.05])
+    calls = []
+    lock = threading.Lock()
+
+    def _send():
+        with lock:
+            calls.append(1)
+            first = len(calls) == 1
+        if first:
+            time.sleep(0.3)
+            raise ValueError("primary failed")
+        raise ValueError("hedge failed")
+
+    with pytest.raises(ValueError, match="primary failed"):
+        hedging.run("operators", _send)
+    hedging.close()
+
+
+def test_budget_caps_hedges():
+    hedging = Hedging(min_samples=1, budget=0.5, window=500)
+    # slow responses don't move the percentile much
+    _warm(hedging, "operators", [0.01] * 200)
+
+    def _send():
+        time.sleep(0.05)
+        return "slow"
+
+    for _ in range(4):
+        assert hedging.run("operators", _send) == "slow"
+    # a hedge for every other request at most
+    assert (hedging.requests, hedging.hedges) == (4, 2)
+    hedging.close()
+    hedging.close()
+
+
+def test_client_hedges_slow_query(pyxis_server):
+    pyxis_server.state.indices = [{"path": "index:4.6"}]
+    hedging = Hedging(min_samples=1, budget=1)
+    _warm(hedging, "operators", [0.05])
+    my_client = pyxis_client.PyxisClient(
+        pyxis_server.url, 0, None, 0, False, hedging=hedging
+    )
+    pyxis_server.inject_delay(1.5, path="operators")
+
+    start = time.monotonic()
+    assert my_client.get_operator_indices("4.6") == [{"path": "index:4.6"}]
+
+    assert time.monotonic() - start < 1
+    assert hedging.hedge_wins == 1
+    assert len(pyxis_server.requests_matching("GET", "/v1/operators")) == 2
+    hedging.close()
+
+
+def test_client_hedges_pages(pyxis_server, monkeypatch):
+    pyxis_server.populate_signatures(5, payload_size=8)
+    monkeypatch.setattr(pyxis_server, "default_page_size", 2)
+    hedging = Hedging(min_samples=100)
+    my_client = pyxis_client.PyxisClient(
+        pyxis_server.url, 0, None, 0, False, hedging=hedging
+    )
+
+    assert len(my_client.get_container_signatures("sha256:a,sha256:b")) == 0
+    assert len(list(my_client.iter_container_signatures())) == 5
+    assert hedging.requests == 4
+    hedging.close()
@@ -0,0 +1,50 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+# modules which must only be imported when they are actually used
+LAZY_MODULES = ["requests_kerberos", "spnego", "more_executors"]
+
+
+def _imported_modules(code):
+    script = (
+        "import json, sys\n"
+        "{0}\n"
+        "print(json.dumps([m for m in {1!r} if m in sys.modules]))".format(
+            code, LAZY_MODULES
+        )
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    out = subprocess.check_output([sys.executable, "-c", script], env=env)
+    return json.loads(out)
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "import pubtools._pyxis.pyxis_ops",
+        "from pubtools._pyxis.pyxis_ops import setup_pyxis_client, CMD_ARGS\n"
+        "from pubtools._pyxis.utils import setup_arg_parser\n"
+        "args = setup_arg_parser(CMD_ARGS).parse_args(['--pyxis-server', 'h', "
+        "'--pyxis-ssl-crtfile', 'c', '--pyxis-ssl-keyfile', 'k'])\n"
+        "setup_pyxis_client(args, '/tmp/ccache').pyxis_session",
+    ],
+    ids=["import", "ssl-client"],
+)
+def test_heavy_dependencies_not_imported(code):
+    assert _imported_modules(code) == []
+
+
+def test_heavy_dependencies_imported_when_used():
+    code = (
+        "from pubtools._pyxis.pyxis_client import PyxisClient\n"
+        "PyxisClient('h')._do_parallel_requests(lambda x: x, [])\n"
+        "from pubtools._pyxis.pyxis_authentication import PyxisKrbAuth\n"
+        "from unittest import mock\n"
+        "mock.patch('subprocess.Popen').start().return_value.wait.return_value = 0\n"
+        "PyxisKrbAuth('p', 'h', '/tmp/ccache')._krb_auth()"
+    )
+    assert _imported_modules(code) == LAZY_MODULES
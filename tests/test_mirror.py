@@ -0,0 +1,128 @@
+import json
+
+import pytest
+
+from pubtools._pyxis import mirror, pyxis_client
+from pubtools._pyxis.records import SignatureRecord
+
+
+@pytest.fixture
+def client(pyxis_server):
+    return pyxis_client.PyxisClient(pyxis_server.url, 5, None, 0, False)
+
+
+def _signature_queries(server):
+    return [
+        query.get("filter", [None])[0]
+        for _, _, query in server.requests_matching("GET", "/v1/signatures")
+    ]
+
+
+def test_refresh_and_query(pyxis_server, client, tmp_path, monkeypatch):
+    pyxis_server.populate_signatures(7, payload_size=8, digest_count=3)
+    monkeypatch.setattr(pyxis_server, "default_page_size", 3)
+    monkeypatch.setattr(mirror, "_CHUNK_SIZE", 2)
+    stored = list(pyxis_server.state.signatures.values())
+
+    with mirror.SignatureMirror(str(tmp_path / "mirror.db"), client) as my_mirror:
+        assert my_mirror.last_update_date is None
+        assert my_mirror.refresh() == 7
+        assert my_mirror.last_update_date == max(s["last_update_date"] for s in stored)
+
+        assert my_mirror.get_container_signatures() == stored
+        digest = stored[0]["manifest_digest"]
+        assert my_mirror.get_container_signatures(digest) == stored[0:7:3]
+        # like Pyxis, signatures matching either field
+        res = my_mirror.get_container_signatures(
+            digest, "%s,%s" % (stored[0]["reference"], stored[1]["reference"])
+        )
+        assert [s["_id"] for s in res] == [stored[i]["_id"] for i in (0, 3, 6, 1)]
+        res = my_mirror.get_container_signatures(
+            references=stored[2]["reference"], as_records=True
+        )
+        assert res == [SignatureRecord.from_dict(stored[2])]
+
+    # all signatures are fetched by the first refresh
+    assert _signature_queries(pyxis_server) == [None, None, None]
+
+
+def test_incremental_refresh(pyxis_server, client, tmp_path):
+    pyxis_server.populate_signatures(3, payload_size=8)
+    path = str(tmp_path / "mirror.db")
+    with mirror.SignatureMirror(path, client) as my_mirror:
+        my_mirror.refresh()
+        since = my_mirror.last_update_date
+
+    first = next(iter(pyxis_server.state.signatures.values()))
+    first.update(signature_data="updated", last_update_date="2999-01-01T00:00:00+00:00")
+    pyxis_server.populate_signatures(4, payload_size=8)
+
+    with mirror.SignatureMirror(path, client) as my_mirror:
+        # the updated signature, the new one and the latest one again
+        assert my_mirror.refresh() == 3
+        assert my_mirror.last_update_date == "2999-01-01T00:00:00+00:00"
+        res = my_mirror.get_container_signatures()
+        assert sorted(s["_id"] for s in res) == sorted(pyxis_server.state.signatures)
+        assert my_mirror.get_container_signatures(first["manifest_digest"]) == [first]
+
+    assert _signature_queries(pyxis_server)[-1] == "last_update_date=ge=%s" % since
+
+
+def test_full_refresh_drops_deleted(pyxis_server, client, tmp_path):
+    pyxis_server.populate_signatures(3, payload_size=8)
+    with mirror.SignatureMirror(str(tmp_path / "mirror.db"), client) as my_mirror:
+        my_mirror.refresh()
+        deleted = next(iter(pyxis_server.state.signatures))
+        pyxis_server.state.remove_signature(deleted)
+
+        my_mirror.refresh()
+        assert len(my_mirror.get_container_signatures()) == 3
+        assert my_mirror.refresh(full=True) == 2
+        res = my_mirror.get_container_signatures()
+        assert sorted(s["_id"] for s in res) == sorted(pyxis_server.state.signatures)
+
+
+def test_failed_refresh_keeps_content(pyxis_server, client, tmp_path, monkeypatch):
+    pyxis_server.populate_signatures(3, payload_size=8)
+    monkeypatch.setattr(pyxis_server, "default_page_size", 2)
+    with mirror.SignatureMirror(str(tmp_path / "mirror.db"), client) as my_mirror:
+        my_mirror.refresh()
+        pyxis_server.inject_error(400, path="signatures")
+        with pytest.raises(Exception, match="400"):
+            my_mirror.refresh(full=True)
+        assert len(my_mirror.get_container_signatures()) == 3
+
+
+def test_refresh_without_client(tmp_path):
+    with mirror.SignatureMirror(str(tmp_path / "mirror.db")) as my_mirror:
+        with pytest.raises(ValueError, match="PyxisClient is required"):
+            my_mirror.refresh()
+        assert my_mirror.get_container_signatures("sha256:a") == []
+
+
+def test_signatures_without_update_date(pyxis_server, client, tmp_path):
+    pyxis_server.state.add_signature({"_id": "a", "last_update_date": None})
+    with mirror.SignatureMirror(str(tmp_path / "mirror.db"), client) as my_mirror:
+        assert my_mirror.refresh() == 1
+        assert my_mirror.last_update_date is None
+
+
+def test_query_many_values(tmp_path, monkeypatch):
+    monkeypatch.setattr(mirror, "_QUERY_CHUNK_SIZE", 2)
+    with mirror.SignatureMirror(str(tmp_path / "mirror.db")) as my_mirror:
+        with my_mirror._db:
+            my_mirror._db.executemany(
+                "INSERT INTO signatures VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        "id-%d" % i,
+                        "d%d" % i,
+                        "r",
+                        None,
+                        json.dumps({"_id": "id-%d" % i}),
+                    )
+                    for i in range(5)
+                ],
+            )
+        res = my_mirror.get_container_signatures("d0,d1,d2,d4")
+        assert [s["_id"] for s in res] == ["id-0", "id-1", "id-2", "id-4"]
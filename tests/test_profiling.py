@@ -0,0 +1,199 @@
+import cProfile
+import json
+import os
+import pstats
+import subprocess
+import sys
+import threading
+
+import pytest
+import requests_mock
+
+from pubtools._pyxis import profiling, pyxis_ops
+from tests.utils import load_data, urljoin
+
+
+def _read_breakdown(path):
+    with open(path + ".breakdown.json") as f:
+        return json.load(f)
+
+
+def test_profile_get_signatures(tmp_path, capsys, hostname):
+    profile_path = str(tmp_path / "get-signatures.prof")
+    page_1_response = json.loads(load_data("signatures_page1"))
+    page_2_response = json.loads(load_data("signatures_page2"))
+    digest = "sha256:dummy-manifest-digest-1"
+    args = [
+        "dummy",
+        "--pyxis-server",
+        hostname,
+        "--pyxis-ssl-crtfile",
+        "/root/name.crt",
+        "--pyxis-ssl-keyfile",
+        "/root/name.key",
+        "--manifest-digest",
+        digest,
+        "--profile",
+        profile_path,
+    ]
+
+    with requests_mock.Mocker() as m:
+        m.get(
+            "{0}v1/signatures?filter=manifest_digest=in=({1})".format(hostname, digest),
+            json=page_1_response,
+        )
+        m.get(
+            "{0}v1/signatures?filter=manifest_digest=in=({1})&page=1".format(
+                hostname, digest
+            ),
+            json=page_2_response,
+        )
+        assert pyxis_ops.get_signatures_main(args) == 0
+
+    assert profiling.active() is None
+    stats = pstats.Stats(profile_path)
+    assert stats.total_calls > 0
+
+    breakdown = _read_breakdown(profile_path)
+    assert breakdown["import"] >= 0
+    assert breakdown["wall_time"] >= breakdown["import"]
+    assert breakdown["categories"]["auth"]["count"] == 1
+    assert breakdown["categories"]["network"]["count"] == 2
+    # two pages decoded, output encoded
+    assert breakdown["categories"]["serialization"]["count"] == 3
+    assert [r["http.method"] for r in breakdown["requests"]] == ["GET", "GET"]
+    assert breakdown["requests"][1]["http.params"] == "{'page': 1}"
+    assert all(r["seconds"] >= 0 for r in breakdown["requests"])
+
+
+def test_profile_upload_signatures_mod(tmp_path, hostname):
+    profile_path = str(tmp_path / "upload.prof")
+    args = [
+        "dummy",
+        "--pyxis-server",
+        hostname,
+        "--pyxis-ssl-crtfile",
+        "/root/name.crt",
+        "--pyxis-ssl-keyfile",
+        "/root/name.key",
+        "--signatures",
+        '[{"foo": "bar"}, {"foo": "baz"}]',
+        "--request-threads",
+        "2",
+        "--profile",
+        profile_path,
+    ]
+
+    with requests_mock.Mocker() as m:
+        m.post(urljoin(hostname, "/v1/signatures"), json={"_id": "1"})
+        pyxis_ops.upload_signatures_mod(args)
+
+    breakdown = _read_breakdown(profile_path)
+    # auth of the session in each worker thread
+    assert 1 <= breakdown["categories"]["auth"]["count"] <= 2
+    assert breakdown["categories"]["network"]["count"] == 2
+    # input parsed and two responses decoded
+    assert breakdown["categories"]["serialization"]["count"] == 3
+    # requests sent by worker threads are in the dump
+    stats = pstats.Stats(profile_path).stats
+    requests_sent = [
+        calls[0]
+        for (path, _, name), calls in stats.items()
+        if path.endswith("pyxis_session.py") and name == "_request"
+    ]
+    assert requests_sent == [2]
+
+
+def test_profile_written_on_error(tmp_path, hostname):
+    profile_path = str(tmp_path / "delete.prof")
+    args = [
+        "dummy",
+        "--pyxis-server",
+        hostname,
+        "--pyxis-ssl-crtfile",
+        "/root/name.crt",
+        "--pyxis-ssl-keyfile",
+        "/root/name.key",
+        "--ids",
+        "g1g1g1g1",
+        "--profile",
+        profile_path,
+    ]
+
+    with requests_mock.Mocker() as m:
+        m.delete(urljoin(hostname, "/v1/signatures/id/g1g1g1g1"), status_code=400)
+        assert pyxis_ops.delete_signatures_main(args) == 1
+
+    assert _read_breakdown(profile_path)["categories"]["network"]["count"] == 1
+    assert profiling.active() is None
+
+
+def test_profiling_disabled():
+    assert profiling.enable(None) is None
+    assert profiling.active() is None
+    with profiling.session(), profiling.timed("network"):
+        pass
+    assert profiling.active() is None
+
+
+def test_profile_timed_and_unknown_spans(tmp_path):
+    profile = profiling.PyxisProfile(str(tmp_path / "p.prof"), import_time=0.5)
+    with profile.timed("serialization"):
+        pass
+    with profile.start_as_current_span("pyxis.page", {"pyxis.page": 1}):
+        pass
+
+    breakdown = profile.breakdown()
+    assert breakdown["import"] == 0.5
+    assert list(breakdown["categories"]) == ["serialization"]
+    assert breakdown["requests"] == []
+
+
+@pytest.mark.parametrize("imported", [True, False])
+def test_import_time(monkeypatch, imported):
+    monkeypatch.setattr(profiling, "_imported_at", None)
+    if imported:
+        profiling.mark_imported()
+    with profiling.session():
+        profile = profiling.enable("/dev/null")
+        profile.write = lambda: None
+        if imported:
+            assert profile.import_time > 0
+        else:
+            assert profile.import_time == 0
+        profile.stop()
+
+
+def test_thread_profilers_merged(tmp_path):
+    profile = profiling.PyxisProfile(str(tmp_path / "p.prof"))
+    profile.start()
+    thread = threading.Thread(target=json.dumps, args=([1],))
+    thread.start()
+    thread.join()
+    # a thread which didn't get to run anything profiled
+    profile.thread_profilers.append(cProfile.Profile())
+    profile.write()
+
+    assert len(profile.thread_profilers) == 2
+    functions = {name for _, _, name in pstats.Stats(profile.path).stats}
+    assert "dumps" in functions
+
+
+def test_profiling_imported_first():
+    # report whether requests is loaded when profiling starts to be imported
+    code = """
+import sys
+
+class Finder:
+    def find_spec(self, name, path, target=None):
+        if name == "pubtools._pyxis.profiling":
+            print(sorted({"requests", "urllib3"} & set(sys.modules)))
+
+sys.meta_path.insert(0, Finder())
+import pubtools._pyxis.pyxis_ops
+"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+
+    out = subprocess.check_output([sys.executable, "-c", code], env=env)
+
+    assert out.decode().strip() == "[]"
@@ -1,11 +1,16 @@
 import json
+import threading
+import time
 import mock
 
 import pytest
 import requests
 import requests_mock
 
-from pubtools._pyxis import pyxis_client, pyxis_authentication
+from pubtools._pyxis import pyxis_client, pyxis_authentication, records
+from pubtools._pyxis.deadline import DeadlineExceeded
+from pubtools._pyxis.rsql import SignatureFields
+from tests.pyxis_server import make_signature
 from tests.utils import load_data, urljoin
 
 # flake8: noqa: W503
@@ -21,7 +26,14 @@ def test_client_init(mock_session, hostname):
     client.pyxis_session
 
     mock_session.assert_called_once_with(
-        hostname, retries=5, backoff_factor=3, verify=True
+        hostname,
+        retries=5,
+        backoff_factor=3,
+        verify=True,
+        tracing=pyxis_client.NO_TRACING,
+        circuit_breakers=None,
+        timeout=(30.0, 300.0),
+        compression=None,
     )
 
 
@@ -186,16 +198,18 @@ def test_get_signatures_from_multiple_pages(hostname):
     manifest_to_search = (
         "sha256:dummy-manifest-digest-1, sha256:dummy-manifest-digest-2"
     )
+    # spaces around values are left out of the filter
+    manifests_filter = manifest_to_search.replace(", ", ",")
     with requests_mock.Mocker() as m:
         m.get(
             "{0}v1/signatures?filter=manifest_digest=in=({1})".format(
-                hostname, manifest_to_search
+                hostname, manifests_filter
             ),
             json=page_1_response,
         )
         m.get(
             "{0}v1/signatures?filter=manifest_digest=in=({1})&page=1".format(
-                hostname, manifest_to_search
+                hostname, manifests_filter
             ),
             json=page_2_response,
         )
@@ -205,6 +219,22 @@ def test_get_signatures_from_multiple_pages(hostname):
         assert res == page_1_response["data"] + page_2_response["data"]
 
 
+def test_get_signatures_as_records(pyxis_server, monkeypatch):
+    pyxis_server.populate_signatures(5, payload_size=8)
+    monkeypatch.setattr(pyxis_server, "default_page_size", 2)
+    digests = ",".join(
+        s["manifest_digest"] for s in pyxis_server.state.signatures.values()
+    )
+
+    my_client = pyxis_client.PyxisClient(pyxis_server.url, 5, None, 0, False)
+    res = my_client.get_container_signatures(digests, as_records=True)
+
+    assert all(isinstance(r, records.SignatureRecord) for r in res)
+    assert sorted(r.to_dict()["_id"] for r in res) == sorted(
+        pyxis_server.state.signatures
+    )
+
+
 def test_delete_container_signatures_success(hostname):
     ids = ["g1g1g1g1", "h2h2h2h2"]
 
@@ -287,6 +317,55 @@ def test_do_parallel_requests(hostname):
     _do_request.assert_has_calls([mock.call("a"), mock.call("b")], any_order=True)
 
 
+def test_do_parallel_requests_bounded_window(hostname):
+    lock = threading.Lock()
+    counts = {"taken": 0, "done": 0, "ahead": 0}
+
+    def _items():
+        for i in range(50):
+            with lock:
+                counts["taken"] += 1
+                counts["ahead"] = max(counts["ahead"], counts["taken"] - counts["done"])
+            yield i
+
+    def _do_request(seed):
+        time.sleep(0.001)
+        with lock:
+            counts["done"] += 1
+        return requests_mock.response.create_response(
+            requests.Request("GET", hostname), status_code=200, json={"foo": seed}
+        )
+
+    my_client = pyxis_client.PyxisClient(hostname, 5, None, 3, True, 2)
+    results = my_client._do_parallel_requests(_do_request, _items())
+
+    assert sorted(result["foo"] for result in results) == list(range(50))
+    # never more items than the window of 2 * threads taken but not finished
+    assert counts["ahead"] <= 4
+
+
+def test_do_parallel_requests_failed_items(hostname):
+    def _items():
+        yield "a"
+        raise ValueError("broken input")
+
+    my_client = pyxis_client.PyxisClient(hostname, 5, None, 3, True, 2)
+    _do_request = mock.Mock(
+        return_value=requests_mock.response.create_response(
+            requests.Request("GET", hostname), status_code=200, json={}
+        )
+    )
+
+    with pytest.raises(ValueError, match="broken input"):
+        my_client._do_parallel_requests(_do_request, _items())
+    _do_request.assert_called_once_with("a")
+
+    _do_request = mock.Mock(side_effect=[ValueError("broken request"), None])
+    with pytest.raises(ValueError, match="broken request"):
+        my_client._do_parallel_requests(_do_request, ["a", "b"], return_results=False)
+    assert _do_request.call_count == 2
+
+
 @mock.patch("pubtools._pyxis.pyxis_session.PyxisSession.post")
 def test_post_signatures_500_retry(mock_session_post, hostname):
     sig_data = [
@@ -323,3 +402,376 @@ def test_post_signatures_tolerate_409(mock_session_post, hostname):
     assert mock_session_post.call_count == 2
     assert len(res) == 2
     assert sig_data[0] in res and return_data in res
+
+
+def test_reuse_threads(hostname):
+    ids = ["g1g1g1g1", "h2h2h2h2"]
+
+    with requests_mock.Mocker() as m:
+        m.delete(urljoin(hostname, "/v1/signatures/id/g1g1g1g1"))
+        m.delete(urljoin(hostname, "/v1/signatures/id/h2h2h2h2"), status_code=404)
+
+        my_client = pyxis_client.PyxisClient(
+            hostname, 5, None, 3, True, reuse_threads=True
+        )
+        my_client.delete_container_signatures(ids)
+        executor = my_client._executor
+        my_client.delete_container_signatures(ids)
+        assert my_client._executor is executor
+        assert len(m.request_history) == 4
+
+    my_client.pyxis_session
+    my_client.close()
+    assert my_client._executor is None
+    assert not hasattr(my_client.thread_local, "pyxis_session")
+    my_client.close()
+
+
+def test_reuse_threads_error_waits_for_other_requests(hostname):
+    ids = ["g1g1g1g1", "h2h2h2h2", "i3i3i3i3"]
+
+    with requests_mock.Mocker() as m:
+        m.delete(urljoin(hostname, "/v1/signatures/id/g1g1g1g1"), status_code=400)
+        m.delete(urljoin(hostname, "/v1/signatures/id/h2h2h2h2"))
+        m.delete(urljoin(hostname, "/v1/signatures/id/i3i3i3i3"))
+
+        my_client = pyxis_client.PyxisClient(
+            hostname, 5, None, 3, True, 1, reuse_threads=True
+        )
+        with pytest.raises(requests.exceptions.HTTPError):
+            my_client.delete_container_signatures(ids)
+        assert len(m.request_history) == 3
+    my_client.close()
+
+
+def test_iter_signatures_updated_since(pyxis_server):
+    pyxis_server.populate_signatures(3, payload_size=8, digest_count=1)
+    old, new, newest = pyxis_server.state.signatures.values()
+    old["last_update_date"] = "2026-01-01T00:00:00+00:00"
+    new["last_update_date"] = "2026-01-02T00:00:00+00:00"
+    newest["last_update_date"] = "2026-01-03T00:00:00+00:00"
+
+    my_client = pyxis_client.PyxisClient(pyxis_server.url, 5, None, 0, False)
+    res = my_client.iter_container_signatures(
+        old["manifest_digest"],
+        newest["reference"],
+        updated_since="2026-01-02T00:00:00+00:00",
+        as_records=True,
+    )
+
+    assert [r._id for r in res] == [new["_id"], newest["_id"]]
+    _, _, query = pyxis_server.requests_matching("GET", "/v1/signatures")[0]
+    assert query["filter"] == [
+        "(manifest_digest=in=({0}),reference=in=({1}));"
+        "last_update_date=ge=2026-01-02T00:00:00+00:00".format(
+            old["manifest_digest"], newest["reference"]
+        )
+    ]
+
+
+def test_upload_signatures_without_results(pyxis_server, monkeypatch):
+    my_client = pyxis_client.PyxisClient(pyxis_server.url, 0, None, 0, False)
+    existing = make_signature(0, payload_size=8)
+    my_client.upload_signatures([existing])
+    pyxis_server.inject_error(400, method="POST", path="signatures")
+    decode = mock.Mock(side_effect=my_client._decode)
+    monkeypatch.setattr(my_client, "_decode", decode)
+
+    res = my_client.upload_signatures(
+        [make_signature(i, payload_size=8) for i in range(4)], return_results=False
+    )
+
+    assert res["succeeded"] == 3
+    (failure,) = res["failures"]
+    assert "signature_data" not in failure["item"]
+    assert failure["item"]["reference"] in [
+        make_signature(i, payload_size=8)["reference"] for i in range(4)
+    ]
+    assert "400 Client Error" in failure["error"]
+    # only the body of the failed response is parsed, for its details
+    assert decode.call_count == 1
+
+
+def test_delete_signatures_without_results(pyxis_server):
+    pyxis_server.populate_signatures(2, payload_size=8)
+    ids = list(pyxis_server.state.signatures)
+    my_client = pyxis_client.PyxisClient(pyxis_server.url, 0, None, 0, False)
+
+    res = my_client.delete_container_signatures(ids + ["gone"], return_results=False)
+
+    assert res == {"succeeded": 3, "failures": []}
+    assert not pyxis_server.state.signatures
+
+
+def test_without_results_deadline_raised(hostname):
+    my_client = pyxis_client.PyxisClient(hostname, 0, None, 0, True)
+    _do_request = mock.Mock(side_effect=DeadlineExceeded("late"))
+
+    with pytest.raises(DeadlineExceeded):
+        my_client._do_parallel_requests(_do_request, ["a"], return_results=False)
+
+
+def test_signatures_endpoint_fields(hostname):
+    my_client = pyxis_client.PyxisClient(hostname, 0, None, 0, True)
+
+    assert my_client._signatures_endpoint("d", None, include=["_id"]) == (
+        "signatures?filter=manifest_digest=in=(d)"
+        "&include=data._id,page,page_size,total"
+    )
+    assert my_client._signatures_endpoint(None, None, exclude=["signature_data"]) == (
+        "signatures?exclude=data.signature_data"
+    )
+
+
+def test_get_signatures_fields(pyxis_server, monkeypatch):
+    pyxis_server.populate_signatures(5, payload_size=64)
+    monkeypatch.setattr(pyxis_server, "default_page_size", 2)
+    my_client = pyxis_client.PyxisClient(pyxis_server.url, 0, None, 0, False)
+
+    res = my_client.get_container_signatures(include=["_id", "reference"])
+
+    assert sorted(r["_id"] for r in res) == sorted(pyxis_server.state.signatures)
+    assert all(set(r) == {"_id", "reference"} for r in res)
+
+    res = my_client.get_container_signatures(exclude=["signature_data"])
+    assert len(res) == 5
+    assert not any("signature_data" in r for r in res)
+
+    records = list(
+        my_client.iter_container_signatures(include=["_id"], as_records=True)
+    )
+    assert len(records) == 5
+    assert all(r.signature_data is None for r in records)
+
+
+def test_get_signatures_page_size(pyxis_server):
+    pyxis_server.populate_signatures(7, payload_size=8)
+    my_client = pyxis_client.PyxisClient(pyxis_server.url, 0, None, 0, False)
+
+    assert len(my_client.get_container_signatures(page_size=3)) == 7
+
+    queries = [query for _, _, query in pyxis_server.requests_matching("GET")]
+    assert [query["page_size"] for query in queries] == [["3"]] * 3
+    assert [query.get("page") for query in queries] == [None, ["1"], ["2"]]
+
+
+def test_pages_keep_request_kwargs(pyxis_server, monkeypatch):
+    pyxis_server.populate_signatures(5, payload_size=8)
+    monkeypatch.setattr(pyxis_server, "default_page_size", 2)
+    my_client = pyxis_client.PyxisClient(pyxis_server.url, 0, None, 0, False)
+
+    res = my_client._get_items_from_all_pages(
+        "signatures", params={"sort_by": "_id[desc]"}
+    )
+
+    assert [r["_id"] for r in res] == sorted(pyxis_server.state.signatures)[::-1]
+    queries = [query for _, _, query in pyxis_server.requests_matching("GET")]
+    assert all(query["sort_by"] == ["_id[desc]"] for query in queries)
+
+
+def test_get_signatures_auto_page_size(pyxis_server, monkeypatch):
+    pyxis_server.populate_signatures(100, payload_size=8)
+    monkeypatch.setattr(pyxis_server, "max_page_size", 40)
+    my_client = pyxis_client.PyxisClient(pyxis_server.url, 0, None, 0, False)
+
+    assert len(my_client.get_container_signatures(page_size="auto")) == 100
+
+    # 500, 250, 125, 62 rejected, 31 accepted for all 4 pages
+    queries = [query for _, _, query in pyxis_server.requests_matching("GET")]
+    assert [query["page_size"][0] for query in queries] == (
+        ["500", "250", "125", "62"] + ["31"] * 4
+    )
+    assert my_client.max_page_size == 31
+
+    pyxis_server.request_log.clear()
+    assert len(list(my_client.iter_container_signatures(page_size="auto"))) == 100
+    assert len(pyxis_server.requests_matching("GET")) == 4
+
+
+def test_auto_page_size_other_errors(pyxis_server):
+    my_client = pyxis_client.PyxisClient(pyxis_server.url, 0, None, 0, False)
+    pyxis_server.inject_error(400, method="GET")
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        my_client.get_container_signatures(page_size="auto")
+    assert len(pyxis_server.requests_matching("GET")) == 1
+    assert my_client.max_page_size == 500
+
+
+def test_cursor_pages_consistent_while_signatures_change(pyxis_server, monkeypatch):
+    pyxis_server.populate_signatures(10, payload_size=8)
+    monkeypatch.setattr(pyxis_server, "default_page_size", 3)
+    my_client = pyxis_client.PyxisClient(pyxis_server.url, 0, None, 0, False)
+
+    def _scan(**kwargs):
+        ids = sorted(pyxis_server.state.signatures)
+        scanned = []
+        for signature in my_client.iter_container_signatures(**kwargs):
+            scanned.append(signature["_id"])
+            if len(scanned) == 1:
+                # signatures removed from the first page shift later pages
+                pyxis_server.state.remove_signature(ids[1])
+                pyxis_server.state.remove_signature(ids[2])
+        return ids, scanned
+
+    ids, scanned = _scan()
+    assert ids[3] not in scanned
+
+    ids, scanned = _scan(cursor=True)
+    assert scanned == ids
+    queries = [query for _, _, query in pyxis_server.requests_matching("GET")][-3:]
+    assert all(query["sort_by"] == ["_id[asc]"] for query in queries)
+    assert "page" not in queries[-1]
+    assert queries[-1]["filter"] == ["_id=gt={0}".format(ids[5])]
+
+    assert len(my_client.get_container_signatures(cursor=True, page_size=4)) == 6
+    queries = [query for _, _, query in pyxis_server.requests_matching("GET")][-2:]
+    assert [query["page_size"] for query in queries] == [["4"], ["4"]]
+
+
+def test_cursor_parallel_ranges(pyxis_server, monkeypatch):
+    pyxis_server.populate_signatures(10, payload_size=8, digest_count=2)
+    monkeypatch.setattr(pyxis_server, "default_page_size", 2)
+    my_client = pyxis_client.PyxisClient(pyxis_server.url, 0, None, 0, False)
+    signatures = list(pyxis_server.state.signatures.values())
+    digest = signatures[0]["manifest_digest"]
+
+    res = my_client.get_container_signatures(
+        digest, include=["reference"], cursor=True, ranges=3, as_records=True
+    )
+
+    expected = [s["_id"] for s in signatures if s["manifest_digest"] == digest]
+    assert sorted(r._id for r in res) == sorted(expected)
+    filters = {
+        query["filter"][0]
+        for _, _, query in pyxis_server.requests_matching("GET")
+        if "_id" in query["filter"][0]
+    }
+    assert "manifest_digest=in=({0});_id=lt={1:024x}".format(digest, 4) in filters
+    assert all(
+        query["include"][0].startswith("data.reference,data._id,")
+        for _, _, query in pyxis_server.requests_matching("GET")
+    )
+
+    # one range without any _id to split
+    assert my_client.get_container_signatures("missing", cursor=True, ranges=3) == []
+
+
+def test_cursor_ranges_not_hexadecimal(pyxis_server):
+    for index in range(3):
+        record = make_signature(index, payload_size=8)
+        record["_id"] = "id-%d" % index
+        pyxis_server.state.add_signature(record)
+    my_client = pyxis_client.PyxisClient(pyxis_server.url, 0, None, 0, False)
+
+    res = my_client.get_container_signatures(cursor=True, ranges=2, page_size="auto")
+
+    assert [r["_id"] for r in res] == ["id-0", "id-1", "id-2"]
+    assert len(pyxis_server.requests_matching("GET")) == 3
+
+
+def test_cursor_ranges_error(pyxis_server, monkeypatch):
+    pyxis_server.populate_signatures(4, payload_size=8)
+    my_client = pyxis_client.PyxisClient(pyxis_server.url, 0, None, 0, False)
+    pyxis_server.inject_error(400, method="GET")
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        my_client.get_container_signatures(cursor=True, ranges=2)
+
+    # a failed range waits for the other one
+    ranges = my_client._id_ranges(lambda conditions: "signatures", 2)
+    monkeypatch.setattr(my_client, "_id_ranges", lambda *args: ranges)
+    pyxis_server.inject_error(400, count=1, method="GET")
+    with pytest.raises(requests.exceptions.HTTPError):
+        my_client.get_container_signatures(cursor=True, ranges=2)
+    assert len(pyxis_server.requests_matching("GET")) == 5
+
+
+def test_scan_signatures_by_digest(pyxis_server, monkeypatch):
+    pyxis_server.populate_signatures(20, payload_size=8)
+    monkeypatch.setattr(pyxis_server, "default_page_size", 2)
+    my_client = pyxis_client.PyxisClient(pyxis_server.url, 0, None, 0, False)
+
+    res = list(my_client.scan_signatures(shards=3))
+
+    assert sorted(s["_id"] for s in res) == sorted(pyxis_server.state.signatures)
+    filters = {
+        query["filter"][0].split(";_id")[0]
+        for _, _, query in pyxis_server.requests_matching("GET")
+    }
+    assert filters == {
+        "manifest_digest=lt=sha256:5",
+        "manifest_digest=ge=sha256:5;manifest_digest=lt=sha256:a",
+        "manifest_digest=ge=sha256:a",
+    }
+
+
+def test_scan_signatures_by_id(pyxis_server, monkeypatch):
+    pyxis_server.populate_signatures(12, payload_size=8)
+    monkeypatch.setattr(pyxis_server, "default_page_size", 2)
+    my_client = pyxis_client.PyxisClient(pyxis_server.url, 0, None, 0, False)
+    keys = ["%08X" % 1, "%08X" % 2]
+
+    res = list(
+        my_client.scan_signatures(
+            shards=2,
+            shard_by="id",
+            filter=SignatureFields.sig_key_id.in_(keys),
+            include=["reference"],
+            as_records=True,
+        )
+    )
+
+    expected = [
+        s["_id"]
+        for s in pyxis_server.state.signatures.values()
+        if s["sig_key_id"] in keys
+    ]
+    assert sorted(r._id for r in res) == sorted(expected)
+    assert all(r.reference and r.signature_data is None for r in res)
+
+
+def test_scan_signatures_invalid_args(pyxis_server):
+    my_client = pyxis_client.PyxisClient(pyxis_server.url, 0, None, 0, False)
+
+    with pytest.raises(ValueError, match="shard_by"):
+        list(my_client.scan_signatures(shard_by="repository"))
+    with pytest.raises(ValueError, match="shard"):
+        list(my_client.scan_signatures(shards=0))
+
+
+def test_scan_signatures_error(pyxis_server):
+    pyxis_server.populate_signatures(8, payload_size=8)
+    my_client = pyxis_client.PyxisClient(pyxis_server.url, 0, None, 0, False)
+    pyxis_server.inject_error(400, method="GET")
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        list(my_client.scan_signatures(shards=2))
+
+
+def test_scan_signatures_closed_early(pyxis_server, monkeypatch):
+    pyxis_server.populate_signatures(40, payload_size=8)
+    monkeypatch.setattr(pyxis_server, "default_page_size", 1)
+    my_client = pyxis_client.PyxisClient(pyxis_server.url, 0, None, 0, False)
+
+    scan = my_client.scan_signatures(shards=2)
+    assert next(scan)["_id"]
+    # let the workers fill the buffer and wait for the caller
+    time.sleep(0.5)
+    scan.close()
+
+    # two pages buffered per shard, one waiting per worker and the one taken
+    assert len(pyxis_server.requests_matching("GET")) <= 7
+
+
+def test_digest_shards():
+    shards = pyxis_client._digest_shards(20)
+
+    assert len(shards) == 20
+    assert [str(c) for c in shards[0]] == ["manifest_digest=lt=sha256:0c"]
+    assert [str(c) for c in shards[1]] == [
+        "manifest_digest=ge=sha256:0c",
+        "manifest_digest=lt=sha256:19",
+    ]
+    assert [str(c) for c in shards[-1]] == ["manifest_digest=ge=sha256:f3"]
+    assert pyxis_client._digest_shards(1) == [[]]
@@ -1,3 +1,4 @@
+import argparse
 import json
 
 import mock
@@ -6,6 +7,7 @@ import requests
 import requests_mock
 
 from pubtools._pyxis import pyxis_ops, utils
+from tests.pyxis_server import make_signature
 from tests.utils import load_data, load_response, urljoin
 
 
@@ -1010,3 +1012,176 @@ def test_delete_signatures_error(capsys, hostname):
 
     assert system_error.type == SystemExit
     assert system_error.value.code == 2
+
+
+def test_timeout_and_deadline_args(pyxis_server, capsys):
+    args = [
+        "dummy",
+        "--pyxis-server",
+        pyxis_server.url,
+        "--ocp-versions-range",
+        "4.6",
+        # certificate files have to exist, although plain HTTP doesn't use them
+        "--pyxis-ssl-crtfile",
+        __file__,
+        "--pyxis-ssl-keyfile",
+        __file__,
+    ]
+    pyxis_server.inject_delay(2, path="operators")
+
+    assert pyxis_ops.get_operator_indices_main(args + ["--pyxis-deadline", "0.3"]) == 1
+    _, err = capsys.readouterr()
+    assert "Deadline of the Pyxis operation exceeded" in err
+
+    client = pyxis_ops.create_pyxis_client(
+        pyxis_ops.set_get_operator_indices_args().parse_args(
+            args[1:] + ["--pyxis-timeout", "0.3"]
+        ),
+        "ccache",
+    )
+    assert client.deadline is None
+    assert client.pyxis_session.timeout == 0.3
+
+
+def test_quiet_results(pyxis_server, capsys):
+    args = [
+        "dummy",
+        "--pyxis-server",
+        pyxis_server.url,
+        "--pyxis-ssl-crtfile",
+        __file__,
+        "--pyxis-ssl-keyfile",
+        __file__,
+        "--quiet-results",
+    ]
+    signatures = [make_signature(i, payload_size=8) for i in range(3)]
+
+    retval = pyxis_ops.upload_signatures_main(
+        args + ["--signatures", json.dumps(signatures)]
+    )
+
+    assert retval == 0
+    out, _ = capsys.readouterr()
+    assert json.loads(out) == {"succeeded": 3, "failures": []}
+
+    ids = ",".join(pyxis_server.state.signatures)
+    pyxis_server.inject_error(400, method="DELETE")
+    retval = pyxis_ops.delete_signatures_main(args + ["--ids", ids])
+
+    assert retval == 1
+    out, _ = capsys.readouterr()
+    summary = json.loads(out)
+    assert summary["succeeded"] == 2
+    assert summary["failures"][0]["item"] in ids.split(",")
+
+    pyxis_server.inject_error(400, method="POST")
+    retval = pyxis_ops.upload_signatures_main(
+        args + ["--signatures", json.dumps(signatures[:1])]
+    )
+    assert retval == 1
+    out, _ = capsys.readouterr()
+    (failure,) = json.loads(out)["failures"]
+    assert failure["item"]["reference"] == signatures[0]["reference"]
+
+
+def test_get_signatures_fields(pyxis_server, capsys):
+    pyxis_server.populate_signatures(2, payload_size=8, digest_count=1)
+    digest = next(iter(pyxis_server.state.signatures.values()))["manifest_digest"]
+    args = [
+        "dummy",
+        "--pyxis-server",
+        pyxis_server.url,
+        "--pyxis-ssl-crtfile",
+        __file__,
+        "--pyxis-ssl-keyfile",
+        __file__,
+        "--manifest-digest",
+        digest,
+        "--fields",
+        "_id",
+    ]
+
+    assert pyxis_ops.get_signatures_main(args) == 0
+
+    out, _ = capsys.readouterr()
+    assert sorted(json.loads(out), key=lambda s: s["_id"]) == [
+        {"_id": signature_id} for signature_id in sorted(pyxis_server.state.signatures)
+    ]
+
+
+def test_page_size_arg(pyxis_server, capsys):
+    assert utils.page_size_arg("auto") == "auto"
+    assert utils.page_size_arg("250") == 250
+    for value in ["0", "-1", "many"]:
+        with pytest.raises(argparse.ArgumentTypeError, match="invalid page size"):
+            utils.page_size_arg(value)
+
+    pyxis_server.populate_signatures(3, payload_size=8, digest_count=1)
+    digest = next(iter(pyxis_server.state.signatures.values()))["manifest_digest"]
+    args = [
+        "dummy",
+        "--pyxis-server",
+        pyxis_server.url,
+        "--pyxis-ssl-crtfile",
+        __file__,
+        "--pyxis-ssl-keyfile",
+        __file__,
+        "--manifest-digest",
+        digest,
+        "--page-size",
+        "2",
+    ]
+
+    assert pyxis_ops.get_signatures_main(args) == 0
+
+    out, _ = capsys.readouterr()
+    assert len(json.loads(out)) == 3
+    queries = [query for _, _, query in pyxis_server.requests_matching("GET")]
+    assert [query["page_size"] for query in queries] == [["2"], ["2"]]
+
+
+def test_get_signatures_id_ranges(pyxis_server, capsys):
+    pyxis_server.populate_signatures(6, payload_size=8, digest_count=1)
+    digest = next(iter(pyxis_server.state.signatures.values()))["manifest_digest"]
+    args = [
+        "dummy",
+        "--pyxis-server",
+        pyxis_server.url,
+        "--pyxis-ssl-crtfile",
+        __file__,
+        "--pyxis-ssl-keyfile",
+        __file__,
+        "--manifest-digest",
+        digest,
+        "--id-ranges",
+        "2",
+    ]
+
+    assert pyxis_ops.get_signatures_main(args) == 0
+
+    out, _ = capsys.readouterr()
+    assert sorted(s["_id"] for s in json.loads(out)) == sorted(
+        pyxis_server.state.signatures
+    )
+    queries = [query for _, _, query in pyxis_server.requests_matching("GET")]
+    assert all(query["sort_by"][0].startswith("_id[") for query in queries)
+
+
+def test_get_signatures_filter(pyxis_server, capsys):
+    pyxis_server.populate_signatures(8, payload_size=8)
+    args = [
+        "dummy",
+        "--pyxis-server",
+        pyxis_server.url,
+        "--pyxis-ssl-crtfile",
+        __file__,
+        "--pyxis-ssl-keyfile",
+        __file__,
+        "--filter",
+        "sig_key_id=in=(00000000,00000002)",
+    ]
+
+    assert pyxis_ops.get_signatures_main(args) == 0
+
+    out, _ = capsys.readouterr()
+    assert [s["sig_key_id"] for s in json.loads(out)] == ["00000000", "00000002"] * 2
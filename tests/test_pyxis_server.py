@@ -0,0 +1,184 @@
+import time
+
+import pytest
+import requests
+
+from pubtools._pyxis import pyxis_client
+from tests.pyxis_server import (
+    PyxisServer,
+    RSQLError,
+    _parse_rsql,
+    _project,
+    make_signature,
+    rsql_match,
+)
+
+
+def _client(server, threads=4):
+    return pyxis_client.PyxisClient(server.url, 2, None, 0, False, threads)
+
+
+def test_upload_query_delete_roundtrip(pyxis_server):
+    client = _client(pyxis_server)
+    signatures = [make_signature(i, payload_size=16) for i in range(25)]
+
+    uploaded = client.upload_signatures(signatures)
+    assert len(uploaded) == 25
+    assert all("_id" in sig for sig in uploaded)
+
+    pyxis_server.default_page_size = 10
+    digests = ",".join(sig["manifest_digest"] for sig in signatures)
+    found = client.get_container_signatures(digests)
+    assert sorted(s["_id"] for s in found) == sorted(s["_id"] for s in uploaded)
+    # 25 records in pages of 10
+    assert len(pyxis_server.requests_matching("GET", "/v1/signatures")) == 3
+
+    client.delete_container_signatures([s["_id"] for s in uploaded])
+    assert pyxis_server.state.signatures == {}
+
+
+def test_upload_duplicate_conflict(pyxis_server):
+    client = _client(pyxis_server)
+    signature = make_signature(1)
+
+    client.upload_signatures([signature])
+    res = client.upload_signatures([signature])
+
+    assert res == [{"detail": "E11000 duplicate key error", "status": 409}]
+
+
+def test_delete_missing_tolerated(pyxis_server):
+    _client(pyxis_server).delete_container_signatures(["missing"])
+
+    assert pyxis_server.requests_matching("DELETE") == [
+        ("DELETE", "/v1/signatures/id/missing", {})
+    ]
+
+
+def test_injected_errors_are_retried(pyxis_server):
+    pyxis_server.populate_signatures(3)
+    pyxis_server.inject_error(500, count=1, method="GET")
+    pyxis_server.inject_error(429, count=1, method="GET")
+
+    res = _client(pyxis_server).get_container_signatures(
+        make_signature(0)["manifest_digest"]
+    )
+
+    assert len(res) == 1
+    assert len(pyxis_server.requests_matching("GET")) == 3
+
+
+def test_injected_error_rate(pyxis_server):
+    pyxis_server.error_rates = {500: 1.0}
+    with pytest.raises(requests.exceptions.RetryError):
+        _client(pyxis_server).get_operator_indices("4.6")
+
+
+def test_injected_error_not_found(pyxis_server):
+    pyxis_server.inject_error(404, path="operators")
+    with pytest.raises(requests.exceptions.HTTPError, match="404"):
+        _client(pyxis_server).get_operator_indices("4.6")
+
+
+def test_repository_and_indices(pyxis_server):
+    pyxis_server.state.repositories[("registry.connect.redhat.com", "ns/repo")] = {
+        "repository": "ns/repo"
+    }
+    pyxis_server.state.indices = [
+        {"path": "registry/index:4.6", "organization": "redhat"},
+        {"path": "registry/other:4.6", "organization": "other"},
+    ]
+    client = _client(pyxis_server)
+
+    assert client.get_repository_metadata("ns/repo") == {"repository": "ns/repo"}
+    assert client.get_operator_indices("4.6", "redhat") == [
+        {"path": "registry/index:4.6", "organization": "redhat"}
+    ]
+
+
+def test_latency(pyxis_server):
+    pyxis_server.latency = 0.05
+    start = time.monotonic()
+    _client(pyxis_server).get_operator_indices("4.6")
+    assert time.monotonic() - start >= 0.05
+
+
+def test_page_size_limit(pyxis_server):
+    pyxis_server.max_page_size = 5
+    resp = requests.get(pyxis_server.url + "v1/signatures", params={"page_size": 6})
+    assert resp.status_code == 400
+
+
+def test_project():
+    body = {"data": [{"_id": "1", "reference": "r"}], "page": 0, "total": 1}
+
+    assert _project(body, {}) is body
+    assert _project(body, {"include": ["data._id,total"]}) == {
+        "data": [{"_id": "1"}],
+        "total": 1,
+    }
+    assert _project(body, {"include": ["total"]}) == {"total": 1}
+    assert _project(body, {"exclude": ["data.reference,page"]}) == {
+        "data": [{"_id": "1"}],
+        "total": 1,
+    }
+
+
+def test_unknown_endpoint(pyxis_server):
+    assert requests.get(pyxis_server.url + "v2/signatures").status_code == 404
+    assert requests.get(pyxis_server.url + "v1/unknown").status_code == 404
+
+
+def test_standalone_server_context():
+    with PyxisServer(latency=0.01) as server:
+        assert requests.get(server.url + "v1/signatures").json()["total"] == 0
+
+
+@pytest.mark.parametrize(
+    "expression,expected",
+    [
+        ("a==1", True),
+        ("a!=1", False),
+        ("a=in=(1,2);b==x", True),
+        ("a=out=(1,2),b==y", False),
+        ("(a==2,b==x);c>5", True),
+        ("c=lt=5", False),
+        ("c>=7;c<=7", True),
+        ('b=="x"', True),
+        ("d==ab*", True),
+        ("d=like=bc", True),
+        ("e>1", False),
+    ],
+)
+def test_rsql_match(expression, expected):
+    record = {"a": "1", "b": "x", "c": "7", "d": "abc"}
+    assert rsql_match(_parse_rsql(expression), record) is expected
+
+
+@pytest.mark.parametrize("expression", ["a", "(a==1", "a=in=1", "a==1)"])
+def test_rsql_invalid(expression):
+    with pytest.raises(RSQLError):
+        _parse_rsql(expression)
+
+
+def test_graphql_errors(pyxis_server):
+    url = pyxis_server.url + "graphql/"
+
+    for query in ["{q0: find_signatures(page: $page) {total}}", "{a {b}} c", "{a"]:
+        resp = requests.post(url, json={"query": query})
+        assert resp.status_code == 400
+        assert resp.json()["data"] is None
+
+    resp = requests.post(url, json={"query": "{unknown {a}}"})
+    assert resp.status_code == 400
+    assert "Cannot query field 'unknown'" in resp.json()["errors"][0]["message"]
+
+    resp = requests.post(
+        url,
+        json={
+            "query": "query {s: find_signatures(filter: "
+            '{and: [{reference: {eq: "none"}}], sig_key_id: {in: []}}) '
+            "{data {_id} total}}"
+        },
+    )
+    assert resp.json() == {"data": {"s": {"data": [], "total": 0}}}
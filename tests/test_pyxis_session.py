@@ -1,6 +1,7 @@
 import mock
 
 from pubtools._pyxis import pyxis_session
+from pubtools._pyxis.constants import DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT
 from tests.utils import urljoin
 
 
@@ -37,22 +38,25 @@ def test_rest_methods(mock_session, hostname):
 
     my_session = pyxis_session.PyxisSession(hostname)
     my_session.get("items", params={"param1": "value1"})
-    mock_get.assert_called_once_with(hostname + "v1/items", params={"param1": "value1"})
+    timeout = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
+    mock_get.assert_called_once_with(
+        hostname + "v1/items", params={"param1": "value1"}, timeout=timeout
+    )
 
     my_session = pyxis_session.PyxisSession(hostname)
     my_session.post("add-item", data={"param2": "value2"})
     mock_post.assert_called_once_with(
-        urljoin(hostname, "v1/add-item"), data={"param2": "value2"}
+        urljoin(hostname, "v1/add-item"), data={"param2": "value2"}, timeout=timeout
     )
 
     my_session = pyxis_session.PyxisSession(hostname)
     my_session.put("edit-item", data={"param3": "value3"})
     mock_put.assert_called_once_with(
-        urljoin(hostname, "v1/edit-item"), data={"param3": "value3"}
+        urljoin(hostname, "v1/edit-item"), data={"param3": "value3"}, timeout=timeout
     )
 
     my_session = pyxis_session.PyxisSession(hostname)
     my_session.delete("rm-item", params={"param4": "value4"})
     mock_delete.assert_called_once_with(
-        urljoin(hostname, "v1/rm-item"), params={"param4": "value4"}
+        urljoin(hostname, "v1/rm-item"), params={"param4": "value4"}, timeout=timeout
     )
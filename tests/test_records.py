@@ -0,0 +1,64 @@
+import base64
+import sys
+
+import pytest
+
+from pubtools._pyxis.records import SignatureRecord
+from tests.pyxis_server import make_signature
+
+
+def _metadata(index):
+    signature = make_signature(index, digest_count=1)
+    signature["signature_data"] = base64.b64encode(b"signature-%d" % index).decode()
+    signature.update(_id="id-%d" % index, creation_date="2026-01-01T00:00:00")
+    return signature
+
+
+def test_from_dict():
+    metadata = _metadata(1)
+    record = SignatureRecord.from_dict(metadata)
+
+    expected = dict(metadata)
+    del expected["creation_date"]
+    assert record.to_dict() == expected
+    assert record.signature == b"signature-1"
+    assert repr(record) == (
+        "SignatureRecord(_id='id-1', manifest_digest=%r, reference=%r)"
+        % (metadata["manifest_digest"], metadata["reference"])
+    )
+
+
+def test_missing_fields():
+    record = SignatureRecord.from_dict({"_id": "a"})
+    assert record.signature is None
+    assert record.to_dict() == {
+        "_id": "a",
+        "manifest_digest": None,
+        "reference": None,
+        "sig_key_id": None,
+        "repository": None,
+        "signature_data": None,
+    }
+
+
+def test_compact():
+    first = SignatureRecord.from_dict(_metadata(1))
+    second = SignatureRecord.from_dict(_metadata(5))
+
+    assert not hasattr(first, "__dict__")
+    with pytest.raises(AttributeError):
+        first.creation_date = "2026-01-01"
+    # repeated strings are shared
+    assert first.manifest_digest is second.manifest_digest
+    assert first.repository is not second.repository
+    assert sys.getsizeof(first) < sys.getsizeof(_metadata(1))
+
+
+def test_equality():
+    assert SignatureRecord.from_dict(_metadata(1)) == SignatureRecord.from_dict(
+        _metadata(1)
+    )
+    assert SignatureRecord.from_dict(_metadata(1)) != SignatureRecord.from_dict(
+        _metadata(2)
+    )
+    assert SignatureRecord.from_dict(_metadata(1)) != _metadata(1)
@@ -0,0 +1,165 @@
+import time
+
+import mock
+import pytest
+import requests
+import requests_mock
+
+from pubtools._pyxis import deadline, pyxis_client, pyxis_ops
+from pubtools._pyxis.circuit_breaker import CircuitOpenError
+from pubtools._pyxis.retry_scheduler import DelayedQueue, RetryScheduler, ScheduledRetry
+
+
+def _response(status, headers=None):
+    return requests_mock.response.create_response(
+        requests.Request("DELETE", "https://pyxis.localhost"),
+        status_code=status,
+        json={},
+        headers=headers or {},
+    )
+
+
+def test_should_retry():
+    scheduler = RetryScheduler(retries=2)
+
+    assert scheduler.should_retry(1, response=_response(503))
+    assert scheduler.should_retry(2, response=_response(429))
+    assert not scheduler.should_retry(3, response=_response(503))
+    assert not scheduler.should_retry(1, response=_response(404))
+    assert scheduler.should_retry(1, error=requests.exceptions.ConnectionError())
+    assert not scheduler.should_retry(1, error=deadline.DeadlineExceeded())
+    assert not scheduler.should_retry(1, error=CircuitOpenError("signatures"))
+    assert not scheduler.should_retry(1, error=ValueError())
+
+
+def test_delay():
+    scheduler = RetryScheduler(backoff_factor=2, max_backoff=10)
+
+    assert scheduler.delay(1) == 0
+    assert scheduler.delay(2) == 4
+    assert scheduler.delay(3) == 8
+    assert scheduler.delay(4) == 10
+    assert scheduler.delay(1, _response(429, {"Retry-After": "3"})) == 3
+    assert scheduler.delay(3, _response(503)) == 8
+    with deadline.until(deadline.expiry(1)):
+        assert scheduler.delay(4) <= 1
+
+
+def test_delayed_queue():
+    queue = DelayedQueue()
+    assert queue.wait_time() is None
+
+    queue.push(ScheduledRetry("late", 2, 10))
+    queue.push(ScheduledRetry("b", 2, 0))
+    queue.push(ScheduledRetry("a", 2, 0))
+
+    assert len(queue) == 3
+    assert queue.wait_time() == 0
+    assert [retry.data for retry in queue.pop_due(1)] == ["b"]
+    assert [retry.data for retry in queue.pop_due(5)] == ["a"]
+    assert len(queue) == 1
+    assert 9 < queue.wait_time() <= 10
+    assert list(queue.pop_due(5)) == []
+
+
+def test_client_retries_without_blocking_workers(pyxis_server):
+    my_client = pyxis_client.PyxisClient(
+        pyxis_server.url, 3, None, 0.25, False, 2, schedule_retries=True
+    )
+    pyxis_server.inject_error(503, count=2, method="DELETE", path="id/a1")
+
+    results = my_client.delete_container_signatures(["a1", "b2", "c3", "d4", "e5"])
+
+    assert len(results) == 5
+    paths = [path for _, path, _ in pyxis_server.requests_matching("DELETE")]
+    attempts = [i for i, path in enumerate(paths) if path.endswith("id/a1")]
+    # the second retry waits for its backoff, healthy items don't
+    assert len(attempts) == 3
+    assert attempts[-1] == len(paths) - 1
+
+
+def test_client_retries_exhausted(pyxis_server):
+    my_client = pyxis_client.PyxisClient(
+        pyxis_server.url, 1, None, 0, False, 2, schedule_retries=True
+    )
+    pyxis_server.inject_error(503, count=5, method="DELETE", path="id/a1")
+
+    with pytest.raises(requests.exceptions.HTTPError, match="503"):
+        my_client.delete_container_signatures(["a1", "b2"])
+    assert len(pyxis_server.requests_matching("DELETE", "id/a1")) == 2
+    assert len(pyxis_server.requests_matching("DELETE", "id/b2")) == 1
+
+
+def test_client_retries_connection_errors(hostname):
+    my_client = pyxis_client.PyxisClient(
+        hostname, 2, None, 0, True, 1, schedule_retries=True
+    )
+    _do_request = mock.Mock(
+        side_effect=[requests.exceptions.ConnectionError("reset"), _response(200)]
+    )
+
+    assert my_client._do_parallel_requests(_do_request, ["a"]) == [{}]
+    assert _do_request.call_count == 2
+
+    _do_request = mock.Mock(side_effect=deadline.DeadlineExceeded("late"))
+    with pytest.raises(deadline.DeadlineExceeded):
+        my_client._do_parallel_requests(_do_request, ["a"])
+
+
+def test_client_waits_for_scheduled_retries(hostname, monkeypatch):
+    my_client = pyxis_client.PyxisClient(
+        hostname, 2, None, 0, True, 1, schedule_retries=True
+    )
+    monkeypatch.setattr(my_client.retry_scheduler, "delay", lambda *args: 0.2)
+    _do_request = mock.Mock(side_effect=[_response(503), _response(200)])
+
+    start = time.monotonic()
+    assert my_client._do_parallel_requests(_do_request, ["a"]) == [{}]
+    assert time.monotonic() - start >= 0.2
+
+
+def test_client_closes_retried_responses(hostname):
+    my_client = pyxis_client.PyxisClient(
+        hostname, 2, None, 0, True, 1, schedule_retries=True
+    )
+    failed = _response(503, {"Retry-After": "0"})
+    _do_request = mock.Mock(side_effect=[failed, _response(200)])
+
+    with mock.patch.object(failed, "close", wraps=failed.close) as close:
+        results = my_client._do_parallel_requests(
+            _do_request, ["a"], return_results=False
+        )
+
+    assert results == {"succeeded": 1, "failures": []}
+    # the connection of the unread response is released before the retry
+    close.assert_called_once_with()
+
+
+def test_worker_sessions_without_retries(hostname):
+    my_client = pyxis_client.PyxisClient(hostname, 4, None, 0, True)
+    assert my_client.pyxis_session.session.get_adapter(hostname).max_retries.total == 4
+
+    my_client.thread_local.scheduled_retries = True
+    my_client._clear_session()
+    assert my_client.pyxis_session.session.get_adapter(hostname).max_retries.total == 0
+
+
+def test_schedule_retries_arg(hostname):
+    args = pyxis_ops.set_delete_signatures_args().parse_args(
+        [
+            "--pyxis-server",
+            hostname,
+            "--pyxis-ssl-crtfile",
+            __file__,
+            "--pyxis-ssl-keyfile",
+            __file__,
+            "--ids",
+            "a",
+            "--schedule-retries",
+        ]
+    )
+
+    client = pyxis_ops.create_pyxis_client(args, "ccache")
+
+    assert client.retry_scheduler is not None
+    assert client.retry_scheduler.retries == 5
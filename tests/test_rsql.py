@@ -0,0 +1,133 @@
+import datetime
+
+import pytest
+
+from pubtools._pyxis import pyxis_client
+from pubtools._pyxis.rsql import And, Field, Or, Raw, SignatureFields, as_expression
+
+S = SignatureFields
+
+
+def test_operators():
+    field = Field("a.b")
+    assert [
+        str(expression)
+        for expression in (
+            field.eq("x*"),
+            field.ne(1),
+            field.gt(1.5),
+            field.ge(True),
+            field.lt(datetime.datetime(2024, 1, 2, 3, 4, 5)),
+            field.le("z"),
+            field.in_(["x", "y", "x"]),
+            field.out(["x"]),
+            field.like("part"),
+        )
+    ] == [
+        "a.b==x*",
+        "a.b!=1",
+        "a.b=gt=1.5",
+        "a.b=ge=true",
+        "a.b=lt=2024-01-02T03:04:05",
+        "a.b=le=z",
+        "a.b=in=(x,y)",
+        "a.b=out=(x)",
+        "a.b=like=part",
+    ]
+
+
+@pytest.mark.parametrize(
+    "value, rendered",
+    [
+        ("registry.io/ns/repo:tag", "registry.io/ns/repo:tag"),
+        ("two words", '"two words"'),
+        ('a"b\\c', '"a\\"b\\\\c"'),
+        ("a,b", '"a,b"'),
+        ("", '""'),
+    ],
+)
+def test_quoted_values(value, rendered):
+    assert str(S.reference.eq(value)) == "reference==" + rendered
+
+
+def test_compaction():
+    references = S.reference.in_(["r1", "r2"]) | S.reference.eq("r3")
+    others = S.reference.eq("r1") | S.manifest_digest.eq("d1")
+    expression = (references | others) & (
+        S.sig_key_id.ne("k1") & S.sig_key_id.ne("k2") & S.id.gt("a")
+    )
+
+    assert str(expression) == (
+        "(reference=in=(r1,r2,r3),manifest_digest==d1);sig_key_id=out=(k1,k2);_id=gt=a"
+    )
+    # the expression is compacted only when rendered
+    assert expression.render() == (
+        "(reference=in=(r1,r2),reference==r3,reference==r1,manifest_digest==d1);"
+        "sig_key_id!=k1;sig_key_id!=k2;_id=gt=a"
+    )
+
+
+def test_compaction_keeps_wildcards_and_duplicates_once():
+    expression = Or(
+        S.reference.eq("ns/*"), S.reference.eq("r1"), S.reference.eq("ns/*")
+    ) & And(S.id.gt("a"), S.id.gt("a"), Or(), And())
+
+    assert str(expression) == "(reference==ns/*,reference==r1);_id=gt=a"
+    assert str(And(S.sig_key_id.ne("k*"), S.sig_key_id.ne("k1"))) == (
+        "sig_key_id!=k*;sig_key_id!=k1"
+    )
+    assert str(And(Or())) == ""
+
+
+def test_raw_expressions():
+    assert as_expression("a==1") is not as_expression(S.id.eq("x"))
+    assert str(as_expression("a==1,b==2") & S.id.eq("x")) == "(a==1,b==2);_id==x"
+    assert str(Raw("a==1;b==2") | S.id.eq("x")) == "a==1;b==2,_id==x"
+    assert str(Raw("a==1") & Raw("a==1") | Raw("b==1")) == "a==1,b==1"
+
+
+def test_client_filters_on_server(pyxis_server, monkeypatch):
+    pyxis_server.populate_signatures(12, payload_size=8, digest_count=3)
+    monkeypatch.setattr(pyxis_server, "default_page_size", 2)
+    signatures = list(pyxis_server.state.signatures.values())
+    digests = ",".join({s["manifest_digest"] for s in signatures[:2]})
+    # a GraphQL client queries filtered signatures with REST
+    my_client = pyxis_client.PyxisClient(
+        pyxis_server.url, 0, None, 0, False, graphql_url=pyxis_server.url + "graphql/"
+    )
+
+    res = my_client.get_container_signatures(
+        digests, filter=S.sig_key_id.in_(["00000000", "00000001"])
+    )
+
+    key_ids = ("00000000", "00000001")
+    expected = [
+        s["_id"]
+        for s in signatures
+        if s["sig_key_id"] in key_ids and s["manifest_digest"] in digests
+    ]
+    assert sorted(r["_id"] for r in res) == sorted(expected)
+    assert pyxis_server.requests_matching("POST") == []
+
+    cursor_ids = [
+        s["_id"]
+        for s in my_client.iter_container_signatures(
+            filter="sig_key_id==00000003", cursor=True
+        )
+    ]
+    assert cursor_ids == [s["_id"] for s in signatures if s["sig_key_id"] == "00000003"]
+    assert pyxis_server.request_log[-1][2]["filter"] == [
+        "_id=gt={0};sig_key_id==00000003".format(cursor_ids[-2])
+    ]
+
+
+def test_client_quotes_filter_in_url(pyxis_server):
+    my_client = pyxis_client.PyxisClient(pyxis_server.url, 0, None, 0, False)
+
+    my_client.get_container_signatures(
+        " d1 ,d2", filter=S.creation_date.gt("2024-01-01T00:00:00+00:00")
+    )
+
+    assert pyxis_server.request_log[-1][2]["filter"] == [
+        "manifest_digest=in=(d1,d2);creation_date=gt=2024-01-01T00:00:00+00:00"
+    ]
@@ -0,0 +1,109 @@
+import pytest
+
+from pubtools._pyxis import pyxis_client
+from pubtools._pyxis.records import SignatureRecord
+from pubtools._pyxis.signature_index import SignatureIndex
+from tests.pyxis_server import make_signature
+
+
+def _signatures(indices, digest_count=3):
+    signatures = []
+    for index in indices:
+        signature = make_signature(index, payload_size=4, digest_count=digest_count)
+        signature["_id"] = "id-%d" % index
+        signatures.append(signature)
+    return signatures
+
+
+def test_lookups():
+    signatures = _signatures(range(8))
+    index = SignatureIndex(signatures)
+
+    assert len(index) == 8
+    assert [r.to_dict() for r in index] == signatures
+    assert [r._id for r in index.by_digest(signatures[0]["manifest_digest"])] == [
+        "id-0",
+        "id-3",
+        "id-6",
+    ]
+    assert [r._id for r in index.by_reference(signatures[1]["reference"])] == ["id-1"]
+    assert [r._id for r in index.by_key("00000002")] == ["id-2", "id-6"]
+    assert [r._id for r in index.by_repository("namespace/repo-5")] == ["id-5"]
+    assert [r._id for r in index.lookup("_id", "id-7")] == ["id-7"]
+    assert index.by_key("unknown") == []
+
+
+def test_strings_interned():
+    index = SignatureIndex(_signatures(range(6)))
+    first, second = index.by_digest(index.record(0).manifest_digest)
+    assert first.manifest_digest is second.manifest_digest
+
+
+def test_distinct_and_missing():
+    signatures = _signatures(range(8))
+    index = SignatureIndex(signatures)
+    digests = [s["manifest_digest"] for s in signatures]
+
+    assert index.distinct("manifest_digest") == set(digests)
+    assert index.distinct("signature_data") == {"xxxx"}
+    # which digests have a signature by a key
+    assert index.distinct("manifest_digest", sig_key_id="00000001") == {
+        digests[1],
+        digests[5],
+    }
+    assert index.distinct("_id", sig_key_id="00000001", manifest_digest=digests[1]) == {
+        "id-1"
+    }
+    assert index.distinct("_id", sig_key_id="unknown") == set()
+    # which references lack signatures
+    assert index.missing(
+        "reference", [signatures[0]["reference"], "registry/unsigned:1"]
+    ) == {"registry/unsigned:1"}
+
+
+def test_not_indexed_field():
+    with pytest.raises(ValueError, match="'signature_data' is not indexed"):
+        SignatureIndex().lookup("signature_data", "x")
+
+
+def test_duplicates_and_contains():
+    signatures = _signatures(range(3))
+    index = SignatureIndex(signatures)
+
+    assert not index.add(dict(signatures[0], _id="other-id"))
+    assert index.add(SignatureRecord.from_dict(_signatures([3])[0]))
+    assert len(index) == 4
+    assert signatures[1] in index
+    assert SignatureRecord.from_dict(signatures[2]) in index
+    assert _signatures([4])[0] not in index
+    assert "id-1" not in index
+
+
+def test_set_operations():
+    left = SignatureIndex(_signatures(range(0, 6)))
+    right = SignatureIndex(_signatures(range(4, 8)))
+
+    assert sorted(r._id for r in left | right) == ["id-%d" % i for i in range(8)]
+    assert sorted(r._id for r in left & right) == ["id-4", "id-5"]
+    assert sorted(r._id for r in left - right) == ["id-%d" % i for i in range(4)]
+    assert len(right - left) == 2
+
+
+def test_built_from_paginated_stream(pyxis_server, monkeypatch):
+    pyxis_server.populate_signatures(7, payload_size=8, digest_count=2)
+    monkeypatch.setattr(pyxis_server, "default_page_size", 3)
+    digests = ",".join(
+        sorted({s["manifest_digest"] for s in pyxis_server.state.signatures.values()})
+    )
+
+    my_client = pyxis_client.PyxisClient(pyxis_server.url, 5, None, 0, False)
+    stream = my_client.iter_container_signatures(digests)
+    first = next(stream)
+    # only the first page was fetched so far
+    assert len(pyxis_server.requests_matching("GET", "/v1/signatures")) == 1
+    index = SignatureIndex(stream)
+    index.add(first)
+
+    assert len(index) == 7
+    assert len(pyxis_server.requests_matching("GET", "/v1/signatures")) == 3
+    assert sorted(index.distinct("_id")) == sorted(pyxis_server.state.signatures)
@@ -0,0 +1,117 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pubtools._pyxis import pyxis_client
+from pubtools._pyxis.singleflight import SingleFlight
+
+
+def _run_concurrently(count, fn):
+    barrier = threading.Barrier(count)
+
+    def _call():
+        barrier.wait()
+        return fn()
+
+    with ThreadPoolExecutor(count) as executor:
+        futures = [executor.submit(_call) for _ in range(count)]
+    return futures
+
+
+def test_concurrent_calls_coalesced():
+    single_flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def _slow(value):
+        calls.append(value)
+        release.wait(5)
+        return [value]
+
+    def _call():
+        return single_flight.do("key", _slow, "value")
+
+    threading.Timer(0.2, release.set).start()
+    futures = _run_concurrently(4, _call)
+
+    assert calls == ["value"]
+    results = [f.result() for f in futures]
+    assert results == [["value"]] * 4
+    # every caller gets its own copy of the parsed result
+    assert len({id(r) for r in results}) == 4
+    # finished calls are not cached
+    assert single_flight.do("key", lambda: "again") == "again"
+
+
+def test_exception_shared():
+    single_flight = SingleFlight()
+    release = threading.Event()
+
+    def _fail():
+        release.wait(5)
+        raise ValueError("failed")
+
+    threading.Timer(0.2, release.set).start()
+    futures = _run_concurrently(3, lambda: single_flight.do("key", _fail))
+
+    for future in futures:
+        with pytest.raises(ValueError, match="failed"):
+            future.result()
+    assert single_flight._calls == {}
+
+
+def test_client_identical_queries_coalesced(pyxis_server):
+    pyxis_server.populate_signatures(2, payload_size=8)
+    digest = next(iter(pyxis_server.state.signatures.values()))["manifest_digest"]
+    pyxis_server.latency = 0.3
+    my_client = pyxis_client.PyxisClient(pyxis_server.url, 5, None, 0, False)
+
+    futures = _run_concurrently(
+        4, lambda: my_client.get_container_signatures(digest, None)
+    )
+
+    assert [len(f.result()) for f in futures] == [1] * 4
+    assert len(pyxis_server.requests_matching("GET", "/v1/signatures")) == 1
+    # a caller modifying its result doesn't affect the others
+    futures[0].result()[0]["reference"] = "changed"
+    assert all(f.result()[0]["reference"] != "changed" for f in futures[1:])
+
+
+def test_client_different_queries_not_coalesced(pyxis_server):
+    pyxis_server.latency = 0.2
+    my_client = pyxis_client.PyxisClient(pyxis_server.url, 5, None, 0, False)
+    references = iter(["r1", "r2", "r3"])
+    lock = threading.Lock()
+
+    def _query():
+        with lock:
+            reference = next(references)
+        return my_client.get_container_signatures(None, reference)
+
+    _run_concurrently(3, _query)
+
+    assert len(pyxis_server.requests_matching("GET", "/v1/signatures")) == 3
+
+
+def test_client_coalescing_disabled(pyxis_server):
+    pyxis_server.latency = 0.2
+    pyxis_server.state.indices = [{"path": "index:4.6"}]
+    my_client = pyxis_client.PyxisClient(
+        pyxis_server.url, 5, None, 0, False, coalesce_requests=False
+    )
+
+    futures = _run_concurrently(3, lambda: my_client.get_operator_indices("4.6"))
+
+    assert [f.result() for f in futures] == [[{"path": "index:4.6"}]] * 3
+    assert len(pyxis_server.requests_matching("GET", "/v1/operators")) == 3
+
+
+def test_client_unhashable_arguments_not_coalesced(pyxis_server):
+    pyxis_server.state.repositories[("registry.access.redhat.com", "ns/repo")] = {
+        "name": "ns/repo"
+    }
+    my_client = pyxis_client.PyxisClient(pyxis_server.url, 5, None, 0, False)
+    assert my_client.get_repository_metadata(
+        "ns/repo", custom_registry=None, only_internal=[]
+    ) == {"name": "ns/repo"}
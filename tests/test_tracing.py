@@ -0,0 +1,170 @@
+import json
+
+import pytest
+import requests_mock
+from opentelemetry import propagate
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+
+from pubtools._pyxis import pyxis_client, pyxis_session, tracing
+from tests.utils import load_data, urljoin
+
+
+@pytest.fixture
+def exporter():
+    return InMemorySpanExporter()
+
+
+@pytest.fixture
+def pyxis_tracing(exporter):
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    return tracing.PyxisTracing(provider.get_tracer("test"), propagate.inject)
+
+
+def test_disabled_tracing_is_noop():
+    assert not tracing.NO_TRACING.enabled
+    with tracing.NO_TRACING.span("anything", attr=1) as span:
+        span.set_attribute("key", "value")
+    assert tracing.NO_TRACING.inject_headers(None) == {}
+    assert tracing.NO_TRACING.inject_headers({"a": "b"}) == {"a": "b"}
+
+
+def test_from_opentelemetry():
+    my_tracing = tracing.PyxisTracing.from_opentelemetry()
+    assert my_tracing.enabled
+    assert my_tracing.inject is propagate.inject
+
+
+def test_session_request_span(hostname, pyxis_tracing, exporter):
+    my_session = pyxis_session.PyxisSession(hostname, tracing=pyxis_tracing)
+
+    with requests_mock.Mocker() as m:
+        m.get(urljoin(hostname, "v1/items"), json={})
+        my_session.get("items", params={"page": 1})
+
+    (span,) = exporter.get_finished_spans()
+    assert span.name == "pyxis.http"
+    assert span.attributes["http.method"] == "GET"
+    assert span.attributes["http.url"] == urljoin(hostname, "v1/items")
+    assert span.attributes["http.params"] == "{'page': 1}"
+    assert span.attributes["http.status_code"] == 200
+    # trace context of the request span is propagated to the server
+    traceparent = m.request_history[0].headers["traceparent"]
+    assert "{0:032x}".format(span.context.trace_id) in traceparent
+
+
+def test_client_operation_spans(hostname, pyxis_tracing, exporter):
+    page_1_response = json.loads(load_data("signatures_page1"))
+    page_2_response = json.loads(load_data("signatures_page2"))
+    digest = "sha256:dummy-manifest-digest-1"
+
+    with requests_mock.Mocker() as m:
+        m.get(
+            "{0}v1/signatures?filter=manifest_digest=in=({1})".format(hostname, digest),
+            json=page_1_response,
+        )
+        m.get(
+            "{0}v1/signatures?filter=manifest_digest=in=({1})&page=1".format(
+                hostname, digest
+            ),
+            json=page_2_response,
+        )
+
+        my_client = pyxis_client.PyxisClient(
+            hostname, 5, None, 3, True, tracing=pyxis_tracing
+        )
+        my_client.get_container_signatures(digest)
+
+    spans = {span.name: span for span in exporter.get_finished_spans()}
+    assert sorted(spans) == [
+        "pyxis.decode",
+        "pyxis.get_container_signatures",
+        "pyxis.http",
+        "pyxis.page",
+    ]
+    operation = spans["pyxis.get_container_signatures"]
+    assert spans["pyxis.page"].parent.span_id == operation.context.span_id
+    assert spans["pyxis.page"].attributes["pyxis.page"] == 1
+
+
+def test_parallel_request_spans(hostname, pyxis_tracing, exporter):
+    ids = ["g1g1g1g1", "h2h2h2h2"]
+
+    with requests_mock.Mocker() as m:
+        m.delete(urljoin(hostname, "/v1/signatures/id/g1g1g1g1"))
+        m.delete(urljoin(hostname, "/v1/signatures/id/h2h2h2h2"))
+
+        my_client = pyxis_client.PyxisClient(
+            hostname, 5, None, 3, True, tracing=pyxis_tracing
+        )
+        my_client.delete_container_signatures(ids)
+
+    spans = exporter.get_finished_spans()
+    (operation,) = [s for s in spans if s.name == "pyxis.delete_container_signatures"]
+    items = [s for s in spans if s.name == "pyxis.request_item"]
+    requests = [s for s in spans if s.name == "pyxis.http"]
+
+    assert sorted(s.attributes["pyxis.item"] for s in items) == ids
+    # spans created in worker threads are children of the operation span
+    assert all(s.parent.span_id == operation.context.span_id for s in items)
+    item_span_ids = set(s.context.span_id for s in items)
+    assert all(s.parent.span_id in item_span_ids for s in requests)
+
+
+def test_parallel_request_spans_non_str_item(hostname, pyxis_tracing, exporter):
+    with requests_mock.Mocker() as m:
+        m.post(urljoin(hostname, "/v1/signatures"), json={"_id": "1"})
+
+        my_client = pyxis_client.PyxisClient(
+            hostname, 5, None, 3, True, tracing=pyxis_tracing
+        )
+        res = my_client.upload_signatures([{"foo": "bar"}])
+
+    assert res == [{"_id": "1"}]
+    (item,) = [
+        s for s in exporter.get_finished_spans() if s.name == "pyxis.request_item"
+    ]
+    assert "pyxis.item" not in item.attributes
+
+
+def test_parallel_request_spans_scheduled_retries(hostname, pyxis_tracing, exporter):
+    with requests_mock.Mocker() as m:
+        m.delete(
+            urljoin(hostname, "/v1/signatures/id/g1g1g1g1"),
+            [{"status_code": 503}, {"status_code": 200, "json": {}}],
+        )
+
+        my_client = pyxis_client.PyxisClient(
+            hostname, 5, None, 0, True, tracing=pyxis_tracing, schedule_retries=True
+        )
+        my_client.delete_container_signatures(["g1g1g1g1"])
+
+    items = [s for s in exporter.get_finished_spans() if s.name == "pyxis.request_item"]
+    assert [s.attributes.get("pyxis.attempt") for s in items] == [None, 2]
+
+
+def test_parallel_request_spans_record_retries(pyxis_server, pyxis_tracing, exporter):
+    pyxis_server.populate_signatures(2)
+    ids = sorted(pyxis_server.state.signatures)
+    pyxis_server.inject_error(503, count=2, method="DELETE", path=ids[1])
+
+    my_client = pyxis_client.PyxisClient(
+        pyxis_server.url, 5, None, 0, False, tracing=pyxis_tracing
+    )
+    my_client.delete_container_signatures(ids)
+
+    spans = exporter.get_finished_spans()
+    items = {s.context.span_id: s for s in spans if s.name == "pyxis.request_item"}
+    retried = {
+        items[s.parent.span_id].attributes["pyxis.item"]: s.attributes
+        for s in spans
+        if s.name == "pyxis.http"
+    }
+    # the retried signature can be found in the trace
+    assert retried[ids[1]]["http.retries"] == 2
+    assert list(retried[ids[1]]["http.retry_statuses"]) == [503, 503]
+    assert "http.retries" not in retried[ids[0]]